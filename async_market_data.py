@@ -0,0 +1,216 @@
+"""
+Asyncio market data client.
+
+Polygon requests run as coroutines on a shared httpx connection pool, bounded
+by a global concurrency semaphore plus a per-host limit, so thousands of
+in-flight requests cost coroutines rather than OS threads. yfinance has no
+async API; its (batched) downloads run in worker threads under the same limits.
+
+Use `await client.fetch(...)` from async code (e.g. the interactive Telegram
+bot's /market handler, via `client.quotes`) and `fetch_sync` /
+`fetch_many_sync` from scripts.
+"""
+import asyncio
+from typing import Dict, Iterable, List
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from bar_store import get_bar_store
+from market_data import (
+    POLYGON_BASE_URL,
+    POLYGON_RETRY_STATUSES,
+    YF_BATCH_SIZE,
+    _chunked,
+    _concat_polygon_chunks,
+    _store_fresh,
+    _stored_window,
+    backoff_delay,
+    fetch_price_history,
+    fetch_price_history_many,
+    polygon_aggs_page,
+    polygon_aggs_request,
+    polygon_api_key,
+    retry_after_seconds,
+)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    print("[ASYNC DATA] httpx not installed; Polygon requests will run in worker threads. Install with: pip install httpx")
+
+
+YAHOO_HOST = "query1.finance.yahoo.com"
+
+
+class AsyncMarketDataClient:
+    """
+    Async OHLCV fetcher with bounded concurrency.
+
+    max_concurrency: total in-flight requests across all hosts
+    per_host_limit: in-flight requests per host (also the keep-alive pool size)
+    """
+
+    def __init__(self, data_cfg: Dict = None, max_concurrency: int = 100, per_host_limit: int = 20,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0):
+        self.data_cfg = data_cfg or {}
+        self.max_concurrency = self.data_cfg.get("async_max_concurrency", max_concurrency)
+        self.per_host_limit = self.data_cfg.get("async_per_host_limit", per_host_limit)
+        self.max_retries = self.data_cfg.get("max_retries", max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = self.data_cfg.get("request_timeout", 15.0)
+        self.base_url = self.data_cfg.get("polygon_base_url", POLYGON_BASE_URL).rstrip("/")
+
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._http = None
+
+    async def __aenter__(self):
+        if HTTPX_AVAILABLE:
+            limits = httpx.Limits(max_connections=self.max_concurrency,
+                                  max_keepalive_connections=self.per_host_limit)
+            self._http = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def fetch(self, ticker: str, period: str, interval: str, provider: str = None) -> pd.DataFrame:
+        """Fetch one ticker's OHLCV history (same semantics as market_data.fetch_price_history)."""
+        provider = (provider or self.data_cfg.get("provider") or "yfinance").lower()
+
+        if provider == "polygon" and self._http is not None:
+            df = await self._fetch_polygon_stored(ticker, period, interval)
+            if not df.empty:
+                return df
+            print(f"[POLYGON] Falling back to yfinance for {ticker}")
+
+        # Without httpx the sync client (with its own Polygon -> yfinance fallback) runs in a thread
+        fallback = "yfinance" if self._http is not None else provider
+        async with self._global_limit, self._host_limit(YAHOO_HOST):
+            return await asyncio.to_thread(fetch_price_history, ticker, period, interval, fallback, self.data_cfg)
+
+    async def fetch_many(self, tickers: Iterable[str], period: str, interval: str,
+                         provider: str = None) -> Dict[str, pd.DataFrame]:
+        """Fetch many tickers concurrently; returns {ticker: frame} in input order."""
+        provider = (provider or self.data_cfg.get("provider") or "yfinance").lower()
+        tickers = list(dict.fromkeys(tickers))
+
+        if provider == "polygon" and self._http is not None:
+            frames = await asyncio.gather(*(self.fetch(t, period, interval, provider) for t in tickers))
+            return {t: df for t, df in zip(tickers, frames) if not df.empty}
+
+        # yfinance (or Polygon without httpx): keep the sync batching, one worker thread per chunk
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, pd.DataFrame]:
+            async with self._global_limit, self._host_limit(YAHOO_HOST):
+                return await asyncio.to_thread(fetch_price_history_many, chunk, period, interval,
+                                               provider, self.data_cfg)
+
+        chunks = _chunked(tickers, self.data_cfg.get("batch_size", YF_BATCH_SIZE))
+        frames: Dict[str, pd.DataFrame] = {}
+        for result in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+            frames.update(result)
+        return {t: frames[t] for t in tickers if t in frames}
+
+    async def quotes(self, tickers: Iterable[str], provider: str = None) -> Dict[str, Dict]:
+        """
+        {ticker: {"current", "change_pct", "volume"}} from the last two daily
+        bars, for every ticker with data (one concurrent fetch for all).
+        """
+        frames = await self.fetch_many(tickers, "5d", "1d", provider)
+        out = {}
+        for ticker, df in frames.items():
+            closes = df["Close"].dropna()
+            if closes.empty:
+                continue
+            current = float(closes.iloc[-1])
+            prev_close = float(closes.iloc[-2]) if len(closes) > 1 else current
+            out[ticker] = {
+                "current": current,
+                "change_pct": (current - prev_close) / prev_close * 100 if prev_close else 0.0,
+                "volume": float(df["Volume"].iloc[-1]),
+            }
+        return out
+
+    async def _fetch_polygon_stored(self, ticker: str, period: str, interval: str) -> pd.DataFrame:
+        store = get_bar_store(self.data_cfg)
+        if store is None:
+            return await self._fetch_polygon(ticker, period, interval)
+
+        cached, start = _stored_window(store, ticker, period, interval)
+        fresh = await self._fetch_polygon(ticker, period, interval, start=start)
+        return _store_fresh(store, ticker, period, interval, cached, start, fresh)
+
+    async def _fetch_polygon(self, ticker: str, period: str, interval: str, start=None) -> pd.DataFrame:
+        api_key = polygon_api_key(self.data_cfg)
+        if not api_key:
+            print("[POLYGON] API key not configured. Set POLYGON_API_KEY env var.")
+            return pd.DataFrame()
+
+        url, params = polygon_aggs_request(self.base_url, ticker, period, interval, api_key, start=start)
+        chunks = []
+        try:
+            while url:
+                chunk, url, params = polygon_aggs_page(await self._get_json(url, params), params)
+                if not chunk.empty:
+                    chunks.append(chunk)
+        except Exception as exc:
+            print(f"[POLYGON ERROR] {ticker}: {exc}")
+            return pd.DataFrame()
+        return _concat_polygon_chunks(chunks)
+
+    async def _get_json(self, url: str, params: Dict) -> Dict:
+        host = urlparse(url).netloc
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            async with self._global_limit, self._host_limit(host):
+                try:
+                    resp = await self._http.get(url, params=params)
+                except httpx.TransportError:
+                    if last_attempt:
+                        raise
+                    resp = None
+
+            if resp is None:
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+                continue
+
+            if resp.status_code in POLYGON_RETRY_STATUSES and not last_attempt:
+                delay = retry_after_seconds(resp.headers.get("Retry-After"), self.backoff_max)
+                # Sleep outside the semaphores so throttled requests don't hold slots
+                await asyncio.sleep(delay if delay is not None else
+                                    backoff_delay(attempt, self.backoff_base, self.backoff_max))
+                continue
+
+            resp.raise_for_status()
+            return resp.json()
+
+
+async def _fetch_many(tickers, period, interval, provider, data_cfg) -> Dict[str, pd.DataFrame]:
+    async with AsyncMarketDataClient(data_cfg) as client:
+        return await client.fetch_many(tickers, period, interval, provider)
+
+
+def fetch_sync(ticker: str, period: str, interval: str, provider: str = None,
+               data_cfg: Dict = None) -> pd.DataFrame:
+    """Blocking wrapper around AsyncMarketDataClient.fetch (not for use inside a running event loop)."""
+    return asyncio.run(_fetch_many([ticker], period, interval, provider, data_cfg)).get(ticker, pd.DataFrame())
+
+
+def fetch_many_sync(tickers: Iterable[str], period: str, interval: str, provider: str = None,
+                    data_cfg: Dict = None) -> Dict[str, pd.DataFrame]:
+    """Blocking wrapper around AsyncMarketDataClient.fetch_many (not for use inside a running event loop)."""
+    return asyncio.run(_fetch_many(tickers, period, interval, provider, data_cfg))
@@ -0,0 +1,131 @@
+"""
+Local on-disk OHLCV bar store.
+
+Bars are kept per ticker/interval as memory-mapped NumPy files so repeated
+scans only need to download the bars after the last stored timestamp.
+Layout: <root>/<interval>/<TICKER>.npy (+ .json sidecar with timezone info).
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+BAR_STORE_DIR = Path(".cache") / "bars"
+MAX_STORED_BARS = 20000
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+BAR_DTYPE = np.dtype([("ts", "<i8")] + [(col, "<f8") for col in OHLCV_COLUMNS])
+
+
+class BarStore:
+    """Columnar per-ticker bar files with incremental merge."""
+
+    def __init__(self, root: Path = BAR_STORE_DIR, max_bars: int = MAX_STORED_BARS):
+        self.root = Path(root)
+        self.max_bars = max_bars
+
+    def _paths(self, ticker: str, interval: str):
+        base = self.root / interval / ticker.upper()
+        return base.with_suffix(".npy"), base.with_suffix(".json")
+
+    def load(self, ticker: str, interval: str) -> pd.DataFrame:
+        """Return stored bars as a DataFrame (empty if nothing stored)."""
+        bars_path, meta_path = self._paths(ticker, interval)
+        if not bars_path.exists():
+            return pd.DataFrame()
+        try:
+            bars = np.load(bars_path, mmap_mode="r")
+            meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        except Exception as exc:
+            print(f"[BAR STORE] Could not read {bars_path}: {exc}")
+            return pd.DataFrame()
+
+        index = pd.to_datetime(np.asarray(bars["ts"]), unit="ns", utc=True)
+        tz = meta.get("tz")
+        index = index.tz_convert(tz) if tz else index.tz_convert(None)
+        index.name = meta.get("index_name")
+        return pd.DataFrame({col: np.asarray(bars[col]) for col in OHLCV_COLUMNS}, index=index)
+
+    def save(self, ticker: str, interval: str, df: pd.DataFrame) -> None:
+        """Replace stored bars for ticker/interval with df (keeps the newest max_bars)."""
+        if df.empty:
+            return
+        df = df.tail(self.max_bars)
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        utc_index = index.tz_convert("UTC") if tz else index.tz_localize("UTC")
+
+        bars = np.empty(len(df), dtype=BAR_DTYPE)
+        bars["ts"] = utc_index.as_unit("ns").asi8
+        for col in OHLCV_COLUMNS:
+            bars[col] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="f8") if col in df else np.nan
+
+        bars_path, meta_path = self._paths(ticker, interval)
+        bars_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file;
+        # meta goes first so the bars it describes never land without it
+        meta = json.dumps({"tz": tz, "index_name": index.name})
+        _replace_atomically(meta_path, lambda tmp: tmp.write_text(meta))
+        _replace_atomically(bars_path, lambda tmp: np.save(tmp, bars))
+
+    def merge(self, ticker: str, interval: str, cached: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge freshly downloaded bars into the cached history and persist.
+
+        Fresh bars win on overlap: the last stored bar may have been partial.
+        """
+        if fresh.empty:
+            return cached
+        fresh = fresh[[col for col in OHLCV_COLUMNS if col in fresh.columns]]
+        if cached.empty:
+            merged = fresh
+        else:
+            fresh = fresh.copy()
+            fresh.index = _match_tz(pd.DatetimeIndex(fresh.index), cached.index.tz)
+            merged = pd.concat([cached[cached.index < fresh.index[0]], fresh])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self.save(ticker, interval, merged)
+        return merged
+
+    def last_timestamp(self, ticker: str, interval: str) -> Optional[pd.Timestamp]:
+        df = self.load(ticker, interval)
+        return None if df.empty else df.index[-1]
+
+
+def _replace_atomically(path: Path, write) -> None:
+    """write(tmp) to a temp file private to this process and thread, then rename over path."""
+    # np.save appends .npy to any other suffix, so keep the real one last
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp{path.suffix}")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _match_tz(index: pd.DatetimeIndex, tz) -> pd.DatetimeIndex:
+    """Express index in tz (naive indexes are treated as UTC, like Polygon bars)."""
+    if index.tz is None:
+        return index if tz is None else index.tz_localize("UTC").tz_convert(tz)
+    return index.tz_convert(tz)
+
+
+_stores: Dict[tuple, BarStore] = {}
+
+
+def get_bar_store(data_cfg: Dict = None) -> Optional[BarStore]:
+    """Return the configured bar store, or None when `data.bar_store.enabled` is off."""
+    store_cfg = (data_cfg or {}).get("bar_store") or {}
+    if not store_cfg.get("enabled", False):
+        return None
+    key = (store_cfg.get("dir", str(BAR_STORE_DIR)), store_cfg.get("max_bars", MAX_STORED_BARS))
+    if key not in _stores:
+        _stores[key] = BarStore(Path(key[0]), key[1])
+    return _stores[key]
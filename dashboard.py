@@ -16,11 +16,11 @@ from database import (
     calculate_win_rates
 )
 from interactive_charts import create_interactive_chart
-from scan_and_chart import get_clean_prices, add_indicators
+from scan_and_chart import get_clean_prices, add_indicators_cached
 
 # Import live scanner
 try:
-    from live_scanner import scan_market_live
+    from live_scanner import scan_market_live_stream
     LIVE_SCANNER_AVAILABLE = True
 except ImportError:
     LIVE_SCANNER_AVAILABLE = False
@@ -89,27 +89,57 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=15 * 60)  # Cache for 15 minutes
+LIVE_CACHE_TTL = 15 * 60  # Seconds a finished live scan is reused
+LIVE_PREVIEW_COLUMNS = ["Ticker", "Score", "Trend", "Signals", "Action", "Close", "RSI"]
+
+
+def _live_cache_key(universe: str, min_score: int, include_fundamentals: bool) -> str:
+    return f"live_scan:{universe}:{min_score}:{include_fundamentals}"
+
+
 def load_scan_results_live(universe: str = "all", min_score: int = 0, include_fundamentals: bool = False):
     """
     Load scan results from live market scanner (no CSV)
-    Cached for 15 minutes
+    The best setups so far are shown while tickers finish; the finished
+    scan is cached in the session for 15 minutes
     """
     if not LIVE_SCANNER_AVAILABLE:
         return None
 
+    key = _live_cache_key(universe, min_score, include_fundamentals)
+    cached = st.session_state.get(key)
+    if cached is not None and time.time() - cached[0] < LIVE_CACHE_TTL:
+        return cached[1]
+
+    progress = st.progress(0.0, text=f"🔴 Scanning {universe} universe live...")
+    preview = st.empty()
+    df = None
     try:
-        df = scan_market_live(
+        for event in scan_market_live_stream(
             universe=universe,
             min_score=min_score if min_score > 0 else None,
             limit=None,
             max_workers=30,
             include_fundamentals=include_fundamentals,
-        )
-        return df
+        ):
+            if event[0] == 'progress':
+                current, total = event[1], event[2]
+                progress.progress(current / total if total else 1.0,
+                                  text=f"🔴 Scanning {universe} universe live... {current}/{total} tickers")
+            elif event[0] == 'result':
+                top = event[2]
+                preview.dataframe(top.frame()[LIVE_PREVIEW_COLUMNS], hide_index=True, use_container_width=True)
+            elif event[0] == 'complete':
+                df = event[1]
     except Exception as e:
         st.error(f"Live scanner error: {e}")
         return None
+    finally:
+        progress.empty()
+        preview.empty()
+
+    st.session_state[key] = (time.time(), df)
+    return df
 
 
 def load_scan_results():
@@ -354,7 +384,8 @@ def main():
 
             # Clear cache button
             if st.button("♻️ Clear Cache & Rescan", use_container_width=True):
-                load_scan_results_live.clear()
+                for key in [k for k in st.session_state if str(k).startswith("live_scan:")]:
+                    del st.session_state[key]
                 st.success("Cache cleared! Rescanning...")
                 st.rerun()
         else:
@@ -417,13 +448,12 @@ def main():
 
     # Load data based on mode
     if use_live_scanner:
-        # Live scanner mode
-        with st.spinner(f"🔴 Scanning {universe} universe live... This may take 1-3 minutes..."):
-            df = load_scan_results_live(
-                universe=universe,
-                min_score=0,  # Apply filter after loading
-                include_fundamentals=include_fundamentals
-            )
+        # Live scanner mode: rows appear as tickers finish (1-3 minutes for a full scan)
+        df = load_scan_results_live(
+            universe=universe,
+            min_score=0,  # Apply filter after loading
+            include_fundamentals=include_fundamentals
+        )
 
         if df is None or df.empty:
             st.error("⚠️ Live scan failed or returned no results")
@@ -609,7 +639,8 @@ def main():
 
                             if not ticker_df.empty:
                                 # Add indicators
-                                ticker_df = add_indicators(ticker_df, cfg)
+                                ticker_df = add_indicators_cached(ticker_df, cfg, selected_ticker,
+                                                                  cfg["data"]["interval"])
 
                                 # Create and display interactive chart
                                 create_interactive_chart(ticker_df, selected_ticker, height=600)
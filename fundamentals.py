@@ -8,6 +8,8 @@ combined with technical scores.
 from __future__ import annotations
 
 import json
+import os
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
@@ -19,6 +21,11 @@ import yfinance as yf
 CACHE_DIR = Path(".cache")
 CACHE_FILE = CACHE_DIR / "fundamentals_cache.json"
 CACHE_TTL = 6 * 60 * 60  # 6 hours
+MAX_FUNDAMENTAL_SCORE = 3
+
+# Scans look fundamentals up from many threads; the read-merge-write of the
+# shared cache file must not interleave
+_cache_lock = threading.Lock()
 
 
 def _load_cache() -> Dict[str, Any]:
@@ -33,8 +40,10 @@ def _load_cache() -> Dict[str, Any]:
 
 def _save_cache(cache: Dict[str, Any]) -> None:
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    with CACHE_FILE.open("w") as f:
+    tmp_file = CACHE_FILE.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with tmp_file.open("w") as f:
         json.dump(cache, f)
+    os.replace(tmp_file, CACHE_FILE)
 
 
 def _sanitize(value: Any) -> Optional[float]:
@@ -61,8 +70,8 @@ def fetch_fundamentals(ticker: str) -> Fundamentals:
     """
     Fetch (and cache) fundamental metrics for a ticker.
     """
-    cache = _load_cache()
-    entry = cache.get(ticker.upper())
+    with _cache_lock:
+        entry = _load_cache().get(ticker.upper())
     now = time.time()
 
     if entry and now - entry.get("timestamp", 0) < CACHE_TTL:
@@ -97,11 +106,14 @@ def fetch_fundamentals(ticker: str) -> Fundamentals:
         reasons=reasons,
     )
 
-    cache[ticker.upper()] = {
-        "timestamp": now,
-        "data": data.__dict__,
-    }
-    _save_cache(cache)
+    with _cache_lock:
+        # Reload so entries written by other threads since our read are kept
+        cache = _load_cache()
+        cache[ticker.upper()] = {
+            "timestamp": now,
+            "data": data.__dict__,
+        }
+        _save_cache(cache)
     return data
 
 
@@ -143,7 +155,7 @@ def _score_fundamentals(
         reasons.append("Large-cap stability")
 
     # Clamp to keep weighting under control
-    score = max(-2, min(score, 3))
+    score = max(-2, min(score, MAX_FUNDAMENTAL_SCORE))
 
     if score >= 3:
         outlook = "BULLISH"
@@ -0,0 +1,175 @@
+"""
+Content-addressed cache for computed indicator columns.
+
+The dashboard drill-down, live scanner and scheduled alerts often compute the
+same indicators for the same ticker and bars within minutes of each other.
+Results are keyed by what actually determines them: ticker, interval, the
+bar window (first/last timestamp, bar count, the latest bar's values, which
+change while that bar is still forming) and a hash of the indicator settings.
+They're kept in a bounded in-memory LRU; evicted entries can spill to disk
+(.cache/indicators) and are reloaded from there on a later miss.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicator_graph import INDICATOR_COLUMNS, resolve_columns
+
+
+INDICATOR_CACHE_DIR = Path(".cache") / "indicators"
+MAX_ENTRIES = 512
+MAX_SPILL_FILES = 5000
+
+
+def indicator_settings_hash(cfg: Dict) -> str:
+    """Hash of every setting that changes indicator values."""
+    settings = {
+        "indicators": cfg.get("indicators", {}),
+        # VWAP's window lives under the signal that uses it
+        "vwap_lookback": cfg.get("signals", {}).get("vwap_reclaim", {}).get("lookback", 20),
+    }
+    return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def bars_fingerprint(df: pd.DataFrame) -> tuple:
+    """(first ts, last ts, bar count, last bar OHLCV) identifying the bar window."""
+    last = tuple(float(df[col].iloc[-1]) for col in ("Open", "High", "Low", "Close", "Volume") if col in df)
+    return str(df.index[0]), str(df.index[-1]), len(df), last
+
+
+class IndicatorCache:
+    """Bounded LRU of {key: indicator columns}, optionally spilling evictions to disk."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, spill_dir: Optional[Path] = None,
+                 max_spill_files: int = MAX_SPILL_FILES):
+        self.max_entries = max_entries
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.max_spill_files = max_spill_files
+        self._entries: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._spills = 0
+
+    def add_indicators(self, df: pd.DataFrame, cfg: Dict, ticker: str, interval: str,
+                       compute: Callable, columns: Iterable[str] = None) -> pd.DataFrame:
+        """
+        Return df with indicator columns attached, computing them with
+        `compute(df, cfg, columns=...)` only when no cached result covers
+        the requested columns for this exact bar window.
+        """
+        if df.empty:
+            return compute(df, cfg, columns=columns)
+
+        key = self._key(ticker, interval, df, cfg)
+        wanted = None if columns is None else list(columns)
+        needed = set(resolve_columns(wanted))
+        cached = self._get(key)
+        if cached is not None and needed <= set(cached.columns):
+            with self._lock:
+                self.hits += 1
+            return _attach(df, cached)
+
+        with self._lock:
+            self.misses += 1
+        result = compute(df.copy(), cfg, columns=wanted)
+        block = result[[col for col in INDICATOR_COLUMNS if col in result.columns]].reset_index(drop=True)
+        if cached is not None:
+            # Keep previously computed columns for callers that asked for more
+            block = pd.concat([cached.drop(columns=block.columns, errors="ignore"), block], axis=1)
+        self._put(key, block)
+        return _attach(df, block)
+
+    # ------------------------------------------------------------------
+
+    def _key(self, ticker: str, interval: str, df: pd.DataFrame, cfg: Dict) -> str:
+        raw = json.dumps([ticker.upper(), interval, bars_fingerprint(df), indicator_settings_hash(cfg)],
+                         default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _get(self, key: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            block = self._entries.get(key)
+            if block is not None:
+                self._entries.move_to_end(key)
+                return block
+        block = self._load_spilled(key)
+        if block is not None:
+            self._put(key, block)
+        return block
+
+    def _put(self, key: str, block: pd.DataFrame) -> None:
+        evicted = []
+        with self._lock:
+            self._entries[key] = block
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False))
+        for old_key, old_block in evicted:
+            self._spill(old_key, old_block)
+
+    def _spill_path(self, key: str) -> Path:
+        return self.spill_dir / key[:2] / f"{key}.npz"
+
+    def _spill(self, key: str, block: pd.DataFrame) -> None:
+        if self.spill_dir is None:
+            return
+        path = self._spill_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npz")
+            np.savez(tmp_path, values=block.to_numpy(dtype="f8"), columns=np.array(block.columns, dtype=str))
+            os.replace(tmp_path, path)
+            self._spills += 1
+            if self._spills % 100 == 0:
+                self._prune_spill()
+        except Exception as exc:
+            print(f"[INDICATOR CACHE] Could not spill {key}: {exc}")
+
+    def _load_spilled(self, key: str) -> Optional[pd.DataFrame]:
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(key)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return pd.DataFrame(data["values"], columns=[str(c) for c in data["columns"]])
+        except Exception as exc:
+            print(f"[INDICATOR CACHE] Could not read {path}: {exc}")
+            return None
+
+    def _prune_spill(self) -> None:
+        files = list(self.spill_dir.glob("*/*.npz"))
+        if len(files) <= self.max_spill_files:
+            return
+        files.sort(key=lambda f: f.stat().st_mtime)
+        for stale in files[:len(files) - self.max_spill_files]:
+            stale.unlink(missing_ok=True)
+
+
+def _attach(df: pd.DataFrame, block: pd.DataFrame) -> pd.DataFrame:
+    values = pd.DataFrame(block.to_numpy(), index=df.index, columns=block.columns)
+    return pd.concat([df.drop(columns=block.columns, errors="ignore"), values], axis=1)
+
+
+_caches: Dict[tuple, IndicatorCache] = {}
+
+
+def get_indicator_cache(cfg: Dict = None) -> Optional[IndicatorCache]:
+    """Shared cache for the `indicator_cache:` config section (None when disabled)."""
+    cache_cfg = (cfg or {}).get("indicator_cache") or {}
+    if not cache_cfg.get("enabled", True):
+        return None
+    spill_dir = cache_cfg.get("spill_dir", str(INDICATOR_CACHE_DIR)) if cache_cfg.get("spill", True) else None
+    key = (cache_cfg.get("max_entries", MAX_ENTRIES), spill_dir, cache_cfg.get("max_spill_files", MAX_SPILL_FILES))
+    if key not in _caches:
+        _caches[key] = IndicatorCache(key[0], Path(spill_dir) if spill_dir else None, key[2])
+    return _caches[key]
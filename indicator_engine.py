@@ -0,0 +1,152 @@
+"""
+Cross-sectional indicator engine.
+
+Computes the same columns as scan_and_chart.add_indicators for a whole
+MarketPanel at once: every indicator_kernels function runs once over 2-D
+time x ticker arrays instead of once per ticker.
+
+Internally the panel is re-packed left-aligned (row k = k-th bar of every
+ticker) so warm-up rules that depend on bar position match `ta` exactly.
+Results are returned in the panel's own [ticker, time] layout.
+"""
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as k
+from indicator_graph import resolve_nodes
+from market_panel import FIELDS, MarketPanel
+
+
+def compute_indicators(panel: MarketPanel, cfg: Dict, columns: Iterable[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Return {column: float64 [ticker, time] array}, NaN where the panel has no
+    bar. `columns` limits the work to those columns and their dependencies
+    (see indicator_graph); None computes every INDICATOR_COLUMNS entry.
+    Tickers too short for ATR/ADX (which `ta` rejects) get NaN there.
+    """
+    gather, valid = _left_align_index(panel)
+    left = np.where(valid[:, :, None], panel.data[_rows(panel), gather].astype("f8"), np.nan)
+    prices = {name: np.ascontiguousarray(left[:, :, FIELDS.index(name)].T)
+              for name in ("High", "Low", "Close", "Volume")}
+
+    out = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for node in resolve_nodes(columns):
+            _PANEL_NODES[node.name](prices, out, cfg, panel.lengths)
+
+    return {name: _right_align(values.T, panel, gather, valid) for name, values in out.items()}
+
+
+def add_indicators_many(frames: Dict[str, pd.DataFrame], cfg: Dict,
+                        columns: Iterable[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Vectorized add_indicators over {ticker: frame}: returns new frames with
+    the indicator columns appended (rows with missing OHLC get NaN). Tickers
+    the panel can't use (no valid bars) are returned unchanged.
+    """
+    panel = MarketPanel.from_frames(frames)
+    out = dict(frames)
+    if not len(panel):
+        return out
+    indicators = compute_indicators(panel, cfg, columns)
+    names = list(indicators)
+    # [ticker, time, column] so each frame gets its block in one piece
+    stacked = np.stack([indicators[name] for name in names], axis=-1)
+    for i, ticker in enumerate(panel.tickers):
+        df = frames[ticker]
+        block = stacked[i, panel.mask[i]]
+        if len(block) != len(df):
+            # Frame still has rows the panel dropped (missing OHLC)
+            ohlc = df[list(FIELDS[:4])].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="f8")
+            full = np.full((len(df), len(names)), np.nan)
+            full[np.isfinite(ohlc).all(axis=1)] = block
+            block = full
+        # One concat per frame is far cheaper than a column insert per indicator
+        out[ticker] = pd.concat([df.drop(columns=names, errors="ignore"),
+                                 pd.DataFrame(block, index=df.index, columns=names)], axis=1)
+    return out
+
+
+# ----------------------------------------------------------------------
+# Graph nodes: (prices, out, cfg, lengths) -> writes time x ticker arrays into out
+# ----------------------------------------------------------------------
+
+def _bollinger(p, out, cfg, lengths):
+    ind = cfg["indicators"]
+    out["bb_high"], out["bb_low"] = k.bollinger(p["Close"], ind["bb_window"], ind["bb_dev"])
+
+
+def _bb_width(p, out, cfg, lengths):
+    out["bb_width"] = (out["bb_high"] - out["bb_low"]) / p["Close"]
+
+
+def _atr(p, out, cfg, lengths):
+    out["atr_pct"] = k.atr(p["High"], p["Low"], p["Close"], cfg["indicators"]["atr_window"], lengths) / p["Close"]
+
+
+def _adx(p, out, cfg, lengths):
+    out["adx"] = k.adx(p["High"], p["Low"], p["Close"], cfg["indicators"]["adx_window"], lengths)
+
+
+def _rsi(p, out, cfg, lengths):
+    out["rsi"] = k.rsi(p["Close"], cfg["indicators"]["rsi_window"])
+
+
+def _ema(span):
+    def node(p, out, cfg, lengths):
+        out[f"ema_{span}"] = k.ema(p["Close"], span)
+    return node
+
+
+def _vol_ma_20(p, out, cfg, lengths):
+    out["vol_ma_20"] = k.rolling_mean(p["Volume"], 20)
+
+
+def _macd(p, out, cfg, lengths):
+    out["macd"], out["macd_signal"], out["macd_hist"] = k.macd(p["Close"])
+
+
+def _vwap(p, out, cfg, lengths):
+    window = cfg.get("signals", {}).get("vwap_reclaim", {}).get("lookback", 20)
+    out["vwap"] = k.rolling_vwap(p["High"], p["Low"], p["Close"], p["Volume"], window)
+
+
+_PANEL_NODES = {
+    "bollinger": _bollinger,
+    "bb_width": _bb_width,
+    "atr": _atr,
+    "adx": _adx,
+    "rsi": _rsi,
+    "ema_20": _ema(20),
+    "ema_50": _ema(50),
+    "ema_200": _ema(200),
+    "vol_ma_20": _vol_ma_20,
+    "macd": _macd,
+    "vwap": _vwap,
+}
+
+
+# ----------------------------------------------------------------------
+# Layout helpers
+# ----------------------------------------------------------------------
+
+def _rows(panel: MarketPanel) -> np.ndarray:
+    return np.arange(len(panel))[:, None]
+
+
+def _left_align_index(panel: MarketPanel):
+    """Column gather index that moves each ticker's first bar to column 0."""
+    starts = panel.n_bars - panel.lengths
+    positions = np.arange(panel.n_bars)[None, :]
+    gather = np.minimum(starts[:, None] + positions, max(panel.n_bars - 1, 0))
+    valid = positions < panel.lengths[:, None]
+    return gather, valid
+
+
+def _right_align(left: np.ndarray, panel: MarketPanel, gather: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    out = np.full(left.shape, np.nan)
+    rows = np.broadcast_to(_rows(panel), gather.shape)
+    out[rows[valid], gather[valid]] = left[valid]
+    return out
@@ -0,0 +1,132 @@
+"""
+Indicator dependency graph.
+
+Each indicator is a node that declares the columns it produces and the
+columns it reads. Callers ask for the columns they actually use (e.g. the
+union of what the enabled signals read) and only the transitive closure of
+nodes is computed. Both scan_and_chart.add_indicators (per frame) and
+indicator_engine (whole panel) resolve through here.
+
+Nodes also know how many bars they need before their values settle, so
+scanners can fetch and compute just the tail of history that matters.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+@dataclass(frozen=True)
+class IndicatorNode:
+    name: str
+    outputs: Tuple[str, ...]
+    inputs: Tuple[str, ...]
+
+
+# Declaration order is a valid evaluation order (inputs before dependents)
+INDICATOR_NODES: List[IndicatorNode] = [
+    IndicatorNode("bollinger", ("bb_high", "bb_low"), ("Close",)),
+    IndicatorNode("bb_width", ("bb_width",), ("bb_high", "bb_low", "Close")),
+    IndicatorNode("atr", ("atr_pct",), ("High", "Low", "Close")),
+    IndicatorNode("adx", ("adx",), ("High", "Low", "Close")),
+    IndicatorNode("rsi", ("rsi",), ("Close",)),
+    IndicatorNode("ema_20", ("ema_20",), ("Close",)),
+    IndicatorNode("ema_50", ("ema_50",), ("Close",)),
+    IndicatorNode("ema_200", ("ema_200",), ("Close",)),
+    IndicatorNode("vol_ma_20", ("vol_ma_20",), ("Volume",)),
+    IndicatorNode("macd", ("macd", "macd_signal", "macd_hist"), ("Close",)),
+    IndicatorNode("vwap", ("vwap",), ("High", "Low", "Close", "Volume")),
+]
+
+INDICATOR_COLUMNS: List[str] = [col for node in INDICATOR_NODES for col in node.outputs]
+
+_PRODUCER = {col: node for node in INDICATOR_NODES for col in node.outputs}
+
+
+def resolve_nodes(columns: Optional[Iterable[str]] = None) -> List[IndicatorNode]:
+    """
+    Nodes needed to produce `columns` (None = every indicator), in evaluation
+    order. Price columns are inputs, not nodes, and are ignored.
+    """
+    if columns is None:
+        return list(INDICATOR_NODES)
+
+    needed = set()
+    pending = [col for col in columns if col not in PRICE_COLUMNS]
+    while pending:
+        col = pending.pop()
+        node = _PRODUCER.get(col)
+        if node is None:
+            raise KeyError(f"Unknown indicator column: {col}")
+        if node.name not in needed:
+            needed.add(node.name)
+            pending.extend(c for c in node.inputs if c not in PRICE_COLUMNS)
+    return [node for node in INDICATOR_NODES if node.name in needed]
+
+
+def resolve_columns(columns: Optional[Iterable[str]] = None) -> List[str]:
+    """Every indicator column that resolving `columns` will produce."""
+    return [col for node in resolve_nodes(columns) for col in node.outputs]
+
+
+# ----------------------------------------------------------------------
+# Warm-up
+# ----------------------------------------------------------------------
+
+# Recursive indicators are converged once their seed's weight has decayed
+# to exp(-factor): `factor` spans for an EMA. Wilder smoothing (alpha=1/w)
+# behaves like an EMA with span 2w-1.
+WARMUP_FACTOR = 3
+
+
+def _wilder_span(window: int) -> int:
+    return 2 * window - 1
+
+
+def _node_warmup(name: str, cfg: Dict, factor: float) -> int:
+    ind = cfg.get("indicators", {})
+    if name in ("bollinger", "bb_width"):
+        return ind.get("bb_window", 20)
+    if name == "atr":
+        window = ind.get("atr_window", 14)
+        return window + int(factor * _wilder_span(window))
+    if name == "adx":
+        # DX needs one smoothed window, ADX smooths DX again
+        window = ind.get("adx_window", 14)
+        return 2 * window + int(factor * _wilder_span(window))
+    if name == "rsi":
+        window = ind.get("rsi_window", 14)
+        return 1 + int(factor * _wilder_span(window))
+    if name.startswith("ema_"):
+        return int(factor * int(name[len("ema_"):]))
+    if name == "vol_ma_20":
+        return 20
+    if name == "macd":
+        # Signal line is an EMA(9) of EMA(12) - EMA(26)
+        return int(factor * 26) + int(factor * 9)
+    if name == "vwap":
+        return cfg.get("signals", {}).get("vwap_reclaim", {}).get("lookback", 20)
+    raise KeyError(f"No warm-up rule for indicator node: {name}")
+
+
+def _node_warmups(cfg: Dict, columns: Optional[Iterable[str]]) -> Dict[str, int]:
+    factor = cfg.get("indicators", {}).get("warmup_factor", WARMUP_FACTOR)
+    return {node.name: _node_warmup(node.name, cfg, factor) for node in resolve_nodes(columns)}
+
+
+def warmup_bars(cfg: Dict, columns: Optional[Iterable[str]] = None) -> int:
+    """
+    Bars of history needed before every indicator behind `columns` (None =
+    all) has converged. The factor comes from `indicators.warmup_factor`.
+    An optional `indicators.max_warmup_bars` caps each node, trading long
+    EMA accuracy for a shorter download (see under_warmed).
+    """
+    cap = cfg.get("indicators", {}).get("max_warmup_bars")
+    needs = _node_warmups(cfg, columns).values()
+    return max((need if cap is None else min(need, cap) for need in needs), default=0)
+
+
+def under_warmed(cfg: Dict, columns: Optional[Iterable[str]], bars: int) -> List[str]:
+    """Indicator nodes behind `columns` that haven't converged after `bars` bars."""
+    return [name for name, need in _node_warmups(cfg, columns).items() if need > bars]
@@ -0,0 +1,197 @@
+"""
+Indicator kernels on plain NumPy arrays.
+
+Drop-in numeric replacements for the `ta` classes used by add_indicators
+(Bollinger, Wilder RSI/ATR/ADX, MACD, rolling VWAP), without the intermediate
+Series each `ta` object builds. Arrays are time-major: 1-D for one ticker or
+2-D time x ticker (left-aligned, NaN after each ticker's last bar) for a
+whole panel.
+
+Every recursive indicator here is an exponential moving average with a seed
+(Wilder smoothing is an EMA with alpha=1/window), so they all share one
+`ewm_mean` kernel. It is a JIT-compiled loop when Numba is installed, and
+pandas' C ewm otherwise. Rolling windows use cumulative sums.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _ewm_loop(x, alpha, min_periods, out):
+        n_rows, n_cols = x.shape
+        for j in range(n_cols):
+            state = np.nan
+            seen = 0
+            for t in range(n_rows):
+                value = x[t, j]
+                if value == value:
+                    state = value if seen == 0 else (1 - alpha) * state + alpha * value
+                    seen += 1
+                out[t, j] = state if seen >= min_periods and seen > 0 else np.nan
+
+
+def ewm_mean(x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """
+    pandas ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()
+    along axis 0. NaN is expected only before each series' first value (a
+    seed position) or after its last bar.
+    """
+    x2 = np.asarray(x, dtype="f8").reshape(len(x), -1)
+    if NUMBA_AVAILABLE:
+        out = np.empty_like(x2)
+        _ewm_loop(x2, alpha, max(min_periods, 1), out)
+    else:
+        out = pd.DataFrame(x2).ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean().to_numpy()
+    return out.reshape(np.shape(x))
+
+
+def _seeded_ewm(seed_row: int, seed: np.ndarray, x: np.ndarray, alpha: float) -> np.ndarray:
+    """EMA of x[seed_row + 1:] starting from `seed` at seed_row; NaN before seed_row."""
+    z = np.array(x, dtype="f8")
+    z[:seed_row] = np.nan
+    z[seed_row] = seed
+    return ewm_mean(z, alpha)
+
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    return np.concatenate([np.full((1,) + x.shape[1:], np.nan), x[:-1]])
+
+
+def _too_short(out: np.ndarray, lengths, minimum: int) -> np.ndarray:
+    """NaN out series shorter than `minimum` bars (`ta` raises on those)."""
+    if lengths is None:
+        if len(out) < minimum:
+            out[:] = np.nan
+    else:
+        out[..., np.asarray(lengths) < minimum] = np.nan
+    return out
+
+
+# ----------------------------------------------------------------------
+# Rolling windows
+# ----------------------------------------------------------------------
+
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sum with pandas semantics (NaN unless the full window is present)."""
+    finite = np.isfinite(x)
+    zero = np.zeros((1,) + x.shape[1:])
+    sums = np.concatenate([zero, np.cumsum(np.where(finite, x, 0.0), axis=0)])
+    counts = np.concatenate([zero, np.cumsum(finite, axis=0)])
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        complete = counts[window:] - counts[:-window] == window
+        out[window - 1:] = np.where(complete, sums[window:] - sums[:-window], np.nan)
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    return rolling_sum(x, window) / window
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Population (ddof=0) rolling standard deviation."""
+    # Center on each series' first value so the sum-of-squares form keeps precision
+    centered = x - np.nan_to_num(x[:1])
+    mean = rolling_mean(centered, window)
+    var = rolling_mean(centered ** 2, window) - mean ** 2
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+# ----------------------------------------------------------------------
+# Indicators (same values as the corresponding `ta` 0.11 outputs)
+# ----------------------------------------------------------------------
+
+def bollinger(close: np.ndarray, window: int = 20, window_dev: float = 2.0):
+    """(high band, low band) like ta BollingerBands."""
+    mavg = rolling_mean(close, window)
+    mstd = rolling_std(close, window)
+    return mavg + window_dev * mstd, mavg - window_dev * mstd
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """ta RSIIndicator.rsi()."""
+    diff = np.diff(close, axis=0, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = ewm_mean(up, 1 / window, min_periods=window)
+    ema_down = ewm_mean(down, 1 / window, min_periods=window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = _shift(close)
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14, lengths=None) -> np.ndarray:
+    """
+    ta AverageTrueRange.average_true_range(): 0 for the first window-1 bars,
+    the mean true range at bar window-1, then Wilder smoothing.
+    """
+    tr = true_range(high, low, close)
+    out = np.zeros(tr.shape)
+    if len(tr) >= window:
+        out[window - 1:] = _seeded_ewm(window - 1, tr[:window].mean(axis=0), tr, 1 / window)[window - 1:]
+    return _too_short(out, lengths, window)
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14, lengths=None) -> np.ndarray:
+    """
+    ta ADXIndicator.adx(), including its indexing: smoothed TR/+DM/-DM are
+    seeded from bars 1..window, the first ADX value (mean of the first
+    `window` DX values) lands on bar 2*window-1 and earlier bars are 0.
+    """
+    out = np.zeros(np.shape(close))
+    if len(close) < 2 * window:
+        return _too_short(out, lengths, 2 * window)
+
+    prev_close = _shift(close)
+    # np.maximum/minimum propagate NaN like ta's np.amax/amin
+    dm = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    diff_up = np.diff(high, axis=0, prepend=np.nan)
+    diff_down = -np.diff(low, axis=0, prepend=np.nan)
+    pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+    neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+
+    # ta's running sums (s - s/w + x) are w * EMA(alpha=1/w); the scale cancels in the ratios
+    alpha = 1 / window
+    trs = _seeded_ewm(window, dm[1:window + 1].mean(axis=0), dm, alpha)
+    dip = _seeded_ewm(window, pos[1:window + 1].mean(axis=0), pos, alpha)
+    din = _seeded_ewm(window, neg[1:window + 1].mean(axis=0), neg, alpha)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+        di_sum = di_pos + di_neg
+        dx = np.where(di_sum != 0, 100 * np.abs((di_pos - di_neg) / di_sum), 0.0)
+
+    first = 2 * window - 1
+    out[first:] = _seeded_ewm(first, dx[window:first + 1].mean(axis=0), dx, alpha)[first:]
+    return _too_short(out, lengths, 2 * window)
+
+
+def ema(close: np.ndarray, span: int, min_periods: int = 0) -> np.ndarray:
+    return ewm_mean(close, 2 / (span + 1), min_periods=min_periods)
+
+
+def macd(close: np.ndarray, window_slow: int = 26, window_fast: int = 12, window_sign: int = 9):
+    """(macd, signal, histogram) like ta MACD."""
+    line = ema(close, window_fast, window_fast) - ema(close, window_slow, window_slow)
+    signal = ema(line, window_sign, window_sign)
+    return line, signal, line - signal
+
+
+def rolling_vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                 window: int = 14) -> np.ndarray:
+    """ta VolumeWeightedAveragePrice over a rolling window."""
+    typical = (high + low + close) / 3.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return rolling_sum(typical * volume, window) / rolling_sum(volume, window)
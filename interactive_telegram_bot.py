@@ -67,8 +67,18 @@ except ImportError as e:
     MarketIntelligence = None
     MARKET_INTELLIGENCE_AVAILABLE = False
 
+try:
+    import yaml
+    from async_market_data import AsyncMarketDataClient
+    ASYNC_DATA_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"⚠️  Async market data not available: {e}")
+    ASYNC_DATA_AVAILABLE = False
+
 from database import get_db_connection, format_sql
 
+MARKET_OVERVIEW_TICKERS = ['SPY', 'QQQ', 'DIA', 'IWM', '^VIX']
+
 
 class TradingAssistantBot:
     """
@@ -116,6 +126,14 @@ class TradingAssistantBot:
         else:
             self.market_engine = None
 
+        # Data settings for async quote fetches (/market)
+        self.data_cfg = {}
+        if ASYNC_DATA_AVAILABLE:
+            try:
+                self.data_cfg = yaml.safe_load(open("config.yaml", "r")).get("data") or {}
+            except Exception as e:
+                logger.warning(f"⚠️  Could not read config.yaml data settings: {e}")
+
         # Initialize market intelligence
         if MARKET_INTELLIGENCE_AVAILABLE and MarketIntelligence:
             self.market_intel = MarketIntelligence()
@@ -367,14 +385,16 @@ Examples:
     async def market_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /market command - market overview"""
         try:
-            if not self.market_engine:
+            if not ASYNC_DATA_AVAILABLE:
                 await update.message.reply_text(
                     "❌ Market data not available. Check configuration."
                 )
                 return
 
-            # Get market overview
-            market_data = self.market_engine.get_market_overview()
+            # Get market overview: all quotes concurrently, without blocking the event loop
+            tickers = self.market_engine.major_indices if self.market_engine else MARKET_OVERVIEW_TICKERS
+            async with AsyncMarketDataClient(self.data_cfg) as client:
+                market_data = await client.quotes(tickers)
 
             msg = "📈 *MARKET OVERVIEW*\n"
             msg += "─" * 30 + "\n\n"
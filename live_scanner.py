@@ -5,479 +5,396 @@ Scans stock universe in-memory without CSV files
 Used by Streamlit dashboard for real-time data
 """
 
+import heapq
 import pandas as pd
 import numpy as np
 from typing import Literal, Optional, List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 import yaml
 
 # Import existing modules
 from top_performers_scanner import get_stock_universe
-from scan_and_chart import get_clean_prices, add_indicators, trend_direction
-from signals_engine import evaluate_signals
-from fundamentals import fetch_fundamentals, recommend_trade_action
+from scan_and_chart import (get_clean_prices, get_clean_prices_many, add_indicators_cached, trend_direction,
+                            scan_history, tail_history, SCAN_OUTPUT_COLUMNS)
+from signals_engine import evaluate_signals, load_signal_plugins, required_columns
+from fundamentals import MAX_FUNDAMENTAL_SCORE, fetch_fundamentals, recommend_trade_action
+from prefilter import prefilter_universe
+from scan_cache import get_scan_row_cache
+import scoring
 
 UniverseType = Literal["popular", "sp500", "nasdaq100", "all"]
 
 
-def calculate_signal_score(signal_flags: Dict, trend: str) -> int:
-    """
-    Calculate technical score based on signals
-    Replicates logic from scan_and_chart.py
-    """
-    score = 0
-
-    # Core signals (2 points each)
-    if signal_flags.get('Consolidating'):
-        score += 2
-    if signal_flags.get('BuyDip'):
-        score += 2
-    if signal_flags.get('Breakout'):
-        score += 2
-    if signal_flags.get('VolSpike'):
-        score += 2
-
-    # Additional signals (1 point each)
-    if signal_flags.get('EMABullish'):
-        score += 1
-    if signal_flags.get('MACDBullish'):
-        score += 1
-    if signal_flags.get('VWAPReclaim'):
-        score += 1
-
-    # Trend bonus
-    if trend == "UP":
-        score += 1
-
-    return score
-
-
-def calculate_potential_moves(atr_pct: float, score: float, trend: str) -> Dict:
+# Signals string labels, in display order
+SIGNAL_TAGS = {
+    "Consolidating": "CONSOLIDATION",
+    "BuyDip": "BUY_DIP",
+    "Breakout": "BREAKOUT",
+    "VolSpike": "VOL_SPIKE",
+    "VWAPReclaim": "VWAP_RECLAIM",
+    "EMABullish": "EMA_STACK",
+    "MACDBullish": "MACD_BULL",
+}
+
+FUNDAMENTAL_COLUMNS = ["MarketCap", "PERatio", "RevenueGrowthPct", "ProfitMarginPct",
+                       "FundamentalOutlook", "FundamentalReasons"]
+
+
+def signal_floor(min_score: Optional[float], include_fundamentals: bool) -> Optional[float]:
     """
-    Calculate realistic potential move ranges for different timeframes
-    Based on ATR (volatility), score, and trend
-
-    Returns dict with:
-        potential_up_1h_pct, potential_down_1h_pct
-        potential_up_3h_pct, potential_down_3h_pct
-        potential_up_1d_pct, potential_down_1d_pct
-        potential_up_7d_pct, potential_down_7d_pct
+    Live-weighted signal points a row needs to reach min_score: the trend
+    bonus and the best fundamental score can make up the rest. None when
+    every row could qualify.
     """
-    import math
-
-    # Base daily move from ATR
-    daily_move_pct = atr_pct * 100  # Convert to percentage
-
-    # Scale for different timeframes using √time rule
-    move_1h = daily_move_pct * (1 / math.sqrt(24))
-    move_3h = daily_move_pct * math.sqrt(3 / 24)
-    move_1d = daily_move_pct
-    move_7d = daily_move_pct * math.sqrt(7)
-
-    # Normalize score to 0-1
-    score_norm = max(0, min(score, 10)) / 10.0
-
-    # Bias up/down based on trend and score
-    if trend == "UP":
-        up_factor = 1.0 + 0.5 * score_norm      # More upside if high score
-        down_factor = 1.0 - 0.5 * score_norm    # Less downside if high score
-    elif trend == "DOWN":
-        up_factor = 1.0 - 0.5 * score_norm
-        down_factor = 1.0 + 0.5 * score_norm
-    else:  # CHOPPY
-        up_factor = down_factor = 1.0
-
-    return {
-        'potential_up_1h_pct': round(move_1h * up_factor, 2),
-        'potential_down_1h_pct': round(move_1h * down_factor, 2),
-        'potential_up_3h_pct': round(move_3h * up_factor, 2),
-        'potential_down_3h_pct': round(move_3h * down_factor, 2),
-        'potential_up_1d_pct': round(move_1d * up_factor, 2),
-        'potential_down_1d_pct': round(move_1d * down_factor, 2),
-        'potential_up_7d_pct': round(move_7d * up_factor, 2),
-        'potential_down_7d_pct': round(move_7d * down_factor, 2),
-    }
+    if min_score is None:
+        return None
+    floor = min_score - scoring.TREND_BONUS - (MAX_FUNDAMENTAL_SCORE if include_fundamentals else 0)
+    return floor if floor > 0 else None
 
 
-def determine_action_and_timeframe(
-    score: float,
-    trend: str,
-    rsi: float,
-    signal_flags: Dict,
-    potential_up_1d: float,
-    potential_down_1d: float
-) -> Dict:
+def scan_ticker_signals(ticker: str, cfg: dict, include_fundamentals: bool = True,
+                        prices: Optional[pd.DataFrame] = None,
+                        min_score: Optional[float] = None) -> Optional[Dict]:
     """
-    Determine trading action and timeframe based on setup quality
-
-    Returns:
-        action: "BUY" | "WATCH" | "AVOID" | "TAKE_PROFIT" | "TRAIL_STOP"
-        timeframe_label: "scalp" | "intraday" | "swing" | "position"
-        action_reason: str (clear explanation)
+    Signals, trend, latest indicator values and (optionally) fundamentals for
+    one ticker, unscored. score_results turns a batch of these into scan rows.
+    Returns None if the scan fails.
+
+    prices: pre-fetched clean OHLCV frame (from a batched download); fetched
+    on demand when omitted.
+    min_score: the scan's score filter. Detectors stop once the row can't
+    reach it (see signal_floor), so rows below it may under-report signals;
+    the floor used is kept in the row's SignalFloor.
     """
-    # Calculate risk:reward ratio
-    risk_reward = potential_up_1d / potential_down_1d if potential_down_1d > 0 else 0
-
-    # BUY conditions (strong setups)
-    if score >= 8 and trend == "UP" and risk_reward > 2.0:
-        return {
-            'action': 'BUY',
-            'timeframe_label': 'swing',
-            'action_reason': f'Strong setup: Score {score}/10, uptrend, R:R {risk_reward:.2f}'
-        }
+    try:
+        return _scan_ticker_signals(ticker, cfg, include_fundamentals, prices, min_score)
+    except Exception:
+        # Silent fail for individual tickers
+        return None
 
-    # Intraday BUY (good but not perfect)
-    if 6 <= score < 8 and trend == "UP" and risk_reward > 1.5:
-        return {
-            'action': 'BUY',
-            'timeframe_label': 'intraday',
-            'action_reason': f'Good intraday setup: Score {score}/10, R:R {risk_reward:.2f}'
-        }
 
-    # WATCH conditions (forming setups)
-    if 5 <= score < 6 and trend in ["UP", "CHOPPY"]:
-        return {
-            'action': 'WATCH',
-            'timeframe_label': 'intraday',
-            'action_reason': f'Setup forming—wait for confirmation. Score {score}/10'
-        }
+def _scan_ticker_signals(ticker: str, cfg: dict, include_fundamentals: bool = True,
+                         prices: Optional[pd.DataFrame] = None,
+                         min_score: Optional[float] = None) -> Optional[Dict]:
+    """
+    scan_ticker_signals without the catch-all: None means the bars can't
+    produce a row (too short), while failures raise, so the live scan only
+    caches real "no row" results and retries errors on the next run.
+    """
+    # Fetch price data
+    df = prices
+    if df is None:
+        period, history_bars = scan_history(cfg)
+        df = get_clean_prices(
+            ticker,
+            period,
+            cfg["data"]["interval"],
+            cfg.get("data")
+        ).iloc[-history_bars:]
 
-    # TAKE_PROFIT (overbought conditions)
-    if rsi > 75 and trend == "UP" and signal_flags.get('Breakout'):
-        return {
-            'action': 'TAKE_PROFIT',
-            'timeframe_label': 'swing_exit',
-            'action_reason': f'Overbought (RSI {rsi:.0f})—consider profit-taking'
-        }
+    if df.empty or len(df) < 50:
+        return None
 
-    # TRAIL_STOP (extended move)
-    if rsi > 70 and trend == "UP" and score >= 7:
-        return {
-            'action': 'TRAIL_STOP',
-            'timeframe_label': 'swing',
-            'action_reason': f'Strong but extended—trail your stop'
-        }
+    # Add only the indicators the enabled signals and result rows read
+    df = add_indicators_cached(df, cfg, ticker, cfg["data"]["interval"],
+                               columns=required_columns(cfg, SCAN_OUTPUT_COLUMNS))
 
-    # AVOID (weak/risky setups)
-    if score < 5:
-        return {
-            'action': 'AVOID',
-            'timeframe_label': 'none',
-            'action_reason': f'Weak setup: Score {score}/10, low probability'
-        }
+    if df.empty:
+        return None
 
-    # Default: WATCH
-    return {
-        'action': 'WATCH',
-        'timeframe_label': 'intraday',
-        'action_reason': f'Neutral setup—monitor for now. Score {score}/10'
+    last = df.iloc[-1]
+    floor = signal_floor(min_score, include_fundamentals)
+    row = {
+        "Ticker": ticker,
+        "Close": last["Close"],
+        "Trend": trend_direction(df),
+        "rsi": last["rsi"],
+        "adx": last["adx"],
+        "bb_width": last["bb_width"],
+        "atr_pct": last["atr_pct"],
+        "HasFundamentals": False,
+        "FundamentalScore": 0,
+        "SignalFloor": floor or 0,
     }
-
-
-def calculate_price_levels(
-    close: float,
-    potential_down_1d: float,
-    potential_up_1d: float,
-    action: str,
-    timeframe_label: str
-) -> Dict:
+    row.update(evaluate_signals(df, cfg, min_score=floor, weights=scoring.profile_weights("live")))
+
+    # Fundamentals (optional, slower); technical only if they can't be fetched
+    if include_fundamentals:
+        try:
+            fundamentals = fetch_fundamentals(ticker)
+            row.update({
+                "HasFundamentals": True,
+                "FundamentalScore": fundamentals.fundamental_score,
+                "MarketCap": fundamentals.market_cap,
+                "PERatio": fundamentals.pe_ratio,
+                "RevenueGrowthPct": fundamentals.revenue_growth_pct,
+                "ProfitMarginPct": fundamentals.profit_margin_pct,
+                "FundamentalOutlook": fundamentals.outlook,
+                "FundamentalReasons": fundamentals.reasons,
+            })
+        except Exception:
+            pass
+    return row
+
+
+
+def score_results(raw: pd.DataFrame) -> pd.DataFrame:
     """
-    Calculate entry, stop-loss, and take-profit levels
-
-    Returns:
-        entry_price
-        stop_loss_price
-        take_profit_1
-        take_profit_2
+    Score scan_ticker_signals rows in one vectorized pass: technical and
+    combined scores, action/timeframe, price levels and potential moves.
     """
-    entry_price = close
-
-    # For intraday, use tighter stops
-    if 'intraday' in timeframe_label:
-        risk_pct = potential_down_1d * 0.6  # Tighter
-        reward_pct_1 = potential_up_1d * 0.4
-        reward_pct_2 = potential_up_1d * 0.8
-    # For swing, use wider stops
-    elif 'swing' in timeframe_label:
-        risk_pct = potential_down_1d * 0.8
-        reward_pct_1 = potential_up_1d * 0.5
-        reward_pct_2 = potential_up_1d * 1.0
-    # For position, even wider
-    elif 'position' in timeframe_label:
-        risk_pct = potential_down_1d * 1.0
-        reward_pct_1 = potential_up_1d * 0.6
-        reward_pct_2 = potential_up_1d * 1.2
-    else:  # Default
-        risk_pct = potential_down_1d * 0.75
-        reward_pct_1 = potential_up_1d * 0.5
-        reward_pct_2 = potential_up_1d * 1.0
-
-    stop_loss_price = round(close * (1 - risk_pct / 100.0), 2)
-    take_profit_1 = round(close * (1 + reward_pct_1 / 100.0), 2)
-    take_profit_2 = round(close * (1 + reward_pct_2 / 100.0), 2)
-
-    return {
-        'entry_price': entry_price,
-        'stop_loss_price': stop_loss_price,
-        'take_profit_1': take_profit_1,
-        'take_profit_2': take_profit_2,
-    }
+    flags = {key: raw[key].fillna(False).astype(bool).to_numpy() if key in raw else np.zeros(len(raw), dtype=bool)
+             for key in SIGNAL_TAGS}
+    trend = raw["Trend"].to_numpy()
+    close = raw["Close"].to_numpy(dtype="f8")
+    rsi = raw["rsi"].to_numpy(dtype="f8")
+    atr_pct = raw["atr_pct"].to_numpy(dtype="f8")
+
+    technical_score = scoring.signal_scores(flags, trend, profile="live")
+    fund_score = raw["FundamentalScore"].to_numpy()
+    has_fundamentals = raw["HasFundamentals"].to_numpy(dtype=bool)
+    combined_score = np.where(has_fundamentals, np.minimum(technical_score + fund_score, 10), technical_score)
+
+    moves = scoring.potential_moves(atr_pct, technical_score, trend)
+    actions = scoring.actions_and_timeframes(technical_score, trend, rsi, flags["Breakout"],
+                                             moves["potential_up_1d_pct"], moves["potential_down_1d_pct"])
+    levels = scoring.price_levels(close, moves["potential_down_1d_pct"], moves["potential_up_1d_pct"],
+                                  actions["timeframe_label"])
+
+    # "CONSOLIDATION + BREAKOUT" style strings: bool x "TAG + " summed across signals
+    tags = np.array([tag + " + " for tag in SIGNAL_TAGS.values()], dtype=object)
+    signals_str = pd.Series(np.column_stack(list(flags.values())).astype(object) @ tags).str[:-3]
+
+    out = pd.DataFrame({
+        # Core identification
+        "Ticker": raw["Ticker"].to_numpy(),
+        "Close": np.round(close, 2),
+        "Score": combined_score,
+        "TechnicalScore": technical_score,
+        "FundamentalScore": np.where(has_fundamentals, fund_score, 0),
+        "Trend": trend,
+        "Signals": signals_str.mask(signals_str == "", "None").to_numpy(),
+
+        # Action & Timeframe
+        "Action": actions["action"].to_numpy(),
+        "TimeframeLabel": actions["timeframe_label"].to_numpy(),
+        "ActionReason": actions["action_reason"].to_numpy(),
+
+        # Price Levels
+        "EntryPrice": levels["entry_price"].to_numpy(),
+        "StopLossPrice": levels["stop_loss_price"].to_numpy(),
+        "TakeProfit1": levels["take_profit_1"].to_numpy(),
+        "TakeProfit2": levels["take_profit_2"].to_numpy(),
+
+        # Potential Moves
+        "PotentialUp1h": moves["potential_up_1h_pct"].to_numpy(),
+        "PotentialDown1h": moves["potential_down_1h_pct"].to_numpy(),
+        "PotentialUp3h": moves["potential_up_3h_pct"].to_numpy(),
+        "PotentialDown3h": moves["potential_down_3h_pct"].to_numpy(),
+        "PotentialUp1d": moves["potential_up_1d_pct"].to_numpy(),
+        "PotentialDown1d": moves["potential_down_1d_pct"].to_numpy(),
+        "PotentialUp7d": moves["potential_up_7d_pct"].to_numpy(),
+        "PotentialDown7d": moves["potential_down_7d_pct"].to_numpy(),
+
+        # Technical Indicators
+        "RSI": np.round(rsi, 2),
+        "ADX": np.round(raw["adx"].to_numpy(dtype="f8"), 2),
+        "BBWidth_pct": np.round(raw["bb_width"].to_numpy(dtype="f8") * 100, 2),
+        "ATR%": np.round(atr_pct * 100, 2),
+        "ATRValue": np.round(atr_pct * close, 2),
+    })
+
+    # Fundamentals (N/A for technical-only rows)
+    for col in FUNDAMENTAL_COLUMNS:
+        values = raw[col] if col in raw else pd.Series(None, index=raw.index, dtype=object)
+        out[col] = values.where(raw["HasFundamentals"].to_numpy(dtype=bool), None).to_numpy()
+    out["FundamentalOutlook"] = out["FundamentalOutlook"].fillna("N/A")
+    out["FundamentalReasons"] = out["FundamentalReasons"].fillna("")
+
+    # Signal Flags (boolean)
+    for key in ("VWAPReclaim", "Breakout", "Consolidating", "BuyDip", "VolSpike", "EMABullish", "MACDBullish"):
+        out[key] = flags[key]
+    return out
+
+
+def _row_cacheable(row: Optional[Dict], include_fundamentals: bool) -> bool:
+    """
+    Whether a _scan_ticker_signals result may be reused for unchanged bars.
+    A technical-only row left by a fundamentals failure would hide them
+    until the entry expires, so it is recomputed next time instead.
+    """
+    return row is None or not include_fundamentals or bool(row["HasFundamentals"])
 
 
-def scan_single_ticker(ticker: str, cfg: dict, include_fundamentals: bool = True) -> Optional[Dict]:
+def scan_single_ticker(ticker: str, cfg: dict, include_fundamentals: bool = True,
+                       prices: Optional[pd.DataFrame] = None) -> Optional[Dict]:
     """
     Scan a single ticker and return result dict
     Returns None if scan fails
     """
-    try:
-        # Fetch price data
-        df = get_clean_prices(
-            ticker,
-            cfg["data"]["period"],
-            cfg["data"]["interval"],
-            cfg.get("data")
-        )
-
-        if df.empty or len(df) < 50:
-            return None
-
-        # Add indicators
-        df = add_indicators(df, cfg)
-
-        if df.empty:
-            return None
-
-        # Evaluate signals
-        signal_flags = evaluate_signals(df, cfg)
-        trend = trend_direction(df)
-
-        # Technical score
-        technical_score = calculate_signal_score(signal_flags, trend)
-
-        # Get latest values
-        last = df.iloc[-1]
-        close = last["Close"]
-        rsi = last["rsi"]
-        atr_pct = last["atr_pct"]
-
-        # Calculate potential moves for all timeframes
-        potential_moves = calculate_potential_moves(atr_pct, technical_score, trend)
-
-        # Determine action and timeframe
-        action_info_enhanced = determine_action_and_timeframe(
-            score=technical_score,
-            trend=trend,
-            rsi=rsi,
-            signal_flags=signal_flags,
-            potential_up_1d=potential_moves['potential_up_1d_pct'],
-            potential_down_1d=potential_moves['potential_down_1d_pct']
-        )
-
-        # Calculate price levels
-        price_levels = calculate_price_levels(
-            close=close,
-            potential_down_1d=potential_moves['potential_down_1d_pct'],
-            potential_up_1d=potential_moves['potential_up_1d_pct'],
-            action=action_info_enhanced['action'],
-            timeframe_label=action_info_enhanced['timeframe_label']
-        )
-
-        # Build signals string
-        signals_list = []
-        if signal_flags.get('Consolidating'):
-            signals_list.append('CONSOLIDATION')
-        if signal_flags.get('BuyDip'):
-            signals_list.append('BUY_DIP')
-        if signal_flags.get('Breakout'):
-            signals_list.append('BREAKOUT')
-        if signal_flags.get('VolSpike'):
-            signals_list.append('VOL_SPIKE')
-        if signal_flags.get('VWAPReclaim'):
-            signals_list.append('VWAP_RECLAIM')
-        if signal_flags.get('EMABullish'):
-            signals_list.append('EMA_STACK')
-        if signal_flags.get('MACDBullish'):
-            signals_list.append('MACD_BULL')
-
-        signals_str = ' + '.join(signals_list) if signals_list else 'None'
-
-        # Fundamentals (optional, slower)
-        if include_fundamentals:
-            try:
-                fundamentals = fetch_fundamentals(ticker)
-                fund_score = fundamentals.fundamental_score
-                combined_score = min(technical_score + fund_score, 10)  # Cap at 10
-
-                result = {
-                    # Core identification
-                    "Ticker": ticker,
-                    "Close": round(close, 2),
-                    "Score": combined_score,
-                    "TechnicalScore": technical_score,
-                    "FundamentalScore": fund_score,
-                    "Trend": trend,
-                    "Signals": signals_str,
-
-                    # Action & Timeframe
-                    "Action": action_info_enhanced['action'],
-                    "TimeframeLabel": action_info_enhanced['timeframe_label'],
-                    "ActionReason": action_info_enhanced['action_reason'],
-
-                    # Price Levels
-                    "EntryPrice": price_levels['entry_price'],
-                    "StopLossPrice": price_levels['stop_loss_price'],
-                    "TakeProfit1": price_levels['take_profit_1'],
-                    "TakeProfit2": price_levels['take_profit_2'],
-
-                    # Potential Moves
-                    "PotentialUp1h": potential_moves['potential_up_1h_pct'],
-                    "PotentialDown1h": potential_moves['potential_down_1h_pct'],
-                    "PotentialUp3h": potential_moves['potential_up_3h_pct'],
-                    "PotentialDown3h": potential_moves['potential_down_3h_pct'],
-                    "PotentialUp1d": potential_moves['potential_up_1d_pct'],
-                    "PotentialDown1d": potential_moves['potential_down_1d_pct'],
-                    "PotentialUp7d": potential_moves['potential_up_7d_pct'],
-                    "PotentialDown7d": potential_moves['potential_down_7d_pct'],
-
-                    # Technical Indicators
-                    "RSI": round(rsi, 2),
-                    "ADX": round(last["adx"], 2),
-                    "BBWidth_pct": round(last["bb_width"] * 100, 2),
-                    "ATR%": round(atr_pct * 100, 2),
-                    "ATRValue": round(last.get("atr_pct", 0) * close, 2),
-
-                    # Fundamentals
-                    "MarketCap": fundamentals.market_cap,
-                    "PERatio": fundamentals.pe_ratio,
-                    "RevenueGrowthPct": fundamentals.revenue_growth_pct,
-                    "ProfitMarginPct": fundamentals.profit_margin_pct,
-                    "FundamentalOutlook": fundamentals.outlook,
-                    "FundamentalReasons": fundamentals.reasons,
-
-                    # Signal Flags (boolean)
-                    "VWAPReclaim": signal_flags.get('VWAPReclaim', False),
-                    "Breakout": signal_flags.get('Breakout', False),
-                    "Consolidating": signal_flags.get('Consolidating', False),
-                }
-            except Exception:
-                # Fallback to technical only
-                result = {
-                    # Core identification
-                    "Ticker": ticker,
-                    "Close": round(close, 2),
-                    "Score": technical_score,
-                    "TechnicalScore": technical_score,
-                    "FundamentalScore": 0,
-                    "Trend": trend,
-                    "Signals": signals_str,
-
-                    # Action & Timeframe
-                    "Action": action_info_enhanced['action'],
-                    "TimeframeLabel": action_info_enhanced['timeframe_label'],
-                    "ActionReason": action_info_enhanced['action_reason'],
-
-                    # Price Levels
-                    "EntryPrice": price_levels['entry_price'],
-                    "StopLossPrice": price_levels['stop_loss_price'],
-                    "TakeProfit1": price_levels['take_profit_1'],
-                    "TakeProfit2": price_levels['take_profit_2'],
-
-                    # Potential Moves
-                    "PotentialUp1h": potential_moves['potential_up_1h_pct'],
-                    "PotentialDown1h": potential_moves['potential_down_1h_pct'],
-                    "PotentialUp3h": potential_moves['potential_up_3h_pct'],
-                    "PotentialDown3h": potential_moves['potential_down_3h_pct'],
-                    "PotentialUp1d": potential_moves['potential_up_1d_pct'],
-                    "PotentialDown1d": potential_moves['potential_down_1d_pct'],
-                    "PotentialUp7d": potential_moves['potential_up_7d_pct'],
-                    "PotentialDown7d": potential_moves['potential_down_7d_pct'],
-
-                    # Technical Indicators
-                    "RSI": round(rsi, 2),
-                    "ADX": round(last["adx"], 2),
-                    "BBWidth_pct": round(last["bb_width"] * 100, 2),
-                    "ATR%": round(atr_pct * 100, 2),
-                    "ATRValue": round(atr_pct * close, 2),
-
-                    # Fundamentals (N/A)
-                    "MarketCap": None,
-                    "PERatio": None,
-                    "RevenueGrowthPct": None,
-                    "ProfitMarginPct": None,
-                    "FundamentalOutlook": "N/A",
-                    "FundamentalReasons": "",
-
-                    # Signal Flags
-                    "VWAPReclaim": signal_flags.get('VWAPReclaim', False),
-                    "Breakout": signal_flags.get('Breakout', False),
-                    "Consolidating": signal_flags.get('Consolidating', False),
-                }
-        else:
-            # Technical only (faster)
-            result = {
-                # Core identification
-                "Ticker": ticker,
-                "Close": round(close, 2),
-                "Score": technical_score,
-                "TechnicalScore": technical_score,
-                "FundamentalScore": 0,
-                "Trend": trend,
-                "Signals": signals_str,
-
-                # Action & Timeframe
-                "Action": action_info_enhanced['action'],
-                "TimeframeLabel": action_info_enhanced['timeframe_label'],
-                "ActionReason": action_info_enhanced['action_reason'],
-
-                # Price Levels
-                "EntryPrice": price_levels['entry_price'],
-                "StopLossPrice": price_levels['stop_loss_price'],
-                "TakeProfit1": price_levels['take_profit_1'],
-                "TakeProfit2": price_levels['take_profit_2'],
-
-                # Potential Moves
-                "PotentialUp1h": potential_moves['potential_up_1h_pct'],
-                "PotentialDown1h": potential_moves['potential_down_1h_pct'],
-                "PotentialUp3h": potential_moves['potential_up_3h_pct'],
-                "PotentialDown3h": potential_moves['potential_down_3h_pct'],
-                "PotentialUp1d": potential_moves['potential_up_1d_pct'],
-                "PotentialDown1d": potential_moves['potential_down_1d_pct'],
-                "PotentialUp7d": potential_moves['potential_up_7d_pct'],
-                "PotentialDown7d": potential_moves['potential_down_7d_pct'],
-
-                # Technical Indicators
-                "RSI": round(rsi, 2),
-                "ADX": round(last["adx"], 2),
-                "BBWidth_pct": round(last["bb_width"] * 100, 2),
-                "ATR%": round(atr_pct * 100, 2),
-                "ATRValue": round(atr_pct * close, 2),
-
-                # Fundamentals (N/A)
-                "MarketCap": None,
-                "PERatio": None,
-                "RevenueGrowthPct": None,
-                "ProfitMarginPct": None,
-                "FundamentalOutlook": "N/A",
-                "FundamentalReasons": "",
-
-                # Signal Flags
-                "VWAPReclaim": signal_flags.get('VWAPReclaim', False),
-                "Breakout": signal_flags.get('Breakout', False),
-                "Consolidating": signal_flags.get('Consolidating', False),
-            }
-
-        # Add remaining signal flags
-        result['BuyDip'] = signal_flags.get('BuyDip', False)
-        result['VolSpike'] = signal_flags.get('VolSpike', False)
-        result['EMABullish'] = signal_flags.get('EMABullish', False)
-        result['MACDBullish'] = signal_flags.get('MACDBullish', False)
-
-        return result
+    row = scan_ticker_signals(ticker, cfg, include_fundamentals, prices)
+    if row is None:
+        return None
+    return score_results(pd.DataFrame([row])).iloc[0].to_dict()
 
+
+def _prefetch_prices(tickers: List[str], cfg: dict) -> Dict[str, pd.DataFrame]:
+    """Download price history for all tickers in provider-sized batches"""
+    period, history_bars = scan_history(cfg)
+    prices = get_clean_prices_many(
+        tickers,
+        period,
+        cfg["data"]["interval"],
+        cfg.get("data")
+    )
+    return tail_history(prices, history_bars)
+
+
+class TopK:
+    """
+    The k highest-scoring rows seen so far, kept in a bounded min-heap so each
+    push is O(log k). On equal scores the earlier row ranks higher.
+    k=None keeps every row.
+    """
+
+    def __init__(self, k: Optional[int] = None, key: str = "Score"):
+        self.k = k
+        self.key = key
+        self._heap = []
+        self._seq = 0
+
+    def push(self, row: Dict) -> bool:
+        """Offer a row; returns True if it is currently in the top k."""
+        if self.k is not None and self.k <= 0:
+            return False
+        # (score, -arrival) is unique, so rows themselves are never compared
+        entry = (row[self.key], -self._seq, row)
+        self._seq += 1
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def rows(self) -> List[Dict]:
+        """Current top rows, best first."""
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.rows())
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def scan_market_live_stream(
+    universe: UniverseType = "all",
+    min_score: Optional[float] = None,
+    limit: Optional[int] = None,
+    max_workers: int = 20,
+    include_fundamentals: bool = False,
+):
+    """
+    Scan like scan_market_live, but hand back rows as tickers finish instead
+    of after the slowest one.
+
+    Yields:
+        - ('progress', current, total) for every finished ticker
+        - ('result', row, top) for every scored row passing min_score, where
+          top is the running TopK(limit); top.rows() / top.frame() give the
+          best setups so far
+        - ('complete', df) once at the end: the same frame scan_market_live returns
+
+    Tickers that finish together are scored as one vectorized batch. When
+    `prefilter.enabled` is set and min_score is at least
+    `prefilter.min_score_gate`, tickers failing the cheap daily prefilter
+    (see prefilter.py) are skipped up front. Tickers
+    whose bars are unchanged since the previous scan reuse its row
+    (see scan_cache.py) and are reported first.
+    """
+    # Load config
+    try:
+        cfg = yaml.safe_load(open("config.yaml", "r"))
     except Exception as e:
-        # Silent fail for individual tickers
-        return None
+        raise RuntimeError(f"Failed to load config.yaml: {e}")
+    load_signal_plugins(cfg)
+
+    # Get tickers for universe
+    tickers = get_stock_universe(universe)
+    total_tickers = len(tickers)
+    top = TopK(limit)
+
+    if total_tickers == 0:
+        yield ('complete', pd.DataFrame())
+        return
+
+    # Cheap daily-bar stage first; only survivors get the intraday download
+    candidates = prefilter_universe(tickers, cfg, min_score)
+
+    # Batched download for the candidates; workers only do the CPU part
+    prices = _prefetch_prices(candidates, cfg)
+
+    # Tickers whose bars haven't changed since the last scan reuse that scan's row
+    row_cache = get_scan_row_cache(cfg, include_fundamentals)
+    reused = []
+    if row_cache is not None:
+        for ticker in list(prices):
+            hit, row = row_cache.get(ticker, prices[ticker], signal_floor(min_score, include_fundamentals))
+            if hit:
+                del prices[ticker]
+                if row is not None:
+                    reused.append(row)
+
+    def emit(raw):
+        for row in score_results(pd.DataFrame(raw)).to_dict("records"):
+            if min_score is not None and row["Score"] < min_score:
+                continue
+            top.push(row)
+            yield ('result', row, top)
+
+    # Pruned, unchanged and data-less tickers count as already done
+    completed = total_tickers - len(prices)
+    yield ('progress', completed, total_tickers)
+    if reused:
+        yield from emit(reused)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {
+            executor.submit(_scan_ticker_signals, ticker, cfg, include_fundamentals, frame, min_score): ticker
+            for ticker, frame in prices.items()
+        }
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                raw = []
+                for future in done:
+                    ticker = pending.pop(future)
+                    completed += 1
+                    yield ('progress', completed, total_tickers)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        # Failed scans aren't cached: the next run retries them
+                        continue
+                    if row_cache is not None and _row_cacheable(result, include_fundamentals):
+                        row_cache.put(ticker, prices[ticker], result)
+                    if result is not None:
+                        raw.append(result)
+                if raw:
+                    yield from emit(raw)
+        finally:
+            # Consumer stopped early: don't keep scanning tickers nobody will read
+            for future in pending:
+                future.cancel()
+            if row_cache is not None:
+                row_cache.save()
+                if row_cache.hits:
+                    print(f"[SCAN CACHE] Reused {row_cache.hits} unchanged tickers, rescanned {row_cache.misses}")
+
+    yield ('complete', top.frame())
 
 
 def scan_market_live(
@@ -501,7 +418,7 @@ def scan_market_live(
         progress_callback: Optional callback function(current, total) for progress updates
 
     Returns:
-        DataFrame with columns:
+        DataFrame sorted by Score (descending) with columns:
         - Ticker, Score, TechnicalScore, FundamentalScore
         - Trend, BBWidth_pct, ATR%, ADX, RSI, Close
         - MarketCap, PERatio, RevenueGrowthPct, ProfitMarginPct
@@ -509,63 +426,15 @@ def scan_market_live(
         - Action, ActionReason
         - Consolidating, BuyDip, Breakout, VolSpike
         - EMABullish, MACDBullish, VWAPReclaim
-    """
-    # Load config
-    try:
-        cfg = yaml.safe_load(open("config.yaml", "r"))
-    except Exception as e:
-        raise RuntimeError(f"Failed to load config.yaml: {e}")
-
-    # Get tickers for universe
-    tickers = get_stock_universe(universe)
-    total_tickers = len(tickers)
-
-    if total_tickers == 0:
-        return pd.DataFrame()
-
-    # Scan tickers in parallel
-    results = []
-    completed = 0
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_ticker = {
-            executor.submit(scan_single_ticker, ticker, cfg, include_fundamentals): ticker
-            for ticker in tickers
-        }
-
-        # Process completed tasks
-        for future in as_completed(future_to_ticker):
-            completed += 1
-
-            # Progress callback
-            if progress_callback:
-                progress_callback(completed, total_tickers)
-
-            result = future.result()
-            if result is not None:
-                results.append(result)
-
-    # Convert to DataFrame
-    if not results:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(results)
-
-    # Apply minimum score filter
-    if min_score is not None:
-        df = df[df["Score"] >= min_score]
-
-    # Sort by score (descending)
-    df = df.sort_values("Score", ascending=False)
-
-    # Apply limit
-    if limit is not None:
-        df = df.head(limit)
-
-    # Reset index
-    df = df.reset_index(drop=True)
 
+    Use scan_market_live_stream to see rows before the scan finishes.
+    """
+    df = pd.DataFrame()
+    for event in scan_market_live_stream(universe, min_score, limit, max_workers, include_fundamentals):
+        if event[0] == 'progress' and progress_callback:
+            progress_callback(event[1], event[2])
+        elif event[0] == 'complete':
+            df = event[1]
     return df
 
 
@@ -583,52 +452,9 @@ def scan_market_live_with_status(
         - ('progress', current, total) during scanning
         - ('complete', df) when done
     """
-    # Load config
-    cfg = yaml.safe_load(open("config.yaml", "r"))
-    tickers = get_stock_universe(universe)
-    total_tickers = len(tickers)
-
-    if total_tickers == 0:
-        yield ('complete', pd.DataFrame())
-        return
-
-    results = []
-    completed = 0
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_ticker = {
-            executor.submit(scan_single_ticker, ticker, cfg, include_fundamentals): ticker
-            for ticker in tickers
-        }
-
-        for future in as_completed(future_to_ticker):
-            completed += 1
-
-            # Yield progress
-            yield ('progress', completed, total_tickers)
-
-            result = future.result()
-            if result is not None:
-                results.append(result)
-
-    # Build DataFrame
-    if not results:
-        yield ('complete', pd.DataFrame())
-        return
-
-    df = pd.DataFrame(results)
-
-    if min_score is not None:
-        df = df[df["Score"] >= min_score]
-
-    df = df.sort_values("Score", ascending=False)
-
-    if limit is not None:
-        df = df.head(limit)
-
-    df = df.reset_index(drop=True)
-
-    yield ('complete', df)
+    for event in scan_market_live_stream(universe, min_score, limit, max_workers, include_fundamentals):
+        if event[0] != 'result':
+            yield event
 
 
 # Test function
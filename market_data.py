@@ -1,13 +1,26 @@
 """
 Unified market data fetcher supporting yfinance (default) and Polygon.io.
 """
+import hashlib
+import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Tuple
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import requests
 import yfinance as yf
+from requests.adapters import HTTPAdapter
+
+from bar_store import get_bar_store
+from singleflight import SingleFlight
 
 
 INTERVAL_MAP: Dict[str, Tuple[int, str]] = {
@@ -23,101 +36,591 @@ INTERVAL_MAP: Dict[str, Tuple[int, str]] = {
     "1d": (1, "day"),
 }
 
+# Symbols per multi-ticker yf.download call and parallel Polygon requests
+YF_BATCH_SIZE = 100
+POLYGON_MAX_WORKERS = 10
+
+POLYGON_BASE_URL = "https://api.polygon.io"
+POLYGON_RETRY_STATUSES = {429, 500, 502, 503, 504}
+POLYGON_AGG_FIELDS = {"o": "Open", "h": "High", "l": "Low", "c": "Close", "v": "Volume"}
+GROUPED_DAILY_DIR = Path(".cache") / "grouped_daily"
+
+# Download ranges yfinance accepts (shortest first) and how many calendar
+# days back each intraday interval can reach
+YF_PERIODS = ("5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y")
+YF_INTRADAY_MAX_DAYS = {"1m": 7, "2m": 60, "5m": 60, "15m": 60, "30m": 60, "45m": 60,
+                        "1h": 730, "2h": 730, "4h": 730}
+SESSION_MINUTES = 390
+
+_price_flights = SingleFlight()
+
+
+def _split_period(period: str) -> Tuple[int, str]:
+    """Split a yfinance-style period ('5d', '3mo', '1y', '2wk') into (value, unit)."""
+    digits = "".join(ch for ch in period if ch.isdigit())
+    unit = period[len(digits):]
+    return int(digits), unit
+
 
 def _parse_period_days(period: str) -> int:
     """Convert yfinance-style period to days."""
     if not period:
         return 5
+    if period == "ytd":
+        return datetime.now(timezone.utc).timetuple().tm_yday
+    if period == "max":
+        return 365 * 30
     try:
-        value = int(period[:-1])
-        unit = period[-1]
+        value, unit = _split_period(period)
     except (ValueError, TypeError):
         return 5
 
     if unit == "d":
         return value
-    if unit == "w":
+    if unit in ("w", "wk"):
         return value * 7
-    if unit == "m":
+    if unit in ("m", "mo"):
         return value * 30
     if unit == "y":
         return value * 365
     return 5
 
 
+def _period_sessions(period: str) -> int:
+    """Approximate number of trading sessions in a yfinance-style period."""
+    try:
+        value, unit = _split_period(period)
+    except (ValueError, TypeError):
+        value, unit = 0, ""
+    if unit == "d":
+        return value
+    return max(int(_parse_period_days(period) * 5 / 7), 1)
+
+
+def bars_per_session(interval: str) -> int:
+    """Regular-hours bars of `interval` in one trading session."""
+    multiplier, unit = INTERVAL_MAP[interval]
+    if unit == "day":
+        return 1
+    minutes = multiplier * (60 if unit == "hour" else 1)
+    return -(-SESSION_MINUTES // minutes)
+
+
+def period_for_bars(bars: int, interval: str) -> str:
+    """
+    Shortest download period expected to hold `bars` bars of `interval`.
+    When none does, the longest period the interval can be fetched for.
+    """
+    sessions = -(-bars // bars_per_session(interval))
+    max_days = YF_INTRADAY_MAX_DAYS.get(interval)
+    candidates = [p for p in YF_PERIODS if max_days is None or _parse_period_days(p) <= max_days]
+    if max_days is not None:
+        candidates.append(f"{max_days}d")
+    for period in candidates:
+        # The intraday cap is in calendar days, about 5/7 of them sessions
+        available = max(max_days * 5 // 7, 1) if period == f"{max_days}d" else _period_sessions(period)
+        if available >= sessions:
+            return period
+    return candidates[-1] if max_days is not None else "max"
+
+
+def _as_utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _trim_to_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Cut stored history down to what a fresh download of `period` would return."""
+    if df.empty or not period or period == "max":
+        return df
+    if period == "ytd":
+        return df[df.index >= df.index[-1].replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)]
+    try:
+        value, unit = _split_period(period)
+    except (ValueError, TypeError):
+        return df
+
+    if unit == "d":
+        # yfinance counts day periods in sessions, not calendar days
+        dates = df.index.normalize()
+        sessions = dates.unique()
+        if len(sessions) <= value:
+            return df
+        return df[dates >= sessions[-value]]
+
+    offsets = {"w": "weeks", "wk": "weeks", "m": "months", "mo": "months", "y": "years"}
+    if unit not in offsets:
+        return df
+    cutoff = df.index[-1] - pd.DateOffset(**{offsets[unit]: value})
+    return df[df.index > cutoff]
+
+
+def _top_up_start(cached: pd.DataFrame, period: str):
+    """
+    Timestamp to resume downloading from, or None when the stored history
+    doesn't cover `period` (or is too old to top up) and a full fetch is needed.
+    """
+    if cached.empty:
+        return None
+    window_start = pd.Timestamp.now(tz="UTC") - timedelta(days=_parse_period_days(period))
+    last = _as_utc(cached.index[-1])
+    if last < window_start:
+        return None
+    covered = len(_trim_to_period(cached, period)) < len(cached) or _as_utc(cached.index[0]) <= window_start
+    return last if covered else None
+
+
 def fetch_price_history(ticker: str, period: str, interval: str, provider: str = "yfinance",
                         data_cfg: Dict = None) -> pd.DataFrame:
     """
     Fetch OHLCV price history using the configured provider.
 
     provider: 'polygon' or 'yfinance'
+
+    When `data.bar_store.enabled` is set, history is served from the local
+    bar store and only bars after the last stored timestamp are downloaded.
     """
     data_cfg = data_cfg or {}
     provider = (provider or data_cfg.get("provider") or "yfinance").lower()
 
+    # Concurrent identical requests share one download; every caller gets its
+    # own copy because downstream code mutates frames in place
+    key = (ticker.upper(), period, interval, provider, data_cfg_fingerprint(data_cfg))
+    df = _price_flights.do(key, _fetch_price_history, ticker, period, interval, provider, data_cfg)
+    return df.copy()
+
+
+def data_cfg_fingerprint(data_cfg: Dict) -> str:
+    """Stable hash of a data config; calls with different stores, keys or endpoints never share a flight."""
+    return hashlib.sha1(json.dumps(data_cfg or {}, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _fetch_price_history(ticker: str, period: str, interval: str, provider: str, data_cfg: Dict) -> pd.DataFrame:
+    store = get_bar_store(data_cfg)
+    if store is None:
+        return _fetch_uncached(ticker, period, interval, provider, data_cfg)
+
+    cached, start = _stored_window(store, ticker, period, interval)
+    fresh = _fetch_uncached(ticker, period, interval, provider, data_cfg, start=start)
+    return _store_fresh(store, ticker, period, interval, cached, start, fresh)
+
+
+def _stored_window(store, ticker: str, period: str, interval: str) -> Tuple[pd.DataFrame, Optional[pd.Timestamp]]:
+    """(stored bars, timestamp to top up from); start is None when a full download is needed."""
+    cached = store.load(ticker, interval)
+    return cached, _top_up_start(cached, period)
+
+
+def _store_fresh(store, ticker: str, period: str, interval: str, cached: pd.DataFrame, start,
+                 fresh: pd.DataFrame) -> pd.DataFrame:
+    """Merge freshly downloaded bars into the store and return the `period` window."""
+    merged = store.merge(ticker, interval, cached if start is not None else pd.DataFrame(), fresh)
+    return _trim_to_period(merged, period)
+
+
+def _fetch_uncached(ticker: str, period: str, interval: str, provider: str, data_cfg: Dict,
+                    start=None) -> pd.DataFrame:
     if provider == "polygon":
-        df = _fetch_polygon_prices(ticker, period, interval, data_cfg)
+        df = _fetch_polygon_prices(ticker, period, interval, data_cfg, start=start)
         if not df.empty:
             return df
         print(f"[POLYGON] Falling back to yfinance for {ticker}")
 
-    return _fetch_yfinance_prices(ticker, period, interval)
+    return _fetch_yfinance_prices(ticker, period, interval, start=start)
+
+
+def fetch_price_history_many(tickers: Iterable[str], period: str, interval: str,
+                             provider: str = "yfinance", data_cfg: Dict = None) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch OHLCV price history for many tickers with as few round-trips as possible.
+
+    yfinance symbols are grouped into chunks of `data.batch_size` (one
+    multi-symbol download per chunk); Polygon symbols are requested in parallel
+    with `data.max_workers` threads and any misses fall back to yfinance.
+    With the bar store enabled, tickers that already have history are topped up
+    with a single delta download per chunk. Daily Polygon bars can instead be
+    built from grouped-daily calls (`data.polygon_grouped_daily`).
+
+    Returns a dict of ticker -> DataFrame in input order. Tickers without data
+    are omitted. Concurrent identical requests (e.g. two dashboard sessions
+    scanning the same universe) share one download.
+    """
+    data_cfg = data_cfg or {}
+    provider = (provider or data_cfg.get("provider") or "yfinance").lower()
+    tickers = list(dict.fromkeys(tickers))
+
+    key = ("many", tuple(t.upper() for t in tickers), period, interval, provider, data_cfg_fingerprint(data_cfg))
+    frames = _price_flights.do(key, _fetch_price_history_many, tickers, period, interval, provider, data_cfg)
+    return {ticker: df.copy() for ticker, df in frames.items()}
+
 
+def _fetch_price_history_many(tickers: List[str], period: str, interval: str, provider: str,
+                              data_cfg: Dict) -> Dict[str, pd.DataFrame]:
+    if provider == "polygon" and interval == "1d" and data_cfg.get("polygon_grouped_daily", False):
+        frames = fetch_grouped_daily_panel(tickers, period, data_cfg)
+        missing = [t for t in tickers if t not in frames]
+        if missing:
+            # Symbols absent from the grouped feed go through the regular path
+            frames.update(_fetch_many_uncached(missing, period, interval, provider, data_cfg))
+        return {t: frames[t] for t in tickers if t in frames}
 
-def _fetch_yfinance_prices(ticker: str, period: str, interval: str) -> pd.DataFrame:
-    df = yf.download(ticker, period=period, interval=interval, progress=False, auto_adjust=True)
+    store = get_bar_store(data_cfg)
+    if store is None:
+        return _fetch_many_uncached(tickers, period, interval, provider, data_cfg)
+
+    cached = {t: store.load(t, interval) for t in tickers}
+    starts = {t: _top_up_start(cached[t], period) for t in tickers}
+    top_up = [t for t in tickers if starts[t] is not None]
+
+    fresh = _fetch_many_uncached([t for t in tickers if starts[t] is None], period, interval, provider, data_cfg)
+    if top_up:
+        earliest = min(starts[t] for t in top_up)
+        fresh.update(_fetch_many_uncached(top_up, period, interval, provider, data_cfg, start=earliest))
+
+    frames: Dict[str, pd.DataFrame] = {}
+    for ticker in tickers:
+        base = cached[ticker] if starts[ticker] is not None else pd.DataFrame()
+        merged = store.merge(ticker, interval, base, fresh.get(ticker, pd.DataFrame()))
+        if not merged.empty:
+            frames[ticker] = _trim_to_period(merged, period)
+    return frames
+
+
+def _fetch_many_uncached(tickers: List[str], period: str, interval: str, provider: str, data_cfg: Dict,
+                         start=None) -> Dict[str, pd.DataFrame]:
+    if not tickers:
+        return {}
+    frames: Dict[str, pd.DataFrame] = {}
+
+    if provider == "polygon":
+        max_workers = data_cfg.get("max_workers", POLYGON_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_ticker = {
+                executor.submit(_fetch_polygon_prices, ticker, period, interval, data_cfg, start): ticker
+                for ticker in tickers
+            }
+            for future in as_completed(future_to_ticker):
+                df = future.result()
+                if not df.empty:
+                    frames[future_to_ticker[future]] = df
+        missing = [t for t in tickers if t not in frames]
+        if missing:
+            print(f"[POLYGON] Falling back to yfinance for {len(missing)} tickers")
+    else:
+        missing = tickers
+
+    for chunk in _chunked(missing, data_cfg.get("batch_size", YF_BATCH_SIZE)):
+        frames.update(_fetch_yfinance_prices_many(chunk, period, interval, start=start))
+
+    return {t: frames[t] for t in tickers if t in frames}
+
+
+def _chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    size = max(int(size), 1)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _yf_range(period: str, start) -> Dict:
+    return {"start": start} if start is not None else {"period": period}
+
+
+def _fetch_yfinance_prices(ticker: str, period: str, interval: str, start=None) -> pd.DataFrame:
+    df = yf.download(ticker, interval=interval, progress=False, auto_adjust=True, **_yf_range(period, start))
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = df.columns.get_level_values(0)
     return df
 
 
-def _fetch_polygon_prices(ticker: str, period: str, interval: str, data_cfg: Dict) -> pd.DataFrame:
-    api_key = os.getenv(data_cfg.get("polygon_api_key_env", "POLYGON_API_KEY"), data_cfg.get("polygon_api_key"))
+def _fetch_yfinance_prices_many(tickers: List[str], period: str, interval: str,
+                                start=None) -> Dict[str, pd.DataFrame]:
+    try:
+        df = yf.download(tickers, interval=interval, progress=False, auto_adjust=True,
+                         group_by="ticker", threads=True, **_yf_range(period, start))
+    except Exception as exc:
+        print(f"[YFINANCE ERROR] batch of {len(tickers)}: {exc}")
+        return {}
+    return split_multi_ticker_frame(df, tickers)
+
+
+def split_multi_ticker_frame(df: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Split a multi-symbol yf.download result into per-ticker OHLCV frames."""
+    if df is None or df.empty:
+        return {}
+
+    if not isinstance(df.columns, pd.MultiIndex):
+        # Single-symbol downloads come back flat
+        return {tickers[0]: df} if len(tickers) == 1 else {}
+
+    # group_by="ticker" puts symbols on level 0, the default layout on level 1
+    level = 0 if set(tickers) & set(df.columns.get_level_values(0)) else 1
+    available = set(df.columns.get_level_values(level))
+
+    frames: Dict[str, pd.DataFrame] = {}
+    for ticker in tickers:
+        if ticker not in available:
+            continue
+        sub = df.xs(ticker, axis=1, level=level).dropna(how="all")
+        if not sub.empty:
+            sub.columns.name = None
+            frames[ticker] = sub
+    return frames
+
+
+class PolygonClient:
+    """
+    Shared Polygon HTTP client.
+
+    Keeps a keep-alive connection pool sized to the number of concurrent
+    workers and retries 429/5xx responses and connection errors with
+    exponential backoff (full jitter), honoring Retry-After when present.
+    """
+
+    def __init__(self, base_url: str = POLYGON_BASE_URL, pool_size: int = POLYGON_MAX_WORKERS,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 timeout: float = 15.0):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_json(self, url: str, params: Dict = None) -> Dict:
+        """GET url and return the decoded JSON body, retrying transient failures."""
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                resp = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if resp.status_code in POLYGON_RETRY_STATUSES and not last_attempt:
+                delay = self._retry_after(resp)
+                time.sleep(delay if delay is not None else self._backoff(attempt))
+                continue
+
+            resp.raise_for_status()
+            return resp.json()
+
+    def _backoff(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max)
+
+    def _retry_after(self, resp: requests.Response) -> Optional[float]:
+        return retry_after_seconds(resp.headers.get("Retry-After"), self.backoff_max)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_seconds(value: Optional[str], cap: float) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date), capped at `cap`."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), cap)
+
+
+_polygon_clients: Dict[tuple, PolygonClient] = {}
+_polygon_clients_lock = threading.Lock()
+
+
+def get_polygon_client(data_cfg: Dict = None) -> PolygonClient:
+    """Return the process-wide Polygon client for this data config."""
+    data_cfg = data_cfg or {}
+    settings = (
+        data_cfg.get("polygon_base_url", POLYGON_BASE_URL),
+        data_cfg.get("max_workers", POLYGON_MAX_WORKERS),
+        data_cfg.get("max_retries", 4),
+        data_cfg.get("request_timeout", 15.0),
+    )
+    with _polygon_clients_lock:
+        if settings not in _polygon_clients:
+            base_url, pool_size, max_retries, timeout = settings
+            _polygon_clients[settings] = PolygonClient(
+                base_url=base_url, pool_size=pool_size, max_retries=max_retries, timeout=timeout
+            )
+        return _polygon_clients[settings]
+
+
+def _fetch_polygon_prices(ticker: str, period: str, interval: str, data_cfg: Dict, start=None) -> pd.DataFrame:
+    api_key = polygon_api_key(data_cfg)
     if not api_key:
         print("[POLYGON] API key not configured. Set POLYGON_API_KEY env var.")
         return pd.DataFrame()
 
+    client = get_polygon_client(data_cfg)
+    url, params = polygon_aggs_request(client.base_url, ticker, period, interval, api_key, start=start)
+    try:
+        chunks = list(_iter_polygon_aggs(client, url, params))
+    except Exception as exc:
+        print(f"[POLYGON ERROR] {ticker}: {exc}")
+        return pd.DataFrame()
+    return _concat_polygon_chunks(chunks)
+
+
+def polygon_api_key(data_cfg: Dict) -> Optional[str]:
+    return os.getenv(data_cfg.get("polygon_api_key_env", "POLYGON_API_KEY"), data_cfg.get("polygon_api_key"))
+
+
+def polygon_aggs_request(base_url: str, ticker: str, period: str, interval: str, api_key: str,
+                         start=None) -> Tuple[str, Dict]:
+    """(url, params) for the first page of a Polygon aggregates request."""
     multiplier, timespan = INTERVAL_MAP.get(interval, (15, "minute"))
     end_dt = datetime.now(timezone.utc)
-    start_dt = end_dt - timedelta(days=_parse_period_days(period))
+    if start is not None:
+        start_dt = _as_utc(start).to_pydatetime()
+    else:
+        start_dt = end_dt - timedelta(days=_parse_period_days(period))
 
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{start_dt:%Y-%m-%d}/{end_dt:%Y-%m-%d}"
+    url = f"{base_url}/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{start_dt:%Y-%m-%d}/{end_dt:%Y-%m-%d}"
     params = {
         "adjusted": "true",
         "sort": "asc",
         "limit": 50000,
         "apiKey": api_key,
     }
+    return url, params
+
+
+def _iter_polygon_aggs(client: PolygonClient, url: str, params: Dict) -> Iterator[pd.DataFrame]:
+    """
+    Yield one OHLCV frame per page of a Polygon aggregates response, following
+    `next_url` until the window is exhausted.
+    """
+    while url:
+        chunk, url, params = polygon_aggs_page(client.get_json(url, params=params), params)
+        if not chunk.empty:
+            yield chunk
+
+
+def polygon_aggs_page(payload: Dict, params: Dict) -> Tuple[pd.DataFrame, Optional[str], Dict]:
+    """
+    Decode one aggregates page: (bars, next_url or None, params for next_url).
+    Shared by the sync client and async_market_data.
+    """
+    chunk = _polygon_results_to_frame(payload.get("results") or [])
+    # next_url already carries the cursor and query; only the key must be re-sent
+    return chunk, payload.get("next_url"), {"apiKey": params["apiKey"]}
+
+
+def _concat_polygon_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    if not chunks:
+        return pd.DataFrame()
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+    return df[~df.index.duplicated(keep="last")]
+
+
+def _polygon_results_to_frame(results: List[Dict]) -> pd.DataFrame:
+    """Convert a Polygon `results` array to an OHLCV frame column by column."""
+    if not results:
+        return pd.DataFrame()
+
+    count = len(results)
+    timestamps = np.fromiter((bar["t"] for bar in results), dtype=np.int64, count=count)
+    columns = {
+        column: np.fromiter((bar.get(key, np.nan) for bar in results), dtype=np.float64, count=count)
+        for key, column in POLYGON_AGG_FIELDS.items()
+    }
+
+    # Naive UTC index for downstream compatibility
+    index = pd.to_datetime(timestamps, unit="ms")
+    index.name = "Datetime"
+    return pd.DataFrame(columns, index=index)
+
+
+def fetch_grouped_daily_panel(tickers: Iterable[str], period: str, data_cfg: Dict = None) -> Dict[str, pd.DataFrame]:
+    """
+    Build daily OHLCV frames for a whole universe from Polygon's grouped-daily
+    endpoint: one request per trading day covers every US ticker. Completed
+    days are cached on disk, so after the first run a daily scan costs a single
+    request for the current session.
+
+    Returns a dict of ticker -> DataFrame (naive session-date index).
+    """
+    data_cfg = data_cfg or {}
+    api_key = polygon_api_key(data_cfg)
+    if not api_key:
+        print("[POLYGON] API key not configured. Set POLYGON_API_KEY env var.")
+        return {}
+
+    today = pd.Timestamp.now(tz="America/New_York").normalize().tz_localize(None)
+    days = pd.bdate_range(end=today, periods=_period_sessions(period) + 1)
+    cache_dir = Path(data_cfg.get("grouped_daily_dir", GROUPED_DAILY_DIR))
+    client = get_polygon_client(data_cfg)
+
+    with ThreadPoolExecutor(max_workers=data_cfg.get("max_workers", POLYGON_MAX_WORKERS)) as executor:
+        day_frames = list(executor.map(
+            lambda day: _load_grouped_day(client, day, api_key, cache_dir, cache=day < today), days
+        ))
+
+    day_frames = [frame for frame in day_frames if not frame.empty]
+    if not day_frames:
+        return {}
+    panel = pd.concat(day_frames)
+
+    # Polygon uses class-share dots (BRK.B) where yfinance uses dashes (BRK-B)
+    wanted = {t.replace("-", "."): t for t in tickers}
+    panel = panel[panel["Ticker"].isin(list(wanted))]
+
+    frames: Dict[str, pd.DataFrame] = {}
+    for symbol, group in panel.groupby("Ticker", sort=False):
+        frame = group.drop(columns="Ticker").sort_index()
+        frames[wanted[symbol]] = _trim_to_period(frame, period)
+    return frames
+
 
+def _load_grouped_day(client: PolygonClient, day: pd.Timestamp, api_key: str, cache_dir: Path,
+                      cache: bool = True) -> pd.DataFrame:
+    """Grouped-daily bars for one session as a long frame (Ticker + OHLCV), cached per day."""
+    path = cache_dir / f"{day:%Y-%m-%d}.npz"
+    if cache and path.exists():
+        try:
+            with np.load(path) as stored:
+                return _grouped_frame(day, stored["Ticker"], {col: stored[col] for col in POLYGON_AGG_FIELDS.values()})
+        except Exception as exc:
+            print(f"[POLYGON] Ignoring unreadable grouped-daily cache {path}: {exc}")
+
+    url = f"{client.base_url}/v2/aggs/grouped/locale/us/market/stocks/{day:%Y-%m-%d}"
     try:
-        resp = requests.get(url, params=params, timeout=15)
-        resp.raise_for_status()
-        payload = resp.json()
+        payload = client.get_json(url, params={"adjusted": "true", "apiKey": api_key})
     except Exception as exc:
-        print(f"[POLYGON ERROR] {ticker}: {exc}")
+        print(f"[POLYGON ERROR] grouped daily {day:%Y-%m-%d}: {exc}")
         return pd.DataFrame()
 
     results = payload.get("results") or []
-    if not results:
-        return pd.DataFrame()
+    symbols = np.array([bar.get("T", "") for bar in results], dtype=str)
+    columns = _polygon_results_to_frame(results).to_dict("series") if results else {
+        col: np.empty(0) for col in POLYGON_AGG_FIELDS.values()
+    }
+    columns = {col: np.asarray(values, dtype=np.float64) for col, values in columns.items()}
 
-    records = []
-    for bar in results:
-        ts = datetime.fromtimestamp(bar["t"] / 1000, tz=timezone.utc)
-        records.append({
-            "Datetime": ts,
-            "Open": bar.get("o"),
-            "High": bar.get("h"),
-            "Low": bar.get("l"),
-            "Close": bar.get("c"),
-            "Volume": bar.get("v"),
-        })
-
-    df = pd.DataFrame.from_records(records)
-    if df.empty:
-        return df
+    # Holidays come back empty; caching them avoids asking again
+    if cache:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, Ticker=symbols, **columns)
+    return _grouped_frame(day, symbols, columns)
 
-    df.set_index("Datetime", inplace=True)
-    # Convert timezone to naive for downstream compatibility
-    df.index = df.index.tz_convert(None)
-    return df
+
+def _grouped_frame(day: pd.Timestamp, symbols: np.ndarray, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    if len(symbols) == 0:
+        return pd.DataFrame()
+    index = pd.DatetimeIndex(np.full(len(symbols), day.to_datetime64()), name="Date")
+    frame = pd.DataFrame({col: np.asarray(values) for col, values in columns.items()}, index=index)
+    frame.insert(0, "Ticker", symbols)
+    return frame
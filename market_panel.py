@@ -0,0 +1,163 @@
+"""
+Universe-wide columnar OHLCV panel.
+
+Instead of one small DataFrame per ticker, a MarketPanel holds the whole
+universe in contiguous NumPy arrays shaped ticker x time x field, so indicator
+and signal code can run over every ticker in one vectorized pass.
+
+Layout: each ticker's bars are packed right-aligned, so column -1 is the
+latest bar for every ticker and column -1 - k is its k-th previous bar.
+Shorter histories are padded on the left; `mask` marks the real bars and
+`timestamps` holds each bar's own time (UTC ns), so tickers with gaps or late
+listings never get NaN holes in the middle of their series.
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_data import fetch_price_history_many, split_multi_ticker_frame
+
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+NAT = np.iinfo(np.int64).min
+
+
+class MarketPanel:
+    """
+    data:       float32 [ticker, time, field] (NaN where mask is False)
+    mask:       bool    [ticker, time]
+    timestamps: int64   [ticker, time] UTC nanoseconds (NAT where mask is False)
+    """
+
+    fields = FIELDS
+
+    def __init__(self, tickers: List[str], data: np.ndarray, mask: np.ndarray, timestamps: np.ndarray,
+                 tz: Optional[str] = None, index_name: Optional[str] = None):
+        if data.shape[:2] != mask.shape or mask.shape != timestamps.shape or data.shape[2] != len(FIELDS):
+            raise ValueError(f"Inconsistent panel shapes: data {data.shape}, mask {mask.shape}, "
+                             f"timestamps {timestamps.shape}")
+        self.tickers = list(tickers)
+        self.ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self.data = data
+        self.mask = mask
+        self.timestamps = timestamps
+        self.tz = tz
+        self.index_name = index_name
+
+    # ------------------------------------------------------------------
+    # Builders
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], max_bars: int = None) -> "MarketPanel":
+        """Pack {ticker: OHLCV frame}; keeps the newest `max_bars` bars per ticker."""
+        cleaned = {}
+        tz = index_name = None
+        for ticker, df in frames.items():
+            if df is None or df.empty or not set(FIELDS[:4]) <= set(df.columns):
+                continue
+            values = _field_values(df)
+            valid = np.isfinite(values[:, :4]).all(axis=1)
+            if not valid.any():
+                continue
+            index = pd.DatetimeIndex(df.index)
+            if not cleaned:
+                tz = str(index.tz) if index.tz is not None else None
+                index_name = index.name
+            utc = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+            ts = utc.as_unit("ns").asi8
+            values, ts = values[valid], ts[valid]
+            if max_bars:
+                values, ts = values[-max_bars:], ts[-max_bars:]
+            cleaned[ticker] = (values, ts)
+
+        n_bars = max((len(ts) for _, ts in cleaned.values()), default=0)
+        data = np.full((len(cleaned), n_bars, len(FIELDS)), np.nan, dtype=np.float32)
+        mask = np.zeros((len(cleaned), n_bars), dtype=bool)
+        timestamps = np.full((len(cleaned), n_bars), NAT, dtype=np.int64)
+        for i, (values, ts) in enumerate(cleaned.values()):
+            start = n_bars - len(ts)
+            data[i, start:] = values
+            mask[i, start:] = True
+            timestamps[i, start:] = ts
+        return cls(list(cleaned), data, mask, timestamps, tz=tz, index_name=index_name)
+
+    @classmethod
+    def from_yf_download(cls, df: pd.DataFrame, tickers: List[str], max_bars: int = None) -> "MarketPanel":
+        """Pack a multi-symbol yf.download result (either column layout)."""
+        return cls.from_frames(split_multi_ticker_frame(df, tickers), max_bars=max_bars)
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.ticker_index
+
+    @property
+    def n_bars(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of real bars per ticker."""
+        return self.mask.sum(axis=1)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.mask.nbytes + self.timestamps.nbytes
+
+    def field(self, name: str) -> np.ndarray:
+        """[ticker, time] view of one field."""
+        return self.data[:, :, FIELDS.index(name)]
+
+    def latest(self) -> pd.DataFrame:
+        """Most recent bar per ticker as a ticker-indexed frame."""
+        return pd.DataFrame(self.data[:, -1, :], index=pd.Index(self.tickers, name="Ticker"),
+                            columns=list(FIELDS)) if self.n_bars else pd.DataFrame(columns=list(FIELDS))
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """Rebuild one ticker's OHLCV frame (real bars only, original timezone)."""
+        i = self.ticker_index[ticker]
+        row_mask = self.mask[i]
+        index = pd.to_datetime(self.timestamps[i, row_mask], unit="ns", utc=True)
+        index = index.tz_convert(self.tz) if self.tz else index.tz_convert(None)
+        index.name = self.index_name
+        return pd.DataFrame(self.data[i, row_mask].astype("f8"), index=index, columns=list(FIELDS))
+
+    def to_frames(self) -> Dict[str, pd.DataFrame]:
+        return {ticker: self.frame(ticker) for ticker in self.tickers}
+
+    def subset(self, tickers: Iterable[str]) -> "MarketPanel":
+        """Panel restricted to `tickers` (unknown symbols are skipped)."""
+        rows = [self.ticker_index[t] for t in tickers if t in self.ticker_index]
+        mask = self.mask[rows]
+        # Drop leading columns that are now padding for every remaining ticker
+        start = int(np.argmax(mask.any(axis=0))) if mask.any() else self.n_bars
+        return MarketPanel([self.tickers[r] for r in rows], self.data[rows, start:], mask[:, start:],
+                           self.timestamps[rows, start:], tz=self.tz, index_name=self.index_name)
+
+
+def _field_values(df: pd.DataFrame) -> np.ndarray:
+    """[bar, field] float64 values (non-numeric columns coerced, missing ones NaN)."""
+    out = np.empty((len(df), len(FIELDS)))
+    for j, col in enumerate(FIELDS):
+        if col not in df.columns:
+            out[:, j] = np.nan
+            continue
+        series = df[col]
+        if series.dtype.kind not in "fiu":
+            series = pd.to_numeric(series, errors="coerce")
+        out[:, j] = series.to_numpy(dtype="f8")
+    return out
+
+
+def fetch_market_panel(tickers: Iterable[str], period: str, interval: str, provider: str = "yfinance",
+                       data_cfg: Dict = None, max_bars: int = None) -> MarketPanel:
+    """Batched download straight into a MarketPanel."""
+    frames = fetch_price_history_many(tickers, period, interval, provider=provider, data_cfg=data_cfg)
+    return MarketPanel.from_frames(frames, max_bars=max_bars)
@@ -19,6 +19,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from top_performers_scanner import get_stock_universe
 from scan_and_chart import add_indicators
+import scoring
+from market_data import fetch_price_history_many
 
 # Page config
 st.set_page_config(
@@ -49,59 +51,6 @@ st.markdown("""
 # DATA FETCHING
 # ============================================================
 
-def calculate_signal_score(rsi, adx, change_pct, weekly_pct, vol_ratio):
-    """Calculate signal score (1-10) based on technical indicators"""
-    score = 5  # Base score
-
-    # RSI scoring
-    if 30 <= rsi <= 70:
-        score += 1  # Healthy range
-    if rsi < 30:
-        score += 2  # Oversold - potential buy
-    if rsi > 70:
-        score -= 1  # Overbought
-
-    # ADX (trend strength)
-    if adx > 25:
-        score += 1  # Strong trend
-    if adx > 40:
-        score += 1  # Very strong trend
-
-    # Momentum
-    if change_pct > 1:
-        score += 1
-    if weekly_pct > 3:
-        score += 1
-
-    # Volume confirmation
-    if vol_ratio > 1.5:
-        score += 1
-
-    return max(1, min(10, score))
-
-
-def get_action_signal(score, rsi, change_pct, weekly_pct):
-    """Determine action signal based on score and indicators"""
-    if score >= 8 and rsi < 65 and weekly_pct > 0:
-        return 'BUY'
-    elif score >= 6 and rsi < 70:
-        return 'WATCH'
-    elif rsi > 75:
-        return 'TAKE_PROFIT'
-    elif score <= 3 or (rsi > 70 and change_pct < -1):
-        return 'AVOID'
-    else:
-        return 'HOLD'
-
-
-def calculate_targets(price, atr_pct):
-    """Calculate entry, stop loss, and take profit targets"""
-    stop_loss = price * (1 - atr_pct * 1.5 / 100)
-    tp1 = price * (1 + atr_pct * 1.5 / 100)
-    tp2 = price * (1 + atr_pct * 3 / 100)
-    return round(stop_loss, 2), round(tp1, 2), round(tp2, 2)
-
-
 # Fallback stock list if Wikipedia fails
 FALLBACK_STOCKS = [
     'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'BRK-B', 'JPM', 'V',
@@ -144,16 +93,21 @@ def fetch_all_stocks():
 
     total = len(tickers)
 
+    # Download daily bars for the whole universe at once (batched / grouped-daily)
+    status_text.text(f"Downloading daily bars for {total} stocks...")
+    data_cfg = cfg.get("data", {})
+    frames = fetch_price_history_many(tickers, period="1mo", interval="1d",
+                                      provider=data_cfg.get("provider", "yfinance"), data_cfg=data_cfg)
+
     for i, ticker in enumerate(tickers):
         if i % 10 == 0:
             status_text.text(f"Analyzing {ticker}... ({i}/{total} stocks)")
             progress_bar.progress(min(i / total, 1.0))
 
         try:
-            # Download more data for technical analysis
-            ticker_data = yf.download(ticker, period="1mo", interval="1d", progress=False)
+            ticker_data = frames.get(ticker)
 
-            if ticker_data.empty or len(ticker_data) < 10:
+            if ticker_data is None or ticker_data.empty or len(ticker_data) < 10:
                 continue
 
             # Flatten columns if needed
@@ -162,12 +116,12 @@ def fetch_all_stocks():
 
             # Add technical indicators
             try:
-                ticker_data = add_indicators(ticker_data, cfg)
+                ticker_data = add_indicators(ticker_data, cfg, columns=('rsi', 'adx', 'atr_pct'))
             except:
                 # Basic indicators if add_indicators fails
-                ticker_data['RSI'] = 50
-                ticker_data['ADX'] = 20
-                ticker_data['ATR%'] = 2
+                ticker_data['rsi'] = 50
+                ticker_data['adx'] = 20
+                ticker_data['atr_pct'] = 0.02
 
             if ticker_data.empty:
                 continue
@@ -189,27 +143,9 @@ def fetch_all_stocks():
             vol_ratio = volume / avg_volume if avg_volume > 0 else 1
 
             # Technical indicators
-            rsi = float(latest.get('RSI', 50))
-            adx = float(latest.get('ADX', 20))
-            atr_pct = float(latest.get('ATR%', 2))
-
-            # Calculate score and signal
-            score = calculate_signal_score(rsi, adx, change_pct, weekly_pct, vol_ratio)
-            action = get_action_signal(score, rsi, change_pct, weekly_pct)
-
-            # Calculate targets
-            stop, tp1, tp2 = calculate_targets(current, atr_pct)
-
-            # Prediction
-            if score >= 7 and weekly_pct > 0:
-                prediction = f"+{atr_pct * 1.5:.1f}%"
-                outlook = 'BULLISH'
-            elif score <= 4 or rsi > 70:
-                prediction = f"-{atr_pct:.1f}%"
-                outlook = 'BEARISH'
-            else:
-                prediction = f"±{atr_pct * 0.5:.1f}%"
-                outlook = 'NEUTRAL'
+            rsi = float(latest.get('rsi', 50))
+            adx = float(latest.get('adx', 20))
+            atr_pct = float(latest.get('atr_pct', 0.02)) * 100
 
             results.append({
                 'Ticker': ticker,
@@ -220,14 +156,9 @@ def fetch_all_stocks():
                 'Vol_Ratio': round(vol_ratio, 2),
                 'RSI': round(rsi, 1),
                 'ADX': round(adx, 1),
-                'Score': score,
-                'Action': action,
-                'Prediction': prediction,
-                'Outlook': outlook,
-                'Stop': stop,
-                'TP1': tp1,
-                'TP2': tp2,
-                'Status': 'UP' if change_pct > 0 else 'DOWN' if change_pct < 0 else 'FLAT'
+                'Status': 'UP' if change_pct > 0 else 'DOWN' if change_pct < 0 else 'FLAT',
+                '_rsi': rsi, '_adx': adx, '_atr_pct': atr_pct,
+                '_change_pct': change_pct, '_weekly_pct': weekly_pct, '_vol_ratio': vol_ratio,
             })
 
         except Exception:
@@ -240,7 +171,36 @@ def fetch_all_stocks():
         st.error("No stocks loaded. Check your internet connection.")
         return pd.DataFrame()
 
-    return pd.DataFrame(results)
+    return score_stocks(pd.DataFrame(results))
+
+
+def _pct_text(values):
+    return np.char.mod("%.1f%%", values).astype(object)
+
+
+def score_stocks(df):
+    """Score, action, targets and prediction for every row at once (see scoring)"""
+    rsi, atr_pct = df['_rsi'].to_numpy(), df['_atr_pct'].to_numpy()
+    change_pct, weekly_pct = df['_change_pct'].to_numpy(), df['_weekly_pct'].to_numpy()
+    score = scoring.heuristic_scores(rsi, df['_adx'], change_pct, weekly_pct, df['_vol_ratio'])
+    targets = scoring.atr_targets(df['Price'], atr_pct)
+
+    # Prediction
+    bullish = (score >= 7) & (weekly_pct > 0)
+    bearish = ~bullish & ((score <= 4) | (rsi > 70))
+    prediction = np.select([bullish, bearish], ["+" + _pct_text(atr_pct * 1.5), "-" + _pct_text(atr_pct)],
+                           "±" + _pct_text(atr_pct * 0.5))
+
+    out = df[['Ticker', 'Price', 'Change%', 'Weekly%', 'Volume', 'Vol_Ratio', 'RSI', 'ADX']].copy()
+    out['Score'] = score
+    out['Action'] = scoring.heuristic_actions(score, rsi, change_pct, weekly_pct)
+    out['Prediction'] = prediction
+    out['Outlook'] = np.select([bullish, bearish], ['BULLISH', 'BEARISH'], 'NEUTRAL')
+    out['Stop'] = targets['stop'].to_numpy()
+    out['TP1'] = targets['tp1'].to_numpy()
+    out['TP2'] = targets['tp2'].to_numpy()
+    out['Status'] = df['Status'].to_numpy()
+    return out
 
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
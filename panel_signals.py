@@ -0,0 +1,157 @@
+"""
+Cross-sectional signal engine.
+
+Evaluates the same signals as signals_engine.evaluate_signals for a whole
+MarketPanel at once: each detector is a handful of NumPy operations over
+[ticker, time] indicator arrays (from indicator_engine.compute_indicators)
+and yields one boolean per ticker. Technical scores are then a dot product
+of the signal matrix with the signal weights (see scoring).
+
+Arrays follow the panel's right-aligned layout, so column -1 is every
+ticker's latest bar and the last k columns are its last k bars.
+"""
+from typing import Dict
+
+import numpy as np
+
+import scoring
+from market_panel import FIELDS, MarketPanel
+from signals_engine import SIGNAL_DEFINITIONS, SignalDefinition, _get_signal_cfg, has_inputs, signal_enabled
+
+
+def evaluate_panel_signals(panel: MarketPanel, indicators: Dict[str, np.ndarray], cfg: Dict) -> Dict[str, np.ndarray]:
+    """
+    {signal key: bool [ticker] array}; entry i matches evaluate_signals on
+    panel ticker i's frame with the same indicators attached. Registered
+    plugins without a panel form fall back to their per-ticker detector.
+    """
+    arrays = {name: panel.data[:, :, j].astype("f8") for j, name in enumerate(FIELDS)}
+    arrays.update(indicators)
+    lengths = panel.lengths
+    results = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for definition in SIGNAL_DEFINITIONS:
+            fired = np.zeros(len(panel), dtype=bool)
+            if signal_enabled(definition, cfg) and has_inputs(definition, arrays) and panel.n_bars:
+                try:
+                    detector = _PANEL_DETECTORS.get(definition.key)
+                    if detector is not None:
+                        fired = detector(arrays, cfg, lengths)
+                    else:
+                        fired = _per_ticker(definition, panel, indicators, cfg)
+                except Exception as exc:
+                    print(f"[SIGNAL ERROR] {definition.key}: {exc}")
+            results[definition.key] = fired
+    return results
+
+
+def panel_trend(indicators: Dict[str, np.ndarray]) -> np.ndarray:
+    """scan_and_chart.trend_direction for every ticker: "UP", "DOWN" or "CHOPPY"."""
+    e20, e50, e200 = (indicators[col][:, -1] for col in ("ema_20", "ema_50", "ema_200"))
+    up = (e20 > e50) & (e50 > e200)
+    down = (e20 < e50) & (e50 < e200)
+    return np.where(up, "UP", np.where(down, "DOWN", "CHOPPY"))
+
+
+def panel_scores(signals: Dict[str, np.ndarray], trend: np.ndarray) -> np.ndarray:
+    """Technical score per ticker: signal weights plus 1 for an UP trend."""
+    return scoring.signal_scores(signals, trend, profile="scan")
+
+
+def _per_ticker(definition: SignalDefinition, panel: MarketPanel, indicators: Dict[str, np.ndarray],
+                cfg: Dict) -> np.ndarray:
+    fired = np.zeros(len(panel), dtype=bool)
+    for i, ticker in enumerate(panel.tickers):
+        df = panel.frame(ticker)
+        for col, values in indicators.items():
+            df[col] = values[i, panel.mask[i]]
+        fired[i] = bool(definition.detector(df, cfg))
+    return fired
+
+
+# ----------------------------------------------------------------------
+# Detectors: (arrays, cfg, lengths) -> bool [ticker]
+# ----------------------------------------------------------------------
+
+def _window_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """NaN-skipping mean of each ticker's last `window` bars."""
+    tail = values[:, -window:]
+    finite = np.isfinite(tail)
+    return np.where(finite, tail, 0.0).sum(axis=1) / finite.sum(axis=1)
+
+
+def _consolidating(a, cfg, lengths):
+    s = _get_signal_cfg(cfg, "consolidation")
+    lookback = s.get("lookback", 20)
+    return (
+        (lengths >= lookback) &
+        (_window_mean(a["bb_width"], lookback) < s.get("bb_width_mean_max", 0.06)) &
+        (_window_mean(a["atr_pct"], lookback) < s.get("atr_pct_mean_max", 0.025)) &
+        (_window_mean(a["adx"], lookback) < s.get("adx_mean_max", 20))
+    )
+
+
+def _buy_the_dip(a, cfg, lengths):
+    s = _get_signal_cfg(cfg, "buy_the_dip")
+    close, bb_low = a["Close"][:, -1], a["bb_low"][:, -1]
+    fired = a["rsi"][:, -1] <= s.get("rsi_max", 35)
+    if s.get("close_below_lower_bb", True):
+        fired &= close < bb_low
+    return fired & np.isfinite(bb_low)
+
+
+def _breakout(a, cfg, lengths):
+    s = _get_signal_cfg(cfg, "breakout")
+    lookback = s.get("lookback", 20)
+    if lookback < 2 or a["High"].shape[1] < lookback:
+        return np.zeros(len(lengths), dtype=bool)
+    # Only tickers with a full lookback are eligible, so the window has no padding
+    recent_high = a["High"][:, -lookback:-1].max(axis=1)
+    return (lengths >= lookback) & (a["Close"][:, -1] > recent_high) & (a["adx"][:, -1] >= s.get("adx_min", 18))
+
+
+def _volume_spike(a, cfg, lengths):
+    s = _get_signal_cfg(cfg, "volume_spike")
+    vol_ma = a["vol_ma_20"][:, -1]
+    return (vol_ma != 0) & (a["Volume"][:, -1] / vol_ma >= s.get("volume_multiplier", 1.5))
+
+
+def _ema_bullish(a, cfg, lengths):
+    s = _get_signal_cfg(cfg, "ema_bullish")
+    min_sep = s.get("min_separation_pct", 0.5) / 100
+    e20, e50, e200 = (a[col][:, -1] for col in ("ema_20", "ema_50", "ema_200"))
+    return (e20 > e50) & (e50 > e200) & ((e20 - e50) / e50 >= min_sep) & ((e50 - e200) / e200 >= min_sep)
+
+
+def _macd_bullish(a, cfg, lengths):
+    if "macd" not in a or "macd_signal" not in a or a["macd"].shape[1] < 2:
+        return np.zeros(len(lengths), dtype=bool)
+    s = _get_signal_cfg(cfg, "macd_bullish")
+    macd, signal = a["macd"], a["macd_signal"]
+    crossed = (macd[:, -2] <= signal[:, -2]) & (macd[:, -1] > signal[:, -1])
+    hist = a["macd_hist"][:, -1] if "macd_hist" in a else np.zeros(len(lengths))
+    return (lengths >= 2) & crossed & (hist >= s.get("histogram_min", 0.0))
+
+
+def _vwap_reclaim(a, cfg, lengths):
+    if "vwap" not in a:
+        return np.zeros(len(lengths), dtype=bool)
+    s = _get_signal_cfg(cfg, "vwap_reclaim")
+    lookback = max(s.get("lookback", 20), 2)
+    pct = s.get("min_close_above_pct", 0.2) / 100
+    close, vwap = a["Close"], a["vwap"]
+    above = close[:, -1] >= vwap[:, -1] * (1 + pct)
+    # Padding bars are NaN, so they never count as "below"
+    prev_below = (close[:, -lookback:-1] < vwap[:, -lookback:-1]).any(axis=1)
+    return above & prev_below
+
+
+_PANEL_DETECTORS = {
+    "Consolidating": _consolidating,
+    "BuyDip": _buy_the_dip,
+    "Breakout": _breakout,
+    "VolSpike": _volume_spike,
+    "EMABullish": _ema_bullish,
+    "MACDBullish": _macd_bullish,
+    "VWAPReclaim": _vwap_reclaim,
+}
@@ -0,0 +1,112 @@
+"""
+Cheap first stage for live scans.
+
+Most of a scan's cost is the intraday download plus indicators and signals
+for every ticker, yet the dashboard usually asks for min_score >= 5, which
+only active, liquid names reach. Before that heavy stage, one batched daily
+download (a month of bars, mostly served from the bar store or Polygon's
+grouped-daily feed) gives a few features for the whole universe at once:
+
+    price          last daily close
+    dollar_volume  mean Close x Volume over the last `window` days
+    atr_pct        mean true range over the window, % of price
+    gap_pct        latest open vs the previous close, %
+
+Tickers below the `prefilter:` thresholds are dropped; only survivors go
+on to the intraday stage. The filter is a heuristic and can drop a real
+setup: a calm, liquid large-cap can still reach a live score of 5
+(consolidation 2 + EMA stack 1 + MACD cross 1 + UP trend 1). So it ships
+disabled (`prefilter.enabled`), only runs when the caller's min_score is at
+least `min_score_gate`, and fails open: tickers without daily data, a
+non-finite feature (e.g. missing volume) or a failed snapshot never prune.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_panel import MarketPanel, fetch_market_panel
+
+
+PREFILTER_DEFAULTS = {
+    "enabled": False,            # lossy: opt in when scan speed matters more than recall
+    "min_score_gate": 5,         # prune only for scans asking at least this score
+    "period": "1mo",             # daily snapshot size
+    "window": 10,                # days averaged for dollar volume and ATR%
+    "min_price": 5.0,
+    "min_dollar_volume": 10_000_000,
+    "min_atr_pct": 1.0,          # active = ATR% >= min_atr_pct or |gap| >= min_gap_pct
+    "min_gap_pct": 1.0,
+}
+
+
+def prefilter_settings(cfg: Dict) -> Dict:
+    return {**PREFILTER_DEFAULTS, **((cfg or {}).get("prefilter") or {})}
+
+
+def daily_features(panel: MarketPanel, window: int = 10) -> pd.DataFrame:
+    """price, dollar_volume, atr_pct and gap_pct per panel ticker (one vectorized pass)."""
+    open_, high, low, close, volume = (panel.field(name).astype("f8") for name in
+                                       ("Open", "High", "Low", "Close", "Volume"))
+    prev_close = np.roll(close, 1, axis=1)
+    prev_close[:, 0] = np.nan
+    # Before the first real bar prev_close is padding (NaN); fall back to High - Low there
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price = close[:, -1]
+        dollar_volume = _tail_mean(close * volume, window)
+        atr_pct = _tail_mean(true_range, window) / price * 100
+        gap_pct = (open_[:, -1] / prev_close[:, -1] - 1) * 100
+    return pd.DataFrame({"price": price, "dollar_volume": dollar_volume, "atr_pct": atr_pct, "gap_pct": gap_pct},
+                        index=pd.Index(panel.tickers, name="Ticker"))
+
+
+def passes_prefilter(features: pd.DataFrame, settings: Dict) -> pd.Series:
+    """
+    Boolean Series: rows that are liquid enough and moving enough to be worth
+    a full scan. A non-finite feature can't rule a ticker out, so it passes.
+    """
+    liquid = _at_least(features["price"], settings["min_price"]) & \
+             _at_least(features["dollar_volume"], settings["min_dollar_volume"])
+    active = _at_least(features["atr_pct"], settings["min_atr_pct"]) | \
+             _at_least(features["gap_pct"].abs(), settings["min_gap_pct"])
+    return liquid & active
+
+
+def prefilter_universe(tickers: List[str], cfg: Dict, min_score: Optional[float] = None) -> List[str]:
+    """
+    Tickers worth the full intraday scan, in input order. Returns `tickers`
+    unchanged when the prefilter is disabled, min_score is below the gate,
+    or the daily snapshot can't be fetched.
+    """
+    settings = prefilter_settings(cfg)
+    if not settings["enabled"] or min_score is None or min_score < settings["min_score_gate"]:
+        return list(tickers)
+
+    data_cfg = (cfg or {}).get("data") or {}
+    try:
+        panel = fetch_market_panel(tickers, settings["period"], "1d", provider=data_cfg.get("provider", "yfinance"),
+                                   data_cfg=data_cfg)
+    except Exception as exc:
+        print(f"[PREFILTER] Daily snapshot failed, scanning the full universe: {exc}")
+        return list(tickers)
+    if not len(panel):
+        return list(tickers)
+
+    keep = passes_prefilter(daily_features(panel, settings["window"]), settings)
+    pruned = set(keep.index[~keep.to_numpy()])
+    survivors = [t for t in tickers if t not in pruned]
+    print(f"[PREFILTER] {len(survivors)}/{len(tickers)} tickers pass the daily prefilter (min_score {min_score})")
+    return survivors
+
+
+def _at_least(values: pd.Series, threshold: float) -> pd.Series:
+    return ~np.isfinite(values) | (values >= threshold)
+
+
+def _tail_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """NaN-skipping mean of each row's last `window` columns."""
+    tail = values[:, -window:]
+    finite = np.isfinite(tail)
+    return np.where(finite, tail, 0.0).sum(axis=1) / finite.sum(axis=1)
@@ -67,6 +67,856 @@ def test_broker_integration():
     kite = ZerodhaKite()
     print(f"   - Broker classes loaded. Alpaca enabled: {alpaca.enabled}, Kite enabled: {kite.enabled}")
 
+def test_bar_store():
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+    from bar_store import BarStore
+
+    frames = _synthetic_ohlcv([300, 200], seed=14)
+    eastern = frames["T0"].tz_localize("UTC").tz_convert("America/New_York")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BarStore(Path(tmp))
+        store.save("T0", "15m", eastern)
+        loaded = store.load("T0", "15m")
+        assert str(loaded.index.tz) == "America/New_York" and (loaded.index == eastern.index).all()
+        assert (loaded[["Close", "Volume"]].to_numpy() == eastern[["Close", "Volume"]].to_numpy()).all()
+
+        # Threads writing the same ticker each use their own temp file
+        candidates = [frames["T0"].iloc[:n] for n in (120, 160, 200, 240)] * 8
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda df: store.save("T1", "15m", df), candidates))
+        final = store.load("T1", "15m")
+        assert len(final) in (120, 160, 200, 240) and final.index.tz is None
+        assert (final["Close"].to_numpy() == frames["T0"]["Close"].iloc[:len(final)].to_numpy()).all()
+        leftovers = [p.name for p in (Path(tmp) / "15m").iterdir() if ".tmp" in p.name]
+        assert not leftovers, leftovers
+    print("   - bars and timezone round-trip; concurrent writers never clobber each other")
+
+def test_grouped_daily_panel():
+    import json
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from market_data import fetch_grouped_daily_panel
+
+    requested = []
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            day = self.path.split("?")[0].rsplit("/", 1)[-1]
+            requested.append(day)
+            ts = int(datetime.strptime(day, "%Y-%m-%d").timestamp() * 1000)
+            body = json.dumps({"results": [
+                {"T": "AAPL", "o": 1.0, "h": 2.0, "l": 0.5, "c": 1.5, "v": 100, "t": ts},
+                {"T": "BRK.B", "o": 3.0, "h": 4.0, "l": 2.5, "c": 3.5, "v": 200, "t": ts},
+                {"T": "ZZZZ", "o": 5.0, "h": 6.0, "l": 4.5, "c": 5.5, "v": 300, "t": ts},
+            ]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_cfg = {
+                "polygon_api_key": "test",
+                "polygon_api_key_env": "UNSET_POLYGON_KEY_FOR_TESTS",
+                "polygon_base_url": f"http://127.0.0.1:{server.server_port}",
+                "grouped_daily_dir": tmp,
+            }
+            frames = fetch_grouped_daily_panel(["AAPL", "BRK-B"], "5d", data_cfg)
+            first_run = len(requested)
+            frames = fetch_grouped_daily_panel(["AAPL", "BRK-B"], "5d", data_cfg)
+    finally:
+        server.shutdown()
+
+    assert set(frames) == {"AAPL", "BRK-B"}
+    assert len(frames["AAPL"]) == 5
+    assert frames["BRK-B"]["Close"].iloc[-1] == 3.5
+    # Completed sessions come from the per-day cache; at most today is re-requested
+    assert len(requested) - first_run <= 1
+    print(f"   - {first_run} grouped-daily requests built {len(frames)} daily frames")
+
+def test_async_market_data():
+    import asyncio
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from async_market_data import AsyncMarketDataClient, fetch_many_sync
+
+    requested = []
+    day_ms = 86_400_000
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            requested.append(self.path)
+            ticker = path.split("/")[4]
+            base = 1_735_689_600_000  # 2025-01-01
+            if path.endswith("/page2"):
+                bars = [{"o": 2.0, "h": 3.0, "l": 1.5, "c": 2.5, "v": 20, "t": base + day_ms}]
+                body = {"results": bars}
+            else:
+                bars = [{"o": 1.0, "h": 2.0, "l": 0.5, "c": 2.0, "v": 10, "t": base}]
+                body = {"results": bars, "next_url": f"http://{self.headers['Host']}/v2/aggs/ticker/{ticker}/page2"}
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        data_cfg = {
+            "provider": "polygon",
+            "polygon_api_key": "test",
+            "polygon_api_key_env": "UNSET_POLYGON_KEY_FOR_TESTS",
+            "polygon_base_url": f"http://127.0.0.1:{server.server_port}",
+        }
+        frames = fetch_many_sync(["AAA", "BBB"], "5d", "1d", data_cfg=data_cfg)
+        httpx_requests = len(requested)
+
+        async def quotes():
+            async with AsyncMarketDataClient(data_cfg) as client:
+                return await client.quotes(["AAA"])
+
+        quote = asyncio.run(quotes())["AAA"]
+
+        async def without_httpx():
+            # A client outside `async with` has no httpx pool: the sync client runs in a thread
+            return await AsyncMarketDataClient(data_cfg).fetch_many(["CCC"], "5d", "1d")
+
+        threaded = asyncio.run(without_httpx())
+    finally:
+        server.shutdown()
+
+    assert set(frames) == {"AAA", "BBB"} and list(frames["AAA"]["Close"]) == [2.0, 2.5], frames
+    assert httpx_requests == 4, "two pages per ticker, following next_url"
+    assert all("apiKey=test" in path for path in requested)
+    assert quote == {"current": 2.5, "change_pct": 25.0, "volume": 20.0}, quote
+    assert list(threaded["CCC"]["Close"]) == [2.0, 2.5], "Polygon provider must survive the thread fallback"
+    print(f"   - {len(requested)} fixture requests: paginated async fetch, quotes and thread fallback")
+
+def test_singleflight():
+    import threading
+    import time
+    from market_data import data_cfg_fingerprint
+    from singleflight import SingleFlight
+
+    flight = SingleFlight()
+    n_threads = 8
+    started, calls, lock = [0], [0], threading.Lock()
+
+    def run_all(fn):
+        results, errors = [], []
+
+        def caller():
+            with lock:
+                started[0] += 1
+            try:
+                results.append(flight.do("TSLA", fn))
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=caller) for _ in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def slow_fetch(fail=False):
+        with lock:
+            calls[0] += 1
+        while started[0] < n_threads:
+            time.sleep(0.001)
+        time.sleep(0.05)  # let every caller reach the wait
+        if fail:
+            raise ValueError("provider down")
+        return {"price": 250.0}
+
+    results, errors = run_all(slow_fetch)
+    assert calls[0] == 1 and not errors, (calls, errors)
+    assert len(results) == n_threads and all(r is results[0] for r in results)
+
+    started[0], calls[0] = 0, 0
+    results, errors = run_all(lambda: slow_fetch(fail=True))
+    assert calls[0] == 1 and not results
+    assert len(errors) == n_threads and all(isinstance(e, ValueError) for e in errors)
+    assert flight.in_flight() == 0
+
+    # Different data configs must not share a flight; key order must not matter
+    assert data_cfg_fingerprint({"a": 1, "b": 2}) == data_cfg_fingerprint({"b": 2, "a": 1})
+    assert data_cfg_fingerprint({"polygon_base_url": "x"}) != data_cfg_fingerprint({"polygon_base_url": "y"})
+    print(f"   - {n_threads} concurrent callers shared one call, result and exception")
+
+def test_resample_sessions():
+    import numpy as np
+    import pandas as pd
+    from timeframes import resample_ohlcv
+
+    # Two sessions of 1m bars, 09:30-15:59 ET, as naive UTC (Polygon) timestamps
+    days = [pd.Timestamp("2025-01-02 09:30", tz="America/New_York"),
+            pd.Timestamp("2025-01-03 09:30", tz="America/New_York")]
+    index = pd.DatetimeIndex([day + pd.Timedelta(minutes=m) for day in days for m in range(390)])
+    n = len(index)
+    df = pd.DataFrame({"Open": np.arange(n, dtype=float), "High": np.arange(n) + 0.5,
+                       "Low": np.arange(n) - 0.5, "Close": np.arange(n) + 0.25, "Volume": np.ones(n)},
+                      index=index.tz_convert("UTC").tz_localize(None))
+
+    hourly = resample_ohlcv(df, "1h")
+    local = hourly.index.tz_localize("UTC").tz_convert("America/New_York")
+    assert list(local.strftime("%H:%M")[:7]) == ["09:30", "10:30", "11:30", "12:30", "13:30", "14:30", "15:30"]
+    assert len(hourly) == 14, "bins never span the overnight gap"
+    first = hourly.iloc[0]
+    assert (first["Open"], first["High"], first["Low"], first["Close"], first["Volume"]) == (0, 59.5, -0.5, 59.25, 60)
+    assert hourly["Volume"].iloc[6] == 30, "last bin of the session is the 30-minute 15:30-16:00 stub"
+    assert hourly["Open"].iloc[7] == 390, "second session starts its own 09:30 bin"
+
+    aware = resample_ohlcv(df.tz_localize("UTC").tz_convert("America/New_York"), "15m")
+    assert str(aware.index.tz) == "America/New_York" and aware.index[0].strftime("%H:%M") == "09:30"
+    daily = resample_ohlcv(df, "1d")
+    assert list(daily["Volume"]) == [390, 390] and list(daily["Open"]) == [0, 390]
+    print(f"   - 1h/15m/1d bins anchored at 09:30 ET across {len(daily)} sessions")
+
+def test_fetch_timeframes_memo():
+    import json
+    import threading
+    import pandas as pd
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from timeframes import fetch_timeframes, resample_ohlcv
+
+    requested = []
+    now = pd.Timestamp.now(tz="America/New_York").normalize() + pd.Timedelta(hours=9, minutes=30)
+    start_ms = int(now.tz_convert("UTC").timestamp() * 1000)
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            requested.append(path)
+            step = 60_000 * int(path.split("/range/")[1].split("/")[0])
+            bars = [{"o": 1.0 + i, "h": 2.0 + i, "l": 0.5 + i, "c": 1.5 + i, "v": 10, "t": start_ms + i * step}
+                    for i in range(120 * 60_000 // step)]
+            payload = json.dumps({"results": bars}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        data_cfg = {
+            "polygon_api_key": "test",
+            "polygon_api_key_env": "UNSET_POLYGON_KEY_FOR_TESTS",
+            "polygon_base_url": f"http://127.0.0.1:{server.server_port}",
+        }
+        tickers = ["TFA", "TFB"]
+        movers = fetch_timeframes(tickers, "1d", ["1m"], provider="polygon", data_cfg=data_cfg)["1m"]
+        assert len(requested) == 2 and all("/range/1/minute/" in p for p in requested), requested
+        tips = fetch_timeframes(tickers, "1d", ["5m", "15m"], provider="polygon", data_cfg=data_cfg)
+        assert len(requested) == 2, "a fresh 1m download of the same span serves 5m and 15m"
+        pd.testing.assert_frame_equal(tips["5m"]["TFA"], resample_ohlcv(movers["TFA"], "5m"))
+
+        fetch_timeframes(tickers, "5d", ["15m"], provider="polygon", data_cfg=data_cfg)
+        assert len(requested) == 4 and all("/range/15/minute/" in p for p in requested[2:]), \
+            "a longer span is fetched at the coarsest interval it needs"
+        fetch_timeframes(tickers, "1d", ["1m"], provider="polygon", data_cfg=dict(data_cfg, timeframe_refresh_seconds=0))
+        assert len(requested) == 6, "expired downloads are refetched"
+    finally:
+        server.shutdown()
+    print(f"   - {len(requested)} downloads for 4 requests; base interval and span follow each request")
+
+def test_universe_store():
+    import tempfile
+    from universe_store import UniverseStore
+
+    calls = []
+
+    def source(tickers):
+        def fetch():
+            calls.append(tickers)
+            if isinstance(tickers, Exception):
+                raise tickers
+            return tickers
+        return fetch
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UniverseStore(tmp, ttl_hours=24)
+        assert store.get("sp500", source(["AAPL", "MSFT"])) == ["AAPL", "MSFT"]
+        assert store.get("sp500", source(["XXX"])) == ["AAPL", "MSFT"] and len(calls) == 1, "memo within TTL"
+        # A new process within the TTL reads the snapshot instead of scraping
+        assert UniverseStore(tmp, ttl_hours=24).get("sp500", source(["XXX"])) == ["AAPL", "MSFT"]
+        assert len(calls) == 1
+
+        # Past the TTL the source is asked again; a membership change bumps the version
+        expired = UniverseStore(tmp, ttl_hours=0)
+        assert expired.get("sp500", source(["AAPL", "NVDA"])) == ["AAPL", "NVDA"] and len(calls) == 2
+        assert expired.load("sp500")["version"] == 2
+        assert UniverseStore(tmp).load("sp500.v1")["tickers"] == ["AAPL", "MSFT"], "old version archived"
+
+        # Source down (or empty): serve the last snapshot, then no snapshot at all gives []
+        for failing in (ConnectionError("wikipedia down"), []):
+            assert UniverseStore(tmp, ttl_hours=0).get("sp500", source(failing)) == ["AAPL", "NVDA"]
+        assert UniverseStore(tmp, ttl_hours=0).load("sp500")["version"] == 2
+        assert UniverseStore(tmp).get("nasdaq100", source(ConnectionError("down"))) == []
+    print("   - TTL memo, disk snapshot reuse, versioned refresh and stale fallback")
+
+def _synthetic_ohlcv(lengths, seed=0):
+    """Random-walk OHLCV frames, one per length (last one has a flat, zero-volume stretch)."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i, n in enumerate(lengths):
+        close = 100 + np.cumsum(rng.normal(0, 1, n))
+        high, low = close + rng.random(n), close - rng.random(n)
+        volume = rng.integers(100_000, 10_000_000, n).astype(float)
+        if i == len(lengths) - 1 and n > 60:
+            close[50:60] = high[50:60] = low[50:60] = close[49]
+            volume[50:55] = 0
+        frames[f"T{i}"] = pd.DataFrame(
+            {"Open": close + rng.normal(0, 0.3, n), "High": high, "Low": low, "Close": close, "Volume": volume},
+            index=pd.date_range("2025-01-01", periods=n, freq="D"),
+        )
+    return frames
+
+def _ta_indicators(df, cfg):
+    """Reference add_indicators columns computed with the `ta` library."""
+    from ta.momentum import RSIIndicator
+    from ta.trend import ADXIndicator, MACD
+    from ta.volatility import AverageTrueRange, BollingerBands
+    from ta.volume import VolumeWeightedAveragePrice
+
+    ind = cfg["indicators"]
+    out = df.copy()
+    bb = BollingerBands(close=df["Close"], window=ind["bb_window"], window_dev=ind["bb_dev"])
+    out["bb_high"], out["bb_low"] = bb.bollinger_hband(), bb.bollinger_lband()
+    out["bb_width"] = (out["bb_high"] - out["bb_low"]) / df["Close"]
+    out["atr_pct"] = AverageTrueRange(df["High"], df["Low"], df["Close"], window=ind["atr_window"]).average_true_range() / df["Close"]
+    out["adx"] = ADXIndicator(df["High"], df["Low"], df["Close"], window=ind["adx_window"]).adx()
+    out["rsi"] = RSIIndicator(df["Close"], window=ind["rsi_window"]).rsi()
+    for span in (20, 50, 200):
+        out[f"ema_{span}"] = df["Close"].ewm(span=span, adjust=False).mean()
+    out["vol_ma_20"] = df["Volume"].rolling(window=20).mean()
+    macd = MACD(close=df["Close"])
+    out["macd"], out["macd_signal"], out["macd_hist"] = macd.macd(), macd.macd_signal(), macd.macd_diff()
+    vwap_window = cfg.get("signals", {}).get("vwap_reclaim", {}).get("lookback", 20)
+    out["vwap"] = VolumeWeightedAveragePrice(df["High"], df["Low"], df["Close"], df["Volume"],
+                                             window=vwap_window).volume_weighted_average_price()
+    return out
+
+def _assert_matches_ta(got, expected, label):
+    import numpy as np
+    assert np.allclose(got, expected.to_numpy(dtype="f8"), rtol=1e-7, atol=1e-9, equal_nan=True), \
+        f"{label} differs from ta"
+
+def test_morning_top_picks():
+    import top_performers_scanner
+
+    frames = _synthetic_ohlcv([90] * 20, seed=15)
+    saved = top_performers_scanner.get_stock_universe, top_performers_scanner.fetch_price_history_many
+    top_performers_scanner.get_stock_universe = lambda mode: list(frames)
+    top_performers_scanner.fetch_price_history_many = lambda tickers, **kwargs: frames
+    try:
+        picks = top_performers_scanner.scan_morning_top_picks(top_n=5)
+    finally:
+        top_performers_scanner.get_stock_universe, top_performers_scanner.fetch_price_history_many = saved
+    # Reading indicator columns that don't exist used to skip every ticker
+    assert not picks.empty, "every ticker was skipped"
+    assert picks["RSI"].between(0, 100).all() and (picks["Risk_%"] > 0).all()
+    print(f"   - {len(picks)} picks scored from synthetic daily bars")
+
+def test_indicator_engine_parity():
+    import yaml
+    from indicator_engine import compute_indicators
+    from indicator_graph import INDICATOR_COLUMNS
+    from market_panel import MarketPanel
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    panel = MarketPanel.from_frames(_synthetic_ohlcv([300, 120, 45, 28, 300]))
+    indicators = compute_indicators(panel, cfg)
+
+    for ticker in panel.tickers:
+        # Compare against ta on the same (float32-rounded) bars the panel holds
+        expected = _ta_indicators(panel.frame(ticker), cfg)
+        i = panel.ticker_index[ticker]
+        for col in INDICATOR_COLUMNS:
+            _assert_matches_ta(indicators[col][i, panel.mask[i]], expected[col], f"{ticker} {col}")
+    print(f"   - {len(INDICATOR_COLUMNS)} columns match ta for {len(panel)} tickers")
+
+def test_indicator_kernels_equivalence():
+    import yaml
+    import indicator_kernels
+    from indicator_graph import INDICATOR_COLUMNS
+    from scan_and_chart import add_indicators
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    frames = _synthetic_ohlcv([500, 60, 28, 400], seed=1)
+    # Exercise both the Numba and the pandas-ewm paths when Numba is installed
+    paths = [True, False] if indicator_kernels.NUMBA_AVAILABLE else [False]
+    try:
+        for use_numba in paths:
+            indicator_kernels.NUMBA_AVAILABLE = use_numba
+            for ticker, df in frames.items():
+                got = add_indicators(df.copy(), cfg)
+                expected = _ta_indicators(df, cfg)
+                for col in INDICATOR_COLUMNS:
+                    _assert_matches_ta(got[col], expected[col], f"{ticker} {col} (numba={use_numba})")
+    finally:
+        indicator_kernels.NUMBA_AVAILABLE = paths[0]
+    print(f"   - add_indicators matches ta on {len(frames)} tickers (numba paths checked: {paths})")
+
+def test_warmup_tail_convergence():
+    import yaml
+    from scan_and_chart import SCAN_OUTPUT_COLUMNS, add_indicators
+    from signals_engine import required_columns, required_history
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    columns = required_columns(cfg, SCAN_OUTPUT_COLUMNS)
+    bars = required_history(cfg, SCAN_OUTPUT_COLUMNS)
+    df = _synthetic_ohlcv([bars * 3], seed=2)["T0"]
+    full = add_indicators(df.copy(), cfg, columns=columns).tail(20)
+    tail = add_indicators(df.iloc[-bars:].copy(), cfg, columns=columns).tail(20)
+    # Recursive indicators differ only by the decayed seed; rolling ones exactly match
+    for col in full.columns:
+        if col not in df.columns:
+            rel = (tail[col] - full[col]).abs().max() / full[col].abs().mean()
+            assert rel < 0.01, f"{col} not converged after {bars} bars (max rel diff {rel:.4f})"
+    print(f"   - {bars}-bar tail matches full history on the last 20 bars")
+
+def test_scan_history():
+    import yaml
+    from market_data import period_for_bars
+    from scan_and_chart import scan_history
+
+    assert period_for_bars(26, "15m") == "5d"
+    assert period_for_bars(130, "15m") == "5d"
+    assert period_for_bars(131, "15m") == "1mo"
+    assert period_for_bars(10_000, "15m") == "60d", "capped at yfinance's intraday limit"
+    assert period_for_bars(100, "1d") == "6mo"
+
+    from indicator_graph import under_warmed, warmup_bars
+    from signals_engine import required_columns
+    from scan_and_chart import SCAN_OUTPUT_COLUMNS
+
+    # Shipped config: ema_200 gets its full 3-span warm-up
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    columns = required_columns(cfg, SCAN_OUTPUT_COLUMNS)
+    period, bars = scan_history(cfg)
+    assert (period, bars) == ("60d", 620), f"ema_200 needs 600 warm-up bars, got {period} / {bars} bars"
+    assert under_warmed(cfg, columns, warmup_bars(cfg, columns)) == []
+
+    # An opt-in cap shortens the download but names what it leaves unconverged
+    capped = dict(cfg, indicators=dict(cfg["indicators"], max_warmup_bars=100))
+    assert scan_history(capped) == ("5d", 120)
+    assert set(under_warmed(capped, columns, warmup_bars(capped, columns))) == {"adx", "ema_50", "ema_200", "macd"}
+    capped["data"] = dict(cfg["data"], auto_period=False)
+    assert scan_history(capped)[0] == cfg["data"]["period"]
+    print(f"   - shipped config fetches {period} for a {bars}-bar tail; a cap reports under-warmed EMAs")
+
+def test_signal_series_matches_detectors():
+    import yaml
+    import pandas as pd
+    from scan_and_chart import add_indicators
+    from signals_engine import evaluate_signal_series, evaluate_signals
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    # Loosen consolidation so it fires on random-walk data too
+    cfg["signals"]["consolidation"].update(bb_width_mean_max=0.2, atr_pct_mean_max=0.05, adx_mean_max=40)
+    for ticker, df in _synthetic_ohlcv([300, 30], seed=3).items():
+        df = add_indicators(df, cfg)
+        series = evaluate_signal_series(df, cfg)
+        bar_by_bar = pd.DataFrame([evaluate_signals(df.iloc[:i + 1], cfg) for i in range(len(df))], index=df.index)
+        mismatches = (series != bar_by_bar).sum()
+        assert not mismatches.any(), f"{ticker}: series differ from detectors: {mismatches[mismatches > 0].to_dict()}"
+    print(f"   - every bar matches the scalar detectors ({series.sum().sum()} firings on the last ticker)")
+
+def test_streaming_indicators():
+    import tempfile
+    import numpy as np
+    import yaml
+    from pathlib import Path
+    from scan_and_chart import add_indicators
+    from streaming_indicators import StreamingIndicators, advance, load_states, save_states
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    frames = _synthetic_ohlcv([300, 260], seed=10)
+    columns = ("bb_high", "bb_low", "bb_width", "atr_pct", "adx", "rsi", "ema_20", "ema_50", "ema_200",
+               "vol_ma_20", "macd", "macd_signal", "macd_hist", "vwap")
+
+    worst = 0.0
+    for ticker, df in frames.items():
+        full = add_indicators(df.copy(), cfg)
+        stream = StreamingIndicators(cfg)
+        for i, (ts, bar) in enumerate(df.iterrows()):
+            latest = stream.update(bar["High"], bar["Low"], bar["Close"], bar["Volume"], ts=i)
+            expected = full.iloc[i]
+            for col in columns:
+                a, b = latest[col], expected[col]
+                assert np.isnan(a) == np.isnan(b), f"{ticker} bar {i} {col}: {a} vs {b}"
+                if not np.isnan(b):
+                    worst = max(worst, abs(a - b) / max(abs(b), 1.0))
+    assert worst < 1e-9, f"max relative difference {worst}"
+
+    # Saved state resumes exactly where an uninterrupted stream would be
+    df = frames["T0"]
+    uninterrupted = StreamingIndicators(cfg)
+    uninterrupted.update_frame(df)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "states.json"
+        first = StreamingIndicators(cfg)
+        first.update_frame(df.iloc[:150])
+        save_states(path, {"T0": first})
+        resumed = load_states(path, cfg)["T0"]
+        resumed.update_frame(df.iloc[100:])  # overlapping refetch: old bars are skipped
+        assert resumed.to_dict() == uninterrupted.to_dict()
+        other = dict(cfg, indicators=dict(cfg["indicators"], rsi_window=7))
+        assert load_states(path, other) == {}, "states built with other settings are discarded"
+
+    # advance(): completed bars go into the stored state, the forming bar only into the result
+    states = {}
+    latest = advance(states, "T0", df.iloc[:200], cfg)
+    assert np.isclose(latest["rsi"], add_indicators(df.iloc[:200].copy(), cfg)["rsi"].iloc[-1])
+    latest = advance(states, "T0", df.iloc[150:], cfg)
+    assert np.isclose(latest["rsi"], uninterrupted.latest["rsi"]) and np.isclose(latest["adx"], uninterrupted.latest["adx"])
+    assert states["T0"].last_ts == int(df.index[-2].tz_localize("UTC").value)
+    print(f"   - bar-by-bar parity with add_indicators (max rel diff {worst:.1e}); state round-trips")
+
+def test_panel_signals_match_per_ticker():
+    import yaml
+    from indicator_engine import add_indicators_many, compute_indicators
+    from market_panel import MarketPanel
+    from panel_signals import evaluate_panel_signals, panel_scores, panel_trend
+    from scan_and_chart import calculate_signal_score, trend_direction
+    from signals_engine import evaluate_signals
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    cfg["signals"]["consolidation"].update(bb_width_mean_max=0.2, atr_pct_mean_max=0.05, adx_mean_max=40)
+    frames = _synthetic_ohlcv([260, 240, 120, 30, 15, 1] + [250] * 40, seed=4)
+    panel = MarketPanel.from_frames(frames)
+    indicators = compute_indicators(panel, cfg)
+    signals = evaluate_panel_signals(panel, indicators, cfg)
+    trends = panel_trend(indicators)
+    scores = panel_scores(signals, trends)
+
+    with_indicators = add_indicators_many(frames, cfg)
+    fired = 0
+    for ticker in panel.tickers:
+        i = panel.ticker_index[ticker]
+        df = with_indicators[ticker]
+        expected = evaluate_signals(df, cfg)
+        got = {key: bool(values[i]) for key, values in signals.items()}
+        assert got == expected, f"{ticker}: {got} != {expected}"
+        assert trends[i] == trend_direction(df), ticker
+        assert scores[i] == calculate_signal_score(expected, trend_direction(df)), ticker
+        fired += sum(got.values())
+    print(f"   - {len(panel)} tickers match evaluate_signals and calculate_signal_score ({fired} firings)")
+
+def test_scan_pipeline_stages():
+    import threading
+    import time
+    import yaml
+    from concurrent.futures import ThreadPoolExecutor
+    from scan_pipeline import _Stage, _process_pool, evaluate_chunk
+    from signals_engine import required_columns
+    from scan_and_chart import SCAN_OUTPUT_COLUMNS
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    frames = _synthetic_ohlcv([250] * 6, seed=6)
+    columns = required_columns(cfg, SCAN_OUTPUT_COLUMNS)
+    inline = evaluate_chunk(frames, cfg, columns)
+    with _process_pool(1) as pool:
+        pooled = pool.submit(evaluate_chunk, frames, cfg, columns).result()
+    assert set(pooled) == set(frames) and pooled == inline, "worker process result differs from in-process"
+
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def job():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        stage = _Stage(pool, 3)
+        jobs = [stage.submit(job) for _ in range(20)]
+        for future in jobs:
+            future.result()
+    assert peak[0] <= 3, f"stage ran {peak[0]} jobs at once"
+    print(f"   - {len(pooled)} tickers evaluated in a worker process; stage backpressure held at {peak[0]}")
+
+def test_top_k_matches_sort():
+    import random
+    from live_scanner import TopK
+
+    rng = random.Random(7)
+    rows = [{"Ticker": f"T{i}", "Score": rng.randint(0, 10)} for i in range(300)]
+    for k in (None, 0, 1, 10, 500):
+        top = TopK(k)
+        for row in rows:
+            top.push(row)
+        expected = sorted(rows, key=lambda r: r["Score"], reverse=True)  # stable: earlier rows win ties
+        expected = expected if k is None else expected[:k]
+        assert top.rows() == expected, f"k={k}"
+    print(f"   - bounded top-k equals sort + head for {len(rows)} rows")
+
+def test_prefilter_features():
+    import numpy as np
+    import pandas as pd
+    from market_panel import MarketPanel
+    from prefilter import PREFILTER_DEFAULTS, daily_features, passes_prefilter, prefilter_universe
+
+    frames = _synthetic_ohlcv([40, 25, 5, 1], seed=8)
+    features = daily_features(MarketPanel.from_frames(frames), window=10)
+    for ticker, df in frames.items():
+        prev_close = df["Close"].shift()
+        true_range = pd.concat([df["High"] - df["Low"], (df["High"] - prev_close).abs(),
+                                (df["Low"] - prev_close).abs()], axis=1).max(axis=1)
+        row = features.loc[ticker]
+        price = df["Close"].iloc[-1]
+        assert np.isclose(row["price"], price, rtol=1e-6), ticker
+        assert np.isclose(row["dollar_volume"], (df["Close"] * df["Volume"]).tail(10).mean(), rtol=1e-5), ticker
+        assert np.isclose(row["atr_pct"], true_range.tail(10).mean() / price * 100, rtol=1e-5), ticker
+        if len(df) > 1:
+            assert np.isclose(row["gap_pct"], (df["Open"].iloc[-1] / prev_close.iloc[-1] - 1) * 100, rtol=1e-4)
+        else:
+            assert np.isnan(row["gap_pct"]), ticker
+
+    features.loc["T0", "price"] = 1.0
+    features.loc["T1", ["atr_pct", "gap_pct"]] = [0.2, -3.0]
+    features.loc["T2", ["atr_pct", "gap_pct"]] = [0.2, 0.1]
+    features.loc["T3", ["dollar_volume", "atr_pct", "gap_pct"]] = [np.nan, 0.2, np.nan]
+    keep = passes_prefilter(features, dict(PREFILTER_DEFAULTS, min_dollar_volume=0))
+    assert not keep["T0"] and keep["T1"] and not keep["T2"]
+    strict = passes_prefilter(features, dict(PREFILTER_DEFAULTS, min_dollar_volume=1e15))
+    assert strict["T3"] and not strict[["T0", "T1", "T2"]].any(), "non-finite features must not prune"
+
+    # Disabled by default, and below the gate nothing is fetched or pruned
+    assert prefilter_universe(["A", "B"], {}, min_score=10) == ["A", "B"]
+    assert prefilter_universe(["A", "B"], {"prefilter": {"enabled": True, "min_score_gate": 5}}, min_score=3) == ["A", "B"]
+    print(f"   - daily features match pandas for {len(frames)} tickers; gate and thresholds applied")
+
+def test_signal_registry():
+    import yaml
+    import signals_engine
+    from scan_and_chart import add_indicators
+    from signals_engine import SignalDefinition, evaluate_signals, register_signal, required_columns
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    df = add_indicators(_synthetic_ohlcv([250], seed=5)["T0"], cfg)
+    baseline = evaluate_signals(df, cfg)
+    calls = []
+
+    def always(df, cfg):
+        calls.append(1)
+        return True
+
+    saved = list(signals_engine.SIGNAL_DEFINITIONS)
+    try:
+        register_signal(SignalDefinition("Always", "ALWAYS", 5, always, "always", ("Close",), cost=9))
+        register_signal(SignalDefinition("NeedsGap", "GAP", 1, always, "gap", ("gap_pct",)))
+        flags = evaluate_signals(df, cfg)
+        assert flags["Always"] and not flags["NeedsGap"], flags
+        assert len(calls) == 1, "detector with missing inputs should be skipped"
+        assert {k: flags[k] for k in baseline} == baseline
+        assert "gap_pct" not in required_columns(cfg)
+        # No combination of weights reaches 100, so no detector runs
+        calls.clear()
+        assert not any(evaluate_signals(df, cfg, min_score=100).values()) and not calls
+        # Weights override: only "Always" counts, so it runs for 5 and is skipped for 6
+        assert evaluate_signals(df, cfg, min_score=5, weights={"Always": 5})["Always"] and calls
+        calls.clear()
+        assert not evaluate_signals(df, cfg, min_score=6, weights={"Always": 5})["Always"] and not calls
+    finally:
+        signals_engine.SIGNAL_DEFINITIONS[:] = saved
+    print("   - plugins registered, missing inputs skipped, min_score short-circuits")
+
+def test_signal_state_transitions():
+    import tempfile
+    from pathlib import Path
+    from signal_state import SignalStateStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "signal_state.json"
+        store = SignalStateStore(path)
+        scan = [{"Ticker": "AAA", "Consolidating": True}, {"Ticker": "BBB"}]
+        first = store.transitions(scan, ts="2025-01-02T15:00:00+00:00")
+        assert [r["Ticker"] for r in first] == ["AAA"] and first[0]["NewSignals"] == "Consolidating"
+        store.save()
+
+        # A reloaded store sees the same standing signal as no change
+        store = SignalStateStore(path)
+        assert store.transitions(scan) == []
+        later = store.transitions([{"Ticker": "AAA", "Breakout": True}], ts="2025-01-03T15:00:00+00:00")
+        assert later[0]["NewSignals"] == "Breakout" and later[0]["EndedSignals"] == "Consolidating"
+        assert store.active("AAA") == ["Breakout"] and later[0]["SignalsSince"].startswith("2025-01-03")
+    print("   - only started/ended signals are emitted, state survives a reload")
+
+def test_record_alerts():
+    import tempfile
+    from pathlib import Path
+    import scan_and_chart
+    from signal_state import SignalStateStore
+
+    stored = []
+    saved_store = scan_and_chart.store_scan_results
+    scan_and_chart.store_scan_results = lambda rows: stored.append(list(rows)) or len(stored)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "signal_state.json"
+            scan = [{"Ticker": "AAA", "Consolidating": True}]
+
+            # Failed delivery: nothing stored, state untouched, so the retry re-emits once
+            store = SignalStateStore(path)
+            alerts = store.transitions(scan)
+            assert scan_and_chart.record_alerts(alerts, store, delivered=False) is None
+            assert not stored and not path.exists()
+
+            store = SignalStateStore(path)
+            alerts = store.transitions(scan)
+            assert len(alerts) == 1 and scan_and_chart.record_alerts(alerts, store, delivered=True) == 1
+            assert SignalStateStore(path).transitions(scan) == [], "state committed with the rows"
+            assert len(stored) == 1
+    finally:
+        scan_and_chart.store_scan_results = saved_store
+    print("   - rows are stored exactly once, together with the committed signal state")
+
+def test_scan_row_cache():
+    import tempfile
+    import numpy as np
+    from pathlib import Path
+    from scan_cache import ScanRowCache
+
+    df = _synthetic_ohlcv([120], seed=9)["T0"]
+    row = {"Ticker": "T0", "Close": np.float64(101.5), "Breakout": np.bool_(True), "MarketCap": None}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "scan_rows.json"
+        cache = ScanRowCache(path, settings="a")
+        cache.put("T0", df, row)
+        cache.put("T1", df, None)
+        cache.save()
+
+        reloaded = ScanRowCache(path, settings="a")
+        assert reloaded.get("T0", df) == (True, {"Ticker": "T0", "Close": 101.5, "Breakout": True, "MarketCap": None})
+        assert reloaded.get("T1", df) == (True, None), "a cached 'no row' result is still a hit"
+
+        forming = df.copy()
+        forming.iloc[-1, forming.columns.get_loc("Close")] += 0.01
+        assert reloaded.get("T0", forming) == (False, None), "a changed last bar must rescan"
+        assert reloaded.get("T0", df.iloc[:-1]) == (False, None), "a different bar window must rescan"
+        assert ScanRowCache(path, settings="b").get("T0", df) == (False, None), "other settings must rescan"
+        assert ScanRowCache(path, settings="a", max_age_hours=0).get("T0", df) == (False, None)
+
+        # A row cut short for a stricter scan can't serve a looser one
+        cache.put("T2", df, dict(row, SignalFloor=3))
+        assert cache.get("T2", df, 4)[0] and cache.get("T2", df, 3)[0]
+        assert cache.get("T2", df) == (False, None) and cache.get("T2", df, 2) == (False, None)
+    print("   - unchanged bars reuse rows; new bars, settings, age and a lower floor force a rescan")
+
+def test_live_min_score_floor():
+    import yaml
+    from live_scanner import scan_ticker_signals, score_results, signal_floor
+    import pandas as pd
+
+    assert signal_floor(None, False) is None and signal_floor(1, False) is None
+    assert signal_floor(5, False) == 4 and signal_floor(5, True) == 1 and signal_floor(4, True) is None
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    cfg["indicator_cache"] = {"enabled": False}
+    checked = 0
+    for ticker, df in _synthetic_ohlcv([200] * 12, seed=12).items():
+        full = scan_ticker_signals(ticker, cfg, False, df)
+        full_score = score_results(pd.DataFrame([full]))["Score"].iloc[0]
+        for min_score in range(1, 12):
+            row = scan_ticker_signals(ticker, cfg, False, df, min_score)
+            assert row["SignalFloor"] == (signal_floor(min_score, False) or 0)
+            score = score_results(pd.DataFrame([row]))["Score"].iloc[0]
+            # Same verdict as the full evaluation, and identical rows wherever the row passes
+            assert (score >= min_score) == (full_score >= min_score), (ticker, min_score, score, full_score)
+            if full_score >= min_score:
+                assert {k: v for k, v in row.items() if k != "SignalFloor"} == \
+                       {k: v for k, v in full.items() if k != "SignalFloor"}
+            checked += 1
+    print(f"   - {checked} floored scans agree with the full evaluation on pass/fail")
+
+def test_live_row_caching():
+    import yaml
+    from live_scanner import _row_cacheable, _scan_ticker_signals, scan_ticker_signals
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    cfg["indicator_cache"] = {"enabled": False}
+    frames = _synthetic_ohlcv([200, 30], seed=13)
+
+    # Too few bars is a real "no row"; a failure raises instead of looking like one
+    assert _scan_ticker_signals("T1", cfg, False, frames["T1"]) is None
+    broken = frames["T0"].drop(columns=["Volume"])
+    try:
+        _scan_ticker_signals("T0", cfg, False, broken)
+        raise AssertionError("a failed scan must raise")
+    except KeyError:
+        pass
+    assert scan_ticker_signals("T0", cfg, False, broken) is None, "the public wrapper still fails silently"
+
+    row = _scan_ticker_signals("T0", cfg, False, frames["T0"])
+    assert _row_cacheable(None, True) and _row_cacheable(row, False)
+    assert not _row_cacheable(row, True), "fundamentals requested but missing: don't cache"
+    assert _row_cacheable(dict(row, HasFundamentals=True), True)
+    print("   - only real no-row results and complete rows are cacheable")
+
+def test_scoring_engine():
+    import numpy as np
+    import scoring
+
+    flags = {"Consolidating": np.array([True, False, True]), "Breakout": np.array([False, True, True]),
+             "MACDBullish": np.array([False, False, True])}
+    trend = np.array(["UP", "DOWN", "CHOPPY"])
+    assert list(scoring.signal_scores(flags, trend, "scan")) == [2, 3, 5]
+    assert list(scoring.signal_scores(flags, trend, "live")) == [3, 2, 5]
+    assert list(scoring.heuristic_scores([25, 50, 80], [45, 10, 30], [2, 0, 0], [4, 0, 0], [2, 1, 1])) == [10, 6, 5]
+
+    moves = scoring.potential_moves([0.02, 0.02], [10, 10], ["UP", "DOWN"])
+    assert list(moves["potential_up_1d_pct"]) == [3.0, 1.0] and list(moves["potential_down_1d_pct"]) == [1.0, 3.0]
+    actions = scoring.actions_and_timeframes([9, 3], ["UP", "UP"], [50, 50], [False, False], [3.0, 1.0], [1.0, 1.0])
+    assert list(actions["action"]) == ["BUY", "AVOID"]
+    assert actions["action_reason"][0] == "Strong setup: Score 9/10, uptrend, R:R 3.00"
+    levels = scoring.price_levels([100.0], [1.0], [3.0], actions["timeframe_label"][:1])
+    assert list(levels.iloc[0]) == [100.0, 99.2, 101.5, 103.0]
+    print("   - score profiles, moves, actions and price levels")
+
+def test_indicator_kernel_benchmark():
+    import yaml
+    from scan_and_chart import add_indicators
+
+    cfg = yaml.safe_load(open("config.yaml", "r"))
+    frames = list(_synthetic_ohlcv([500] * 20, seed=2).values())
+    add_indicators(frames[0].copy(), cfg)  # JIT warm-up
+
+    timings = {}
+    for label, func in (("ta", _ta_indicators), ("kernels", add_indicators)):
+        start = time.perf_counter()
+        for df in frames:
+            func(df.copy(), cfg)
+        timings[label] = (time.perf_counter() - start) / len(frames)
+    print(f"   - per ticker (500 bars): ta {timings['ta'] * 1000:.2f}ms, "
+          f"kernels {timings['kernels'] * 1000:.2f}ms ({timings['ta'] / timings['kernels']:.1f}x)")
+
 if __name__ == "__main__":
     print("🚀 STARTING SYSTEM SELF-TEST")
     print("="*40)
@@ -76,7 +926,33 @@ if __name__ == "__main__":
         ("Backtesting Engine", test_backtesting),
         ("User Authentication", test_user_auth),
         ("Subscription Manager", test_subscription),
-        ("Broker Integration", test_broker_integration)
+        ("Broker Integration", test_broker_integration),
+        ("Bar Store", test_bar_store),
+        ("Grouped Daily Panel", test_grouped_daily_panel),
+        ("Async Market Data", test_async_market_data),
+        ("Single-Flight Coalescing", test_singleflight),
+        ("Session-Anchored Resampling", test_resample_sessions),
+        ("Timeframe Download Memo", test_fetch_timeframes_memo),
+        ("Universe Store", test_universe_store),
+        ("Morning Top Picks", test_morning_top_picks),
+        ("Indicator Engine Parity", test_indicator_engine_parity),
+        ("Indicator Kernels vs ta", test_indicator_kernels_equivalence),
+        ("Warm-up Tail Convergence", test_warmup_tail_convergence),
+        ("Scan History Period", test_scan_history),
+        ("Signal Series vs Detectors", test_signal_series_matches_detectors),
+        ("Streaming Indicators", test_streaming_indicators),
+        ("Panel Signals vs Per-Ticker", test_panel_signals_match_per_ticker),
+        ("Scan Pipeline Stages", test_scan_pipeline_stages),
+        ("Top-K Results", test_top_k_matches_sort),
+        ("Daily Prefilter", test_prefilter_features),
+        ("Signal Registry", test_signal_registry),
+        ("Signal State Transitions", test_signal_state_transitions),
+        ("Record Alerts", test_record_alerts),
+        ("Scan Row Cache", test_scan_row_cache),
+        ("Live min_score Floor", test_live_min_score_floor),
+        ("Live Row Caching", test_live_row_caching),
+        ("Scoring Engine", test_scoring_engine),
+        ("Indicator Kernel Benchmark", test_indicator_kernel_benchmark),
     ]
     
     passed = 0
@@ -3,17 +3,17 @@ import os
 import yaml
 import numpy as np
 import pandas as pd
-from ta.trend import ADXIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.volume import VolumeWeightedAveragePrice
 import mplfinance as mpf
 from utils import post_to_slack
 from telegram_bot import send_telegram_alerts, is_telegram_configured
 from database import init_database, store_scan_results
-from market_data import fetch_price_history
-from fundamentals import fetch_fundamentals, recommend_trade_action
-from signals_engine import SIGNAL_DEFINITIONS, evaluate_signals
+from market_data import fetch_price_history, fetch_price_history_many, period_for_bars
+from signals_engine import load_signal_plugins, required_columns, required_history
+import indicator_kernels as kernels
+import scoring
+from signal_state import get_signal_state_store
+from indicator_cache import get_indicator_cache
+from indicator_graph import resolve_nodes, under_warmed, warmup_bars
 
 pd.options.mode.chained_assignment = None
 
@@ -21,6 +21,21 @@ def get_clean_prices(ticker, period, interval, data_cfg=None):
     data_cfg = data_cfg or {}
     provider = data_cfg.get("provider", "yfinance")
     df = fetch_price_history(ticker, period, interval, provider=provider, data_cfg=data_cfg)
+    return clean_price_frame(df)
+
+def get_clean_prices_many(tickers, period, interval, data_cfg=None):
+    """Batched get_clean_prices: returns {ticker: cleaned frame} for tickers with data."""
+    data_cfg = data_cfg or {}
+    provider = data_cfg.get("provider", "yfinance")
+    frames = fetch_price_history_many(tickers, period, interval, provider=provider, data_cfg=data_cfg)
+    cleaned = {}
+    for ticker, df in frames.items():
+        df = clean_price_frame(df)
+        if not df.empty:
+            cleaned[ticker] = df
+    return cleaned
+
+def clean_price_frame(df):
     if df.empty:
         return df
 
@@ -38,52 +53,106 @@ def get_clean_prices(ticker, period, interval, data_cfg=None):
     df.dropna(subset=["Open", "High", "Low", "Close"], inplace=True)
     return df
 
-def add_indicators(df, cfg):
-    # Bollinger Bands
-    bb = BollingerBands(close=df["Close"], window=cfg["indicators"]["bb_window"], window_dev=cfg["indicators"]["bb_dev"])
-    df["bb_high"] = bb.bollinger_hband()
-    df["bb_low"]  = bb.bollinger_lband()
+def _values(df, col):
+    return df[col].to_numpy(dtype="f8")
+
+def _bollinger(df, cfg):
+    df["bb_high"], df["bb_low"] = kernels.bollinger(_values(df, "Close"), cfg["indicators"]["bb_window"],
+                                                     cfg["indicators"]["bb_dev"])
+
+def _bb_width(df, cfg):
     df["bb_width"] = (df["bb_high"] - df["bb_low"]) / df["Close"]
 
-    # ATR
-    atr = AverageTrueRange(high=df["High"], low=df["Low"], close=df["Close"], window=cfg["indicators"]["atr_window"])
-    df["atr_pct"] = atr.average_true_range() / df["Close"]
+def _atr(df, cfg):
+    atr = kernels.atr(_values(df, "High"), _values(df, "Low"), _values(df, "Close"), cfg["indicators"]["atr_window"])
+    df["atr_pct"] = atr / _values(df, "Close")
 
-    # ADX
-    adx = ADXIndicator(high=df["High"], low=df["Low"], close=df["Close"], window=cfg["indicators"]["adx_window"])
-    df["adx"] = adx.adx()
+def _adx(df, cfg):
+    df["adx"] = kernels.adx(_values(df, "High"), _values(df, "Low"), _values(df, "Close"), cfg["indicators"]["adx_window"])
 
-    # RSI
-    rsi = RSIIndicator(close=df["Close"], window=cfg["indicators"]["rsi_window"])
-    df["rsi"] = rsi.rsi()
+def _rsi(df, cfg):
+    df["rsi"] = kernels.rsi(_values(df, "Close"), cfg["indicators"]["rsi_window"])
 
-    # EMAs for trend detection
-    df["ema_20"] = df["Close"].ewm(span=20, adjust=False).mean()
-    df["ema_50"] = df["Close"].ewm(span=50, adjust=False).mean()
-    df["ema_200"] = df["Close"].ewm(span=200, adjust=False).mean()
+def _ema(span):
+    def compute(df, cfg):
+        df[f"ema_{span}"] = kernels.ema(_values(df, "Close"), span)
+    return compute
 
+def _vol_ma_20(df, cfg):
     # Volume moving average for spike detection
-    df["vol_ma_20"] = df["Volume"].rolling(window=20).mean()
+    df["vol_ma_20"] = kernels.rolling_mean(_values(df, "Volume"), 20)
 
-    # MACD for momentum
-    macd = MACD(close=df["Close"])
-    df["macd"] = macd.macd()
-    df["macd_signal"] = macd.macd_signal()
-    df["macd_hist"] = macd.macd_diff()
+def _macd(df, cfg):
+    df["macd"], df["macd_signal"], df["macd_hist"] = kernels.macd(_values(df, "Close"))
 
-    # VWAP
+def _vwap(df, cfg):
     vwap_window = cfg.get("signals", {}).get("vwap_reclaim", {}).get("lookback", 20)
-    vwap = VolumeWeightedAveragePrice(
-        high=df["High"],
-        low=df["Low"],
-        close=df["Close"],
-        volume=df["Volume"],
-        window=vwap_window
-    )
-    df["vwap"] = vwap.volume_weighted_average_price()
-
+    df["vwap"] = kernels.rolling_vwap(_values(df, "High"), _values(df, "Low"), _values(df, "Close"),
+                                      _values(df, "Volume"), vwap_window)
+
+# One function per indicator_graph node
+INDICATOR_FUNCS = {
+    "bollinger": _bollinger,
+    "bb_width": _bb_width,
+    "atr": _atr,
+    "adx": _adx,
+    "rsi": _rsi,
+    "ema_20": _ema(20),
+    "ema_50": _ema(50),
+    "ema_200": _ema(200),
+    "vol_ma_20": _vol_ma_20,
+    "macd": _macd,
+    "vwap": _vwap,
+}
+
+# Indicator columns the scan result rows and trend_direction read
+SCAN_OUTPUT_COLUMNS = ("bb_width", "atr_pct", "adx", "rsi", "ema_20", "ema_50", "ema_200")
+
+def scan_history(cfg, extra=SCAN_OUTPUT_COLUMNS):
+    """
+    (period, bars) for a scan: `bars` is the tail the enabled signals need
+    with converged indicators, `period` the download that covers it
+    (`data.period` when `data.auto_period` is false). Indicators that an
+    `indicators.max_warmup_bars` cap leaves unconverged are reported.
+    """
+    bars = required_history(cfg, extra)
+    columns = required_columns(cfg, extra)
+    lacking = under_warmed(cfg, columns, warmup_bars(cfg, columns))
+    if lacking:
+        print(f"[HISTORY] indicators.max_warmup_bars leaves {', '.join(lacking)} under-warmed "
+              f"({bars} bars fetched per ticker)")
+    data_cfg = cfg["data"]
+    if not data_cfg.get("auto_period", True):
+        return data_cfg["period"], bars
+    return period_for_bars(bars, data_cfg["interval"]), bars
+
+def tail_history(prices, bars):
+    """Keep the newest `bars` bars per ticker and report tickers that have fewer."""
+    short = sorted(t for t, df in prices.items() if len(df) < bars)
+    if short:
+        shown = ", ".join(short[:10]) + (" ..." if len(short) > 10 else "")
+        print(f"[HISTORY] {len(short)} ticker(s) have fewer than {bars} bars, indicators may not have converged: {shown}")
+    return {t: df.iloc[-bars:] for t, df in prices.items()}
+
+def add_indicators(df, cfg, columns=None):
+    """
+    Add indicator columns to df. With `columns`, only those columns (and the
+    indicators they depend on) are computed; None computes everything.
+    """
+    for node in resolve_nodes(columns):
+        INDICATOR_FUNCS[node.name](df, cfg)
     return df
 
+def add_indicators_cached(df, cfg, ticker, interval, columns=None):
+    """
+    add_indicators through the shared indicator cache: identical bars and
+    settings reuse earlier results instead of recomputing. Returns a new frame.
+    """
+    cache = get_indicator_cache(cfg)
+    if cache is None:
+        return add_indicators(df, cfg, columns=columns)
+    return cache.add_indicators(df, cfg, ticker, interval, add_indicators, columns=columns)
+
 def trend_direction(df):
     """
     Classify trend based on EMA alignment
@@ -107,13 +176,8 @@ def trend_direction(df):
     return "CHOPPY"
 
 def calculate_signal_score(signals: dict, trend: str) -> int:
-    score = 0
-    for definition in SIGNAL_DEFINITIONS:
-        if signals.get(definition.key):
-            score += definition.weight
-    if trend == "UP":
-        score += 1
-    return score
+    """One-row scoring.signal_scores (SIGNAL_DEFINITIONS weights + 1 for an UP trend)."""
+    return int(scoring.signal_scores({key: [fired] for key, fired in signals.items()}, [trend])[0])
 
 def save_chart(df, ticker, outdir):
     """
@@ -172,19 +236,37 @@ def save_chart(df, ticker, outdir):
         scale_padding={'left': 0.05, 'top': 0.5, 'right': 0.95, 'bottom': 0.3}
     )
 
+def record_alerts(alerts, signal_state, delivered):
+    """
+    Store alert rows and commit the signal state together, once every
+    channel has the changes; returns the scan_id, or None when held back.
+    After a failed send the next scan re-emits the same transitions, so
+    storing them now would write them to the database twice.
+    """
+    if signal_state is not None and not delivered:
+        print("[ALERTS] Keeping the previous signal state; the next scan re-sends and stores these changes")
+        return None
+
+    # Store results in database
+    scan_id = store_scan_results(alerts)
+    print(f"\n📊 Scan #{scan_id} stored in database")
+    if signal_state is not None:
+        signal_state.save()
+    return scan_id
+
 def main():
     # Initialize database on first run
     init_database()
 
     cfg = yaml.safe_load(open("config.yaml","r"))
-    results = []
+    load_signal_plugins(cfg)
 
     # Get tickers to scan
     import sys
     if len(sys.argv) > 1 and sys.argv[1] == '--all':
         # Scan ALL market stocks (S&P 500 + NASDAQ-100)
         print("🔥 SCANNING ALL MARKET STOCKS (~700 stocks)")
-        print("⏰ This will take 20-30 minutes...\n")
+        print("⏰ Downloads, indicators, fundamentals and charts run in parallel stages...\n")
         from top_performers_scanner import get_stock_universe
         tickers_to_scan = get_stock_universe('all')
     else:
@@ -193,67 +275,10 @@ def main():
 
     print(f"📊 Total stocks to scan: {len(tickers_to_scan)}\n")
 
-    for idx, t in enumerate(tickers_to_scan, 1):
-        # Progress indicator
-        if len(tickers_to_scan) > 50 and idx % 50 == 0:
-            print(f"✓ Progress: {idx}/{len(tickers_to_scan)} stocks scanned ({idx*100//len(tickers_to_scan)}%)")
-
-        try:
-            df = get_clean_prices(t, cfg["data"]["period"], cfg["data"]["interval"], cfg.get("data"))
-            if df.empty:
-                if len(tickers_to_scan) <= 50:  # Only print for small scans
-                    print(f"[NO DATA] {t}")
-                continue
-
-            df = add_indicators(df, cfg)
-
-            # Detect all signals
-            signal_flags = evaluate_signals(df, cfg)
-            trend = trend_direction(df)
-
-            # Technical score
-            technical_score = calculate_signal_score(signal_flags, trend)
-
-            # Fundamentals & combined view
-            fundamentals = fetch_fundamentals(t)
-            fund_score = fundamentals.fundamental_score
-            action_info = recommend_trade_action(technical_score, fund_score, trend)
-            combined_score = action_info["total_score"]
-
-            last = df.iloc[-1]
-
-            result_row = {
-                "Ticker": t,
-                "Score": combined_score,
-                "TechnicalScore": technical_score,
-                "FundamentalScore": fund_score,
-                "Trend": trend,
-                "BBWidth_pct": round(last["bb_width"]*100,2),
-                "ATR%": round(last["atr_pct"]*100,2),
-                "ADX": round(last["adx"],2),
-                "RSI": round(last["rsi"],2),
-                "Close": round(last["Close"],2),
-                "MarketCap": fundamentals.market_cap,
-                "PERatio": fundamentals.pe_ratio,
-                "RevenueGrowthPct": fundamentals.revenue_growth_pct,
-                "ProfitMarginPct": fundamentals.profit_margin_pct,
-                "FundamentalOutlook": fundamentals.outlook,
-                "FundamentalReasons": fundamentals.reasons,
-                "Action": action_info["action"],
-                "ActionReason": action_info["reason"],
-            }
-
-            result_row.update(signal_flags)
-
-            results.append(result_row)
-
-            # Only save charts for small scans (too slow for 700 stocks)
-            if len(tickers_to_scan) <= 50:
-                save_chart(df, t, cfg["output"]["charts_dir"])
-
-        except Exception as e:
-            if len(tickers_to_scan) <= 50:  # Only show errors for small scans
-                print(f"[ERROR] {t}: {e}")
+    # Download, indicators/signals, fundamentals and charts run as overlapping
+    # stages (see scan_pipeline and the `pipeline:` config section)
+    from scan_pipeline import run_scan_pipeline
+    results = run_scan_pipeline(tickers_to_scan, cfg)
 
     df_out = pd.DataFrame(results)
 
@@ -272,21 +297,41 @@ def main():
     else:
         print(df_out.to_string(index=False))
 
+    # Downstream (Slack, Telegram, DB) only sees signals that started or
+    # ended since the previous scan, not every standing signal again
+    signal_state = get_signal_state_store(cfg)
+    if signal_state is not None:
+        alerts = signal_state.transitions(results)
+        print(f"\n🔔 {len(alerts)} of {len(results)} stocks changed signals since the last scan")
+    else:
+        alerts = results
+
+    if not alerts:
+        print("[ALERTS] No signal changes, nothing to send or store")
+        if signal_state is not None:
+            signal_state.save()
+        return
+
     # Send Slack alert
     msg = "*AI Stock Agent Scan Complete*\n"
-    for r in results[:10]:
-        msg += f"{r['Ticker']}: CONS={r['Consolidating']} DIP={r['BuyDip']} RSI={r['RSI']}\n"
-    post_to_slack(msg)
+    for r in alerts[:10]:
+        msg += f"{r['Ticker']}: CONS={r['Consolidating']} DIP={r['BuyDip']} RSI={r['RSI']}"
+        if r.get("NewSignals") or r.get("EndedSignals"):
+            msg += f" NEW=[{r['NewSignals']}] ENDED=[{r['EndedSignals']}]"
+        msg += "\n"
+    delivered = True
+    if not post_to_slack(msg) and os.getenv("SLACK_WEBHOOK_URL"):
+        print("[SLACK] Failed to post the scan summary")
+        delivered = False
 
     # Send Telegram alerts if configured
     if is_telegram_configured(cfg):
-        send_telegram_alerts(results, cfg, cfg["output"]["charts_dir"])
+        if not send_telegram_alerts(alerts, cfg, cfg["output"]["charts_dir"]):
+            delivered = False
     else:
         print("[TELEGRAM] Skipping alerts (set TELEGRAM_BOT_TOKEN/CHAT_ID or update config to enable)")
 
-    # Store results in database
-    scan_id = store_scan_results(results)
-    print(f"\n📊 Scan #{scan_id} stored in database")
+    record_alerts(alerts, signal_state, delivered)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,117 @@
+"""
+Per-ticker scan rows reused across live rescans.
+
+The dashboard reruns the live scan every 15 minutes, and many tickers
+(halted, illiquid, after hours) have no new bar since the previous run.
+For each ticker the store keeps the bar window it last scanned (first/last
+timestamp, bar count and the latest bar's OHLCV, which moves while that bar
+is still forming) and the unscored scan_ticker_signals row it produced. On
+rescan, a ticker whose downloaded bars match is served from the store and
+only changed tickers go through indicators, signals and fundamentals.
+
+Entries are tied to a hash of every setting that affects the row
+(indicators, signals, plugins, interval, fundamentals on/off) and expire
+after `max_age_hours` so cached fundamentals don't outlive their own TTL.
+State lives in one JSON file (.cache/scan_rows.json).
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicator_cache import bars_fingerprint, indicator_settings_hash
+
+
+SCAN_CACHE_PATH = Path(".cache") / "scan_rows.json"
+MAX_AGE_HOURS = 6
+
+
+def scan_settings_hash(cfg: Dict, include_fundamentals: bool) -> str:
+    """Hash of every setting that changes a scan row."""
+    settings = {
+        "indicators": indicator_settings_hash(cfg),
+        "signals": cfg.get("signals", {}),
+        "interval": cfg.get("data", {}).get("interval"),
+        "fundamentals": include_fundamentals,
+    }
+    return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class ScanRowCache:
+    """{ticker: (bar window fingerprint, scan row, saved at)} persisted as JSON."""
+
+    def __init__(self, path: Path = SCAN_CACHE_PATH, settings: str = "", max_age_hours: float = MAX_AGE_HOURS):
+        self.path = Path(path)
+        self.settings = settings
+        self.max_age = max_age_hours * 3600
+        self.entries: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def get(self, ticker: str, df: pd.DataFrame, floor: Optional[float] = None) -> Tuple[bool, Optional[Dict]]:
+        """
+        (hit, row) for ticker's bars. A hit's row may be None: the previous
+        scan of these exact bars produced no row, so rescanning won't either.
+        Rows evaluated against a higher signal floor than `floor` may have
+        skipped detectors this scan needs, so they count as misses.
+        """
+        entry = self.entries.get(ticker)
+        if entry is not None and entry[0] == _fingerprint(df) and time.time() - entry[2] < self.max_age \
+                and (entry[1] or {}).get("SignalFloor", 0) <= (floor or 0):
+            self.hits += 1
+            return True, entry[1]
+        self.misses += 1
+        return False, None
+
+    def put(self, ticker: str, df: pd.DataFrame, row: Optional[Dict]) -> None:
+        self.entries[ticker] = [_fingerprint(df), row, time.time()]
+
+    def save(self) -> None:
+        """Atomically write the cache file, dropping expired entries."""
+        now = time.time()
+        entries = {t: e for t, e in self.entries.items() if now - e[2] < self.max_age}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"settings": self.settings, "tickers": entries},
+                                       separators=(",", ":"), default=_json_default))
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_text())
+        except Exception as exc:
+            print(f"[SCAN CACHE] Could not read {self.path}, starting fresh: {exc}")
+            return
+        # Rows computed under other settings would be wrong, not just stale
+        if raw.get("settings") == self.settings:
+            self.entries = raw.get("tickers", {})
+
+
+def _fingerprint(df: pd.DataFrame) -> list:
+    # JSON round-trips tuples as lists, so compare in list form
+    return json.loads(json.dumps(bars_fingerprint(df), default=str))
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def get_scan_row_cache(cfg: Dict = None, include_fundamentals: bool = False) -> Optional[ScanRowCache]:
+    """Cache for the `scan_cache:` config section (None when disabled)."""
+    cfg = cfg or {}
+    cache_cfg = cfg.get("scan_cache") or {}
+    if not cache_cfg.get("enabled", True):
+        return None
+    return ScanRowCache(Path(cache_cfg.get("path", str(SCAN_CACHE_PATH))),
+                        scan_settings_hash(cfg, include_fundamentals),
+                        cache_cfg.get("max_age_hours", MAX_AGE_HOURS))
@@ -0,0 +1,222 @@
+"""
+Staged scan pipeline behind scan_and_chart.main.
+
+    download batches (threads) --+--> indicators + signals (processes)
+                                 +--> fundamentals (threads)
+                                 +--> charts (processes, small scans only)
+
+Every stage has its own pool sized from the `pipeline:` config section, and
+at most `max_pending` jobs of a stage are submitted but unfinished at once.
+A full stage blocks the download loop feeding it, so a slow stage throttles
+the network instead of the whole universe piling up in memory, while the
+other stages keep the cores and connections busy.
+"""
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List
+
+from fundamentals import fetch_fundamentals, recommend_trade_action
+from indicator_engine import compute_indicators
+from market_data import YF_BATCH_SIZE
+from market_panel import MarketPanel
+from panel_signals import evaluate_panel_signals, panel_scores, panel_trend
+from scan_and_chart import (SCAN_OUTPUT_COLUMNS, get_clean_prices_many, save_chart, scan_history,
+                            tail_history)
+from signals_engine import load_signal_plugins, required_columns
+
+
+PIPELINE_DEFAULTS = {
+    "download_workers": 4,       # concurrent batch downloads
+    "cpu_workers": 4,            # processes for indicators/signals (0 = in-process)
+    "fundamentals_workers": 16,  # concurrent fundamentals lookups
+    "render_workers": 2,         # processes rendering charts (0 = in-process)
+    "max_pending": 8,            # per-stage cap on unfinished jobs
+}
+CHART_MAX_TICKERS = 50           # charts are only rendered for scans this small
+
+
+class _Stage:
+    """An executor plus a cap on submitted-but-unfinished jobs."""
+
+    def __init__(self, executor, max_pending: int):
+        self.executor = executor
+        self.max_pending = max(max_pending, 1)
+        self._pending = set()
+
+    def submit(self, fn, *args) -> Future:
+        while len(self._pending) >= self.max_pending:
+            _, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+        future = self.executor.submit(fn, *args)
+        self._pending.add(future)
+        return future
+
+
+class _InlineExecutor:
+    """Executor stand-in that runs jobs immediately in the calling thread."""
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def _process_pool(workers: int):
+    if workers <= 0:
+        return _InlineExecutor()
+    # Fresh interpreters: forking while download threads hold locks can deadlock
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def pipeline_settings(cfg: Dict) -> Dict:
+    return {**PIPELINE_DEFAULTS, **(cfg.get("pipeline") or {})}
+
+
+def evaluate_chunk(frames: Dict, cfg: Dict, columns: List[str]) -> Dict[str, Dict]:
+    """
+    CPU stage: indicators, signals, trend and technical score for a batch of
+    {ticker: frame}, reduced to the latest values the result rows need.
+    """
+    load_signal_plugins(cfg)
+    panel = MarketPanel.from_frames(frames)
+    if not len(panel):
+        return {}
+    indicators = compute_indicators(panel, cfg, columns=columns)
+    signals = evaluate_panel_signals(panel, indicators, cfg)
+    trends = panel_trend(indicators)
+    scores = panel_scores(signals, trends)
+    latest = {col: values[:, -1] for col, values in indicators.items()}
+
+    out = {}
+    for i, ticker in enumerate(panel.tickers):
+        row = {col: float(values[i]) for col, values in latest.items()}
+        row.update(
+            Close=float(frames[ticker]["Close"].iloc[-1]),
+            Trend=str(trends[i]),
+            TechnicalScore=int(scores[i]),
+            signals={key: bool(fired[i]) for key, fired in signals.items()},
+        )
+        out[ticker] = row
+    return out
+
+
+def _result_row(ticker: str, tech: Dict, fundamentals) -> Dict:
+    fund_score = fundamentals.fundamental_score
+    action_info = recommend_trade_action(tech["TechnicalScore"], fund_score, tech["Trend"])
+    row = {
+        "Ticker": ticker,
+        "Score": action_info["total_score"],
+        "TechnicalScore": tech["TechnicalScore"],
+        "FundamentalScore": fund_score,
+        "Trend": tech["Trend"],
+        "BBWidth_pct": round(tech["bb_width"] * 100, 2),
+        "ATR%": round(tech["atr_pct"] * 100, 2),
+        "ADX": round(tech["adx"], 2),
+        "RSI": round(tech["rsi"], 2),
+        "Close": round(tech["Close"], 2),
+        "MarketCap": fundamentals.market_cap,
+        "PERatio": fundamentals.pe_ratio,
+        "RevenueGrowthPct": fundamentals.revenue_growth_pct,
+        "ProfitMarginPct": fundamentals.profit_margin_pct,
+        "FundamentalOutlook": fundamentals.outlook,
+        "FundamentalReasons": fundamentals.reasons,
+        "Action": action_info["action"],
+        "ActionReason": action_info["reason"],
+    }
+    row.update(tech["signals"])
+    return row
+
+
+def run_scan_pipeline(tickers: Iterable[str], cfg: Dict) -> List[Dict]:
+    """Scan `tickers` through the staged pipeline; returns result rows in ticker order."""
+    tickers = list(tickers)
+    settings = pipeline_settings(cfg)
+    data_cfg = cfg.get("data") or {}
+    period, history_bars = scan_history(cfg)
+    columns = required_columns(cfg, SCAN_OUTPUT_COLUMNS)
+    batch_size = data_cfg.get("batch_size", YF_BATCH_SIZE)
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    verbose = len(tickers) <= CHART_MAX_TICKERS
+    # A single batch gains nothing from worker processes
+    cpu_workers = settings["cpu_workers"] if len(batches) > 1 else 0
+    render_workers = settings["render_workers"] if verbose else 0
+    max_pending = settings["max_pending"]
+
+    def download(batch):
+        return tail_history(get_clean_prices_many(batch, period, data_cfg["interval"], data_cfg), history_bars)
+
+    cpu_jobs, fundamentals_jobs, chart_jobs = [], {}, []
+    with ThreadPoolExecutor(max_workers=settings["download_workers"]) as io_pool, \
+            _process_pool(cpu_workers) as cpu_pool, \
+            ThreadPoolExecutor(max_workers=settings["fundamentals_workers"]) as fundamentals_pool, \
+            _process_pool(render_workers) as render_pool:
+        cpu = _Stage(cpu_pool, max_pending)
+        fundamentals = _Stage(fundamentals_pool, max_pending * settings["fundamentals_workers"])
+        render = _Stage(render_pool, max_pending)
+
+        # Batches are submitted lazily, so a backed-up stage also pauses the downloads
+        pending = {}
+        remaining = iter(batches)
+
+        def fill_downloads():
+            for batch in remaining:
+                pending[io_pool.submit(download, batch)] = batch
+                if len(pending) >= max_pending:
+                    return
+
+        fill_downloads()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                try:
+                    prices = future.result()
+                except Exception as exc:
+                    print(f"[PIPELINE] Download failed for {len(batch)} tickers: {exc}")
+                    continue
+                if prices:
+                    cpu_jobs.append(cpu.submit(evaluate_chunk, prices, cfg, columns))
+                for ticker, df in prices.items():
+                    fundamentals_jobs[ticker] = fundamentals.submit(fetch_fundamentals, ticker)
+                    if verbose:
+                        chart_jobs.append(render.submit(save_chart, df, ticker, cfg["output"]["charts_dir"]))
+            fill_downloads()
+
+        technical = {}
+        for job in cpu_jobs:
+            try:
+                technical.update(job.result())
+            except Exception as exc:
+                print(f"[PIPELINE] Indicator batch failed: {exc}")
+
+        results = []
+        for idx, ticker in enumerate(tickers, 1):
+            if not verbose and idx % 50 == 0:
+                print(f"✓ Progress: {idx}/{len(tickers)} stocks scanned ({idx * 100 // len(tickers)}%)")
+            if ticker not in technical:
+                if verbose:  # Only print for small scans
+                    print(f"[NO DATA] {ticker}")
+                continue
+            try:
+                results.append(_result_row(ticker, technical[ticker], fundamentals_jobs[ticker].result()))
+            except Exception as exc:
+                if verbose:  # Only show errors for small scans
+                    print(f"[ERROR] {ticker}: {exc}")
+
+        for job in chart_jobs:
+            try:
+                job.result()
+            except Exception as exc:
+                print(f"[CHART ERROR] {exc}")
+    return results
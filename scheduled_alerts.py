@@ -11,14 +11,28 @@ import schedule
 import yaml
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
 from typing import List, Dict
 
 # Import existing modules
-from top_performers_scanner import get_stock_universe, add_indicators
-from scan_and_chart import add_indicators
+from top_performers_scanner import get_stock_universe
+from scan_and_chart import add_indicators_cached
 from telegram_bot import TelegramBot
+from market_data import fetch_price_history_many
+from timeframes import fetch_timeframes, last_session
+from streaming_indicators import STREAMING_STATE_DIR, advance, load_states, save_states
+
+# History each intraday job reads (see timeframes.fetch_timeframes): hourly
+# tips only look at today's session; 3-hour predictions need 50 15m bars,
+# about two sessions
+SESSION_PERIOD = '1d'
+PREDICTION_PERIOD = '5d'
+
+# Indicator columns the prediction jobs read
+PREDICTION_COLUMNS = ('rsi', 'adx', 'atr_pct')
+
+# Per-ticker incremental indicator state for 3-hour predictions
+PREDICTION_STATE_PATH = STREAMING_STATE_DIR / "predictions_15m.json"
 
 # ============================================================
 # TELEGRAM SETUP
@@ -36,6 +50,14 @@ def get_bot():
     return TelegramBot(bot_token, chat_id)
 
 
+def get_data_cfg() -> Dict:
+    """Data section of config.yaml (bar store settings for batched downloads)"""
+    try:
+        return yaml.safe_load(open("config.yaml", "r")).get("data", {})
+    except Exception:
+        return {}
+
+
 # ============================================================
 # HOURLY TIPS (Every Hour)
 # ============================================================
@@ -52,10 +74,13 @@ def scan_hourly_tips(top_n: int = 10) -> pd.DataFrame:
 
     results = []
 
-    for ticker in tickers:
+    # Today's 5m bars (reuses a fresh 1m download of the session if one exists)
+    frames = fetch_timeframes(tickers, SESSION_PERIOD, ['5m'], data_cfg=get_data_cfg())['5m']
+
+    for ticker, df in frames.items():
         try:
-            # Get intraday data
-            df = yf.download(ticker, period='1d', interval='5m', progress=False)
+            # Today's session only
+            df = last_session(df)
 
             if df.empty or len(df) < 12:  # Need at least 1 hour of 5min data
                 continue
@@ -151,27 +176,24 @@ def scan_3hour_predictions(top_n: int = 10) -> pd.DataFrame:
 
     results = []
 
-    for ticker in tickers:
-        try:
-            # Get recent data
-            df = yf.download(ticker, period='5d', interval='15m', progress=False)
+    # 15m bars over the last few sessions
+    frames = fetch_timeframes(tickers, PREDICTION_PERIOD, ['15m'], data_cfg=get_data_cfg())['15m']
 
-            if df.empty or len(df) < 50:
-                continue
+    # Indicators advance only by the bars that arrived since the previous run
+    states = load_states(PREDICTION_STATE_PATH, cfg)
 
-            # Add indicators
-            df = add_indicators(df, cfg)
-
-            if df.empty:
+    for ticker, df in frames.items():
+        try:
+            if df.empty or len(df) < 50:
                 continue
 
-            latest = df.iloc[-1]
+            latest = advance(states, ticker, df, cfg)
 
             # Current metrics
-            price = float(latest['Close'])
-            rsi = float(latest['RSI'])
-            adx = float(latest['ADX'])
-            atr_pct = float(latest['ATR%'])
+            price = float(df['Close'].iloc[-1])
+            rsi = float(latest['rsi'])
+            adx = float(latest['adx'])
+            atr_pct = float(latest['atr_pct']) * 100
 
             # Calculate momentum (last 3 hours = 12 candles of 15min)
             if len(df) >= 12:
@@ -225,6 +247,8 @@ def scan_3hour_predictions(top_n: int = 10) -> pd.DataFrame:
         except Exception:
             continue
 
+    save_states(PREDICTION_STATE_PATH, states)
+
     if not results:
         return pd.DataFrame()
 
@@ -299,16 +323,18 @@ def scan_weekly_predictions(top_n: int = 15) -> pd.DataFrame:
 
     results = []
 
-    for ticker in tickers:
-        try:
-            # Get daily data for weekly analysis
-            df = yf.download(ticker, period='3mo', interval='1d', progress=False)
+    # One batched (or Polygon grouped-daily) download for the whole universe
+    data_cfg = cfg.get("data", {})
+    frames = fetch_price_history_many(tickers, period='3mo', interval='1d',
+                                      provider=data_cfg.get("provider", "yfinance"), data_cfg=data_cfg)
 
+    for ticker, df in frames.items():
+        try:
             if df.empty or len(df) < 30:
                 continue
 
             # Add indicators
-            df = add_indicators(df, cfg)
+            df = add_indicators_cached(df, cfg, ticker, '1d', columns=PREDICTION_COLUMNS)
 
             if df.empty:
                 continue
@@ -317,9 +343,9 @@ def scan_weekly_predictions(top_n: int = 15) -> pd.DataFrame:
 
             # Current metrics
             price = float(latest['Close'])
-            rsi = float(latest['RSI'])
-            adx = float(latest['ADX'])
-            atr_pct = float(latest['ATR%'])
+            rsi = float(latest['rsi'])
+            adx = float(latest['adx'])
+            atr_pct = float(latest['atr_pct']) * 100
 
             # Weekly momentum
             week_ago = df['Close'].iloc[-5] if len(df) >= 5 else df['Close'].iloc[0]
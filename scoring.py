@@ -0,0 +1,167 @@
+"""
+Vectorized scoring.
+
+One place for the scores and trade levels the scanners attach to their
+results. Every function takes whole columns (arrays, Series or a dict/frame
+of signal flags) and returns arrays or frames, so scoring a 700-row scan is
+a handful of NumPy operations rather than 700 Python calls.
+
+Signal scores come from a weight profile:
+    "scan" - SIGNAL_DEFINITIONS weights (scan_and_chart, panel scans)
+    "live" - 2 points per core signal, 1 per confirmation (live_scanner)
+Both add 1 for an UP trend. The live market page uses heuristic_scores
+(RSI/ADX/momentum/volume) instead.
+"""
+from typing import Dict, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+from signals_engine import SIGNAL_DEFINITIONS
+
+
+LIVE_WEIGHTS = {
+    "Consolidating": 2, "BuyDip": 2, "Breakout": 2, "VolSpike": 2,
+    "EMABullish": 1, "MACDBullish": 1, "VWAPReclaim": 1,
+}
+TREND_BONUS = 1
+
+# Timeframe scaling of the daily ATR move (square-root-of-time rule)
+MOVE_HORIZONS = {"1h": 1 / np.sqrt(24), "3h": np.sqrt(3 / 24), "1d": 1.0, "7d": np.sqrt(7)}
+
+# (stop, first target, second target) as fractions of the 1-day move, by timeframe label
+LEVEL_FACTORS = {
+    "intraday": (0.6, 0.4, 0.8),
+    "swing": (0.8, 0.5, 1.0),
+    "position": (1.0, 0.6, 1.2),
+}
+DEFAULT_LEVEL_FACTORS = (0.75, 0.5, 1.0)
+
+Flags = Union[pd.DataFrame, Mapping[str, np.ndarray]]
+
+
+def profile_weights(profile: str = "scan") -> Dict[str, int]:
+    if profile == "scan":
+        return {d.key: d.weight for d in SIGNAL_DEFINITIONS}
+    if profile == "live":
+        return dict(LIVE_WEIGHTS)
+    raise ValueError(f"Unknown score profile: {profile}")
+
+
+def signal_scores(flags: Flags, trend, profile: str = "scan") -> np.ndarray:
+    """Weighted sum of the signal flags plus the trend bonus, one int per row."""
+    weights = profile_weights(profile)
+    trend = np.asarray(trend)
+    score = TREND_BONUS * (trend == "UP").astype(int)
+    keys = [key for key in weights if key in flags]
+    if keys:
+        matrix = np.column_stack([np.asarray(flags[key], dtype=bool) for key in keys])
+        score = score + matrix.astype(int) @ np.array([weights[key] for key in keys])
+    return score
+
+
+def heuristic_scores(rsi, adx, change_pct, weekly_pct, vol_ratio) -> np.ndarray:
+    """1-10 score from RSI zone, ADX trend strength, momentum and volume."""
+    rsi, adx = np.asarray(rsi, dtype="f8"), np.asarray(adx, dtype="f8")
+    score = (
+        5
+        + ((rsi >= 30) & (rsi <= 70)) + 2 * (rsi < 30) - (rsi > 70)
+        + (adx > 25) + (adx > 40)
+        + (np.asarray(change_pct) > 1) + (np.asarray(weekly_pct) > 3)
+        + (np.asarray(vol_ratio) > 1.5)
+    )
+    return np.clip(score, 1, 10)
+
+
+def heuristic_actions(score, rsi, change_pct, weekly_pct) -> np.ndarray:
+    """BUY / WATCH / TAKE_PROFIT / AVOID / HOLD for heuristic_scores rows."""
+    score, rsi = np.asarray(score), np.asarray(rsi)
+    change_pct, weekly_pct = np.asarray(change_pct), np.asarray(weekly_pct)
+    return np.select(
+        [(score >= 8) & (rsi < 65) & (weekly_pct > 0),
+         (score >= 6) & (rsi < 70),
+         rsi > 75,
+         (score <= 3) | ((rsi > 70) & (change_pct < -1))],
+        ["BUY", "WATCH", "TAKE_PROFIT", "AVOID"],
+        default="HOLD",
+    )
+
+
+def atr_targets(price, atr_pct) -> pd.DataFrame:
+    """Stop 1.5 ATR below, targets 1.5 and 3 ATR above (atr_pct in percent)."""
+    price, atr_pct = np.asarray(price, dtype="f8"), np.asarray(atr_pct, dtype="f8")
+    return pd.DataFrame({
+        "stop": np.round(price * (1 - atr_pct * 1.5 / 100), 2),
+        "tp1": np.round(price * (1 + atr_pct * 1.5 / 100), 2),
+        "tp2": np.round(price * (1 + atr_pct * 3 / 100), 2),
+    })
+
+
+def potential_moves(atr_pct, score, trend) -> pd.DataFrame:
+    """
+    Expected up/down move (%) over 1h, 3h, 1d and 7d from the daily ATR,
+    skewed by score toward the trend: potential_up_1h_pct ... potential_down_7d_pct.
+    """
+    daily_move = np.asarray(atr_pct, dtype="f8") * 100
+    score_norm = np.clip(np.asarray(score, dtype="f8"), 0, 10) / 10.0
+    trend = np.asarray(trend)
+    skew = np.where(trend == "UP", 0.5, np.where(trend == "DOWN", -0.5, 0.0)) * score_norm
+    moves = {}
+    for horizon, scale in MOVE_HORIZONS.items():
+        moves[f"potential_up_{horizon}_pct"] = np.round(daily_move * scale * (1.0 + skew), 2)
+        moves[f"potential_down_{horizon}_pct"] = np.round(daily_move * scale * (1.0 - skew), 2)
+    return pd.DataFrame(moves)
+
+
+def actions_and_timeframes(score, trend, rsi, breakout, potential_up_1d, potential_down_1d) -> pd.DataFrame:
+    """
+    action ("BUY" | "WATCH" | "AVOID" | "TAKE_PROFIT" | "TRAIL_STOP"),
+    timeframe_label and action_reason for each row; the first matching rule wins.
+    """
+    score, rsi, trend = np.asarray(score), np.asarray(rsi, dtype="f8"), np.asarray(trend)
+    up, down = np.asarray(potential_up_1d, dtype="f8"), np.asarray(potential_down_1d, dtype="f8")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        risk_reward = np.where(down > 0, up / down, 0.0)
+
+    uptrend = trend == "UP"
+    rules = [
+        (score >= 8) & uptrend & (risk_reward > 2.0),
+        (score >= 6) & (score < 8) & uptrend & (risk_reward > 1.5),
+        (score >= 5) & (score < 6) & (uptrend | (trend == "CHOPPY")),
+        (rsi > 75) & uptrend & np.asarray(breakout, dtype=bool),
+        (rsi > 70) & uptrend & (score >= 7),
+        score < 5,
+    ]
+    score_txt = score.astype(str).astype(object)
+    rr_txt = np.char.mod("%.2f", risk_reward).astype(object)
+    rsi_txt = np.char.mod("%.0f", rsi).astype(object)
+    reasons = [
+        "Strong setup: Score " + score_txt + "/10, uptrend, R:R " + rr_txt,
+        "Good intraday setup: Score " + score_txt + "/10, R:R " + rr_txt,
+        "Setup forming—wait for confirmation. Score " + score_txt + "/10",
+        "Overbought (RSI " + rsi_txt + ")—consider profit-taking",
+        np.full(len(score), "Strong but extended—trail your stop", dtype=object),
+        "Weak setup: Score " + score_txt + "/10, low probability",
+    ]
+    return pd.DataFrame({
+        "action": np.select(rules, ["BUY", "BUY", "WATCH", "TAKE_PROFIT", "TRAIL_STOP", "AVOID"], "WATCH"),
+        "timeframe_label": np.select(rules, ["swing", "intraday", "intraday", "swing_exit", "swing", "none"],
+                                     "intraday"),
+        "action_reason": np.select(rules, reasons, "Neutral setup—monitor for now. Score " + score_txt + "/10"),
+    })
+
+
+def price_levels(close, potential_down_1d, potential_up_1d, timeframe_label) -> pd.DataFrame:
+    """entry_price, stop_loss_price, take_profit_1 and take_profit_2 scaled by timeframe."""
+    close = np.asarray(close, dtype="f8")
+    down, up = np.asarray(potential_down_1d, dtype="f8"), np.asarray(potential_up_1d, dtype="f8")
+    labels = pd.Series(np.asarray(timeframe_label, dtype=object)).astype(str)
+    matches = [labels.str.contains(name, regex=False).to_numpy() for name in LEVEL_FACTORS]
+    stop, tp1, tp2 = (np.select(matches, [f[i] for f in LEVEL_FACTORS.values()], DEFAULT_LEVEL_FACTORS[i])
+                      for i in range(3))
+    return pd.DataFrame({
+        "entry_price": close,
+        "stop_loss_price": np.round(close * (1 - down * stop / 100.0), 2),
+        "take_profit_1": np.round(close * (1 + up * tp1 / 100.0), 2),
+        "take_profit_2": np.round(close * (1 + up * tp2 / 100.0), 2),
+    })
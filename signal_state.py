@@ -0,0 +1,107 @@
+"""
+Edge-triggered signal state across scans.
+
+A stock can stay "Consolidating" for days; re-sending it on every scan only
+repeats old news. Each ticker's active signals are kept as a bitmask plus
+the time that set of signals began, and every scan is diffed against it so
+alerts and DB writes only see transitions: signals that started or ended.
+
+State lives in one small JSON file (.cache/signal_state.json). Bit positions
+are stored with it, so registering new signals never reshuffles old masks.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from signals_engine import SIGNAL_DEFINITIONS
+
+
+SIGNAL_STATE_PATH = Path(".cache") / "signal_state.json"
+
+
+@dataclass
+class SignalTransition:
+    ticker: str
+    started: List[str] = field(default_factory=list)
+    ended: List[str] = field(default_factory=list)
+    active: List[str] = field(default_factory=list)
+    since: str = ""
+
+
+class SignalStateStore:
+    """{ticker: (active-signal bitmask, since)} persisted as JSON."""
+
+    def __init__(self, path: Path = SIGNAL_STATE_PATH):
+        self.path = Path(path)
+        self.keys: List[str] = []
+        self.states: Dict[str, list] = {}
+        self._load()
+
+    def update(self, ticker: str, flags: Dict[str, bool], ts: str = None) -> Optional[SignalTransition]:
+        """Record this scan's flags for ticker; returns the transition, or None if nothing changed."""
+        mask = self.mask_of(key for key, fired in flags.items() if fired)
+        previous, since = self.states.get(ticker, (0, ""))
+        if mask == previous:
+            return None
+        since = ts or datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.states[ticker] = [mask, since]
+        return SignalTransition(ticker, self.keys_of(mask & ~previous), self.keys_of(previous & ~mask),
+                                self.keys_of(mask), since)
+
+    def transitions(self, results: List[Dict], ts: str = None) -> List[Dict]:
+        """
+        Scan result rows whose signals changed, annotated with NewSignals,
+        EndedSignals and SignalsSince. Unchanged rows are dropped.
+        """
+        keys = [d.key for d in SIGNAL_DEFINITIONS]
+        changed = []
+        for row in results:
+            transition = self.update(row["Ticker"], {key: row.get(key, False) for key in keys}, ts)
+            if transition is None:
+                continue
+            changed.append(dict(row, NewSignals=", ".join(transition.started),
+                                EndedSignals=", ".join(transition.ended), SignalsSince=transition.since))
+        return changed
+
+    def active(self, ticker: str) -> List[str]:
+        return self.keys_of(self.states.get(ticker, (0, ""))[0])
+
+    def mask_of(self, keys: Iterable[str]) -> int:
+        mask = 0
+        for key in keys:
+            if key not in self.keys:
+                self.keys.append(key)
+            mask |= 1 << self.keys.index(key)
+        return mask
+
+    def keys_of(self, mask: int) -> List[str]:
+        return [key for bit, key in enumerate(self.keys) if mask >> bit & 1]
+
+    def save(self) -> None:
+        """Atomically write the state file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"keys": self.keys, "tickers": self.states}, separators=(",", ":")))
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_text())
+            self.keys = list(raw["keys"])
+            self.states = {ticker: list(state) for ticker, state in raw["tickers"].items()}
+        except Exception as exc:
+            print(f"[SIGNAL STATE] Could not read {self.path}, starting fresh: {exc}")
+            self.keys, self.states = [], {}
+
+
+def get_signal_state_store(cfg: Dict = None) -> Optional[SignalStateStore]:
+    """Store for the `signal_state:` config section (None when disabled)."""
+    state_cfg = (cfg or {}).get("signal_state") or {}
+    if not state_cfg.get("enabled", True):
+        return None
+    return SignalStateStore(Path(state_cfg.get("path", str(SIGNAL_STATE_PATH))))
@@ -1,11 +1,30 @@
 """
 Technical signal engine with modular definitions.
+
+Every detector has two forms: a scalar one that answers "does the signal
+fire on the last bar?" and a `*_series` one that answers it for every bar
+at once with rolling/vectorized operations (for replaying history).
+
+SIGNAL_DEFINITIONS is the registry. Each definition declares the columns it
+reads, how many trailing bars it inspects and a relative cost, so scans can
+size their fetch window, skip detectors whose inputs are missing and run
+cheap detectors first. Extra detectors can be registered in code
+(register_signal), from config (`signals.plugins: ["module:attribute"]`) or
+by installed packages through the `ai_stock_agent.signals` entry point group.
 """
+import importlib
 from dataclasses import dataclass
-from typing import Callable, Dict, List
+from importlib.metadata import entry_points
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from indicator_graph import INDICATOR_COLUMNS, PRICE_COLUMNS, warmup_bars
+
+
+PLUGIN_ENTRY_POINT_GROUP = "ai_stock_agent.signals"
+
 
 def _get_signal_cfg(cfg: Dict, name: str) -> Dict:
     return cfg.get("signals", {}).get(name, {})
@@ -105,31 +124,237 @@ def vwap_reclaim(df: pd.DataFrame, cfg: Dict) -> bool:
     return above and prev_below
 
 
+# ----------------------------------------------------------------------
+# Full-history forms: bar i of each series equals the scalar detector run
+# on df.iloc[:i + 1]
+# ----------------------------------------------------------------------
+
+def _from_bar(df: pd.DataFrame, first: int) -> np.ndarray:
+    """True from bar index `first` on (the scalar detectors' minimum length)."""
+    return np.arange(len(df)) >= first
+
+
+def consolidating_series(df: pd.DataFrame, cfg: Dict) -> pd.Series:
+    s = _get_signal_cfg(cfg, "consolidation")
+    lookback = s.get("lookback", 20)
+    means = df[["bb_width", "atr_pct", "adx"]].rolling(lookback, min_periods=1).mean()
+    return (
+        _from_bar(df, lookback - 1) &
+        (means["bb_width"] < s.get("bb_width_mean_max", 0.06)) &
+        (means["atr_pct"] < s.get("atr_pct_mean_max", 0.025)) &
+        (means["adx"] < s.get("adx_mean_max", 20))
+    )
+
+
+def buy_the_dip_series(df: pd.DataFrame, cfg: Dict) -> pd.Series:
+    s = _get_signal_cfg(cfg, "buy_the_dip")
+    fired = df["rsi"] <= s.get("rsi_max", 35)
+    if s.get("close_below_lower_bb", True):
+        fired &= df["Close"] < df["bb_low"]
+    return fired & df["bb_low"].notna()
+
+
+def breakout_series(df: pd.DataFrame, cfg: Dict) -> pd.Series:
+    s = _get_signal_cfg(cfg, "breakout")
+    lookback = s.get("lookback", 20)
+    if lookback < 2:
+        return pd.Series(False, index=df.index)
+    recent_high = df["High"].rolling(lookback - 1, min_periods=1).max().shift(1)
+    return _from_bar(df, lookback - 1) & (df["Close"] > recent_high) & (df["adx"] >= s.get("adx_min", 18))
+
+
+def volume_spike_series(df: pd.DataFrame, cfg: Dict) -> pd.Series:
+    s = _get_signal_cfg(cfg, "volume_spike")
+    vol_ma = df["vol_ma_20"].where(df["vol_ma_20"] != 0)
+    return df["Volume"] / vol_ma >= s.get("volume_multiplier", 1.5)
+
+
+def ema_bullish_alignment_series(df: pd.DataFrame, cfg: Dict) -> pd.Series:
+    s = _get_signal_cfg(cfg, "ema_bullish")
+    min_sep = s.get("min_separation_pct", 0.5) / 100
+    e20, e50, e200 = df["ema_20"], df["ema_50"], df["ema_200"]
+    stacked = (e20 > e50) & (e50 > e200)
+    return stacked & ((e20 - e50) / e50 >= min_sep) & ((e50 - e200) / e200 >= min_sep)
+
+
+def macd_bullish_cross_series(df: pd.DataFrame, cfg: Dict) -> pd.Series:
+    if "macd" not in df.columns or "macd_signal" not in df.columns:
+        return pd.Series(False, index=df.index)
+    s = _get_signal_cfg(cfg, "macd_bullish")
+    macd, signal = df["macd"], df["macd_signal"]
+    crossed = (macd.shift(1) <= signal.shift(1)) & (macd > signal)
+    hist = df["macd_hist"] if "macd_hist" in df.columns else pd.Series(0.0, index=df.index)
+    return crossed & (hist >= s.get("histogram_min", 0.0))
+
+
+def vwap_reclaim_series(df: pd.DataFrame, cfg: Dict) -> pd.Series:
+    if "vwap" not in df.columns:
+        return pd.Series(False, index=df.index)
+    s = _get_signal_cfg(cfg, "vwap_reclaim")
+    lookback = max(s.get("lookback", 20), 2)
+    pct = s.get("min_close_above_pct", 0.2) / 100
+    above = df["Close"] >= df["vwap"] * (1 + pct)
+    below = (df["Close"] < df["vwap"]).astype(float)
+    prev_below = below.shift(1).rolling(lookback - 1, min_periods=1).max() > 0
+    return above & prev_below
+
+
 @dataclass(frozen=True)
 class SignalDefinition:
     key: str
     label: str
     weight: int
     detector: Callable[[pd.DataFrame, Dict], bool]
+    config_key: str = ""                # section under cfg["signals"]
+    requires: Tuple[str, ...] = ()      # columns the detector reads
+    lookback: int = 1                   # trailing bars the detector inspects
+    series: Optional[Callable[[pd.DataFrame, Dict], pd.Series]] = None  # every-bar form
+    cost: int = 1                       # relative evaluation cost (cheapest run first)
 
 
 SIGNAL_DEFINITIONS: List[SignalDefinition] = [
-    SignalDefinition("Consolidating", "🟢 CONSOLIDATION", 1, consolidating),
-    SignalDefinition("BuyDip", "📉 BUY THE DIP", 2, buy_the_dip),
-    SignalDefinition("Breakout", "🚀 BREAKOUT", 3, breakout),
-    SignalDefinition("VolSpike", "📈 VOLUME SPIKE", 1, volume_spike),
-    SignalDefinition("EMABullish", "📐 EMA STACK", 1, ema_bullish_alignment),
-    SignalDefinition("MACDBullish", "🎯 MACD BULLISH", 1, macd_bullish_cross),
-    SignalDefinition("VWAPReclaim", "💧 VWAP RECLAIM", 1, vwap_reclaim),
+    SignalDefinition("Consolidating", "🟢 CONSOLIDATION", 1, consolidating,
+                     "consolidation", ("bb_width", "atr_pct", "adx"), 20, consolidating_series, 3),
+    SignalDefinition("BuyDip", "📉 BUY THE DIP", 2, buy_the_dip,
+                     "buy_the_dip", ("rsi", "bb_low", "Close"), 1, buy_the_dip_series),
+    SignalDefinition("Breakout", "🚀 BREAKOUT", 3, breakout,
+                     "breakout", ("High", "Close", "adx"), 20, breakout_series, 2),
+    SignalDefinition("VolSpike", "📈 VOLUME SPIKE", 1, volume_spike,
+                     "volume_spike", ("Volume", "vol_ma_20"), 1, volume_spike_series),
+    SignalDefinition("EMABullish", "📐 EMA STACK", 1, ema_bullish_alignment,
+                     "ema_bullish", ("ema_20", "ema_50", "ema_200"), 1, ema_bullish_alignment_series),
+    SignalDefinition("MACDBullish", "🎯 MACD BULLISH", 1, macd_bullish_cross,
+                     "macd_bullish", ("macd", "macd_signal", "macd_hist"), 2, macd_bullish_cross_series),
+    SignalDefinition("VWAPReclaim", "💧 VWAP RECLAIM", 1, vwap_reclaim,
+                     "vwap_reclaim", ("vwap", "Close"), 20, vwap_reclaim_series, 2),
 ]
 
 
-def evaluate_signals(df: pd.DataFrame, cfg: Dict) -> Dict[str, bool]:
-    results: Dict[str, bool] = {}
-    for definition in SIGNAL_DEFINITIONS:
+_loaded_plugins = set()
+
+
+def register_signal(definition: SignalDefinition) -> None:
+    """Add a detector to the registry (replacing any definition with the same key)."""
+    for i, existing in enumerate(SIGNAL_DEFINITIONS):
+        if existing.key == definition.key:
+            SIGNAL_DEFINITIONS[i] = definition
+            return
+    SIGNAL_DEFINITIONS.append(definition)
+
+
+def _register_plugin(obj, source: str) -> None:
+    definitions = [obj] if isinstance(obj, SignalDefinition) else list(obj)
+    for definition in definitions:
+        if not isinstance(definition, SignalDefinition):
+            raise TypeError(f"{source} provided {type(definition).__name__}, not a SignalDefinition")
+        register_signal(definition)
+        print(f"[SIGNALS] Registered {definition.key} from {source}")
+
+
+def load_signal_plugins(cfg: Dict) -> None:
+    """
+    Register detectors from `signals.plugins` ("module:attribute" strings)
+    and from the ai_stock_agent.signals entry point group. Each target is a
+    SignalDefinition or an iterable of them; each is loaded once per process.
+    """
+    sources = [(spec, None) for spec in cfg.get("signals", {}).get("plugins", [])]
+    sources += [(f"entry point {ep.name}", ep) for ep in entry_points(group=PLUGIN_ENTRY_POINT_GROUP)]
+    for source, ep in sources:
+        if source in _loaded_plugins:
+            continue
+        _loaded_plugins.add(source)
+        try:
+            if ep is not None:
+                obj = ep.load()
+            else:
+                module_name, _, attribute = source.partition(":")
+                obj = getattr(importlib.import_module(module_name), attribute)
+            _register_plugin(obj, source)
+        except Exception as exc:
+            print(f"[SIGNALS] Could not load plugin {source}: {exc}")
+
+
+def signal_enabled(definition: SignalDefinition, cfg: Dict) -> bool:
+    """Signals are on unless `signals.<config_key>.enabled` is false."""
+    return _get_signal_cfg(cfg, definition.config_key).get("enabled", True)
+
+
+def required_columns(cfg: Dict, extra: Iterable[str] = ()) -> List[str]:
+    """
+    Columns read by the enabled signals plus `extra`, in first-seen order.
+    Columns no indicator produces are left out (their detectors are skipped).
+    """
+    columns = [col for d in SIGNAL_DEFINITIONS if signal_enabled(d, cfg) for col in d.requires]
+    known = set(PRICE_COLUMNS) | set(INDICATOR_COLUMNS)
+    return [col for col in dict.fromkeys(columns + list(extra)) if col in known]
+
+
+def has_inputs(definition: SignalDefinition, columns: Iterable[str]) -> bool:
+    return set(definition.requires) <= set(columns)
+
+
+def signal_lookback(definition: SignalDefinition, cfg: Dict) -> int:
+    """Trailing bars the detector inspects (`signals.<config_key>.lookback` overrides)."""
+    return max(_get_signal_cfg(cfg, definition.config_key).get("lookback", definition.lookback), 1)
+
+
+def required_history(cfg: Dict, extra: Iterable[str] = ()) -> int:
+    """
+    Bars a scan needs so that every bar the enabled signals inspect carries
+    converged indicator values: indicator warm-up plus the longest lookback.
+    """
+    lookback = max((signal_lookback(d, cfg) for d in SIGNAL_DEFINITIONS if signal_enabled(d, cfg)), default=1)
+    return warmup_bars(cfg, required_columns(cfg, extra)) + lookback
+
+
+def evaluate_signals(df: pd.DataFrame, cfg: Dict, min_score: Optional[int] = None,
+                     weights: Optional[Mapping[str, int]] = None) -> Dict[str, bool]:
+    """
+    {signal key: fired on the last bar}. Detectors run cheapest first; with
+    `min_score`, the remaining ones are skipped (reported False) as soon as
+    the weights still available can no longer reach it. `weights` replaces
+    the definitions' own weights (keys it lacks count 0), e.g. the live
+    score profile.
+    """
+    def weight(definition):
+        return definition.weight if weights is None else weights.get(definition.key, 0)
+
+    fired: Dict[str, bool] = {}
+    active = [d for d in SIGNAL_DEFINITIONS if signal_enabled(d, cfg) and has_inputs(d, df.columns)]
+    active.sort(key=lambda d: d.cost)
+    score = 0
+    remaining = sum(weight(d) for d in active)
+    for definition in active:
+        if min_score is not None and score + remaining < min_score:
+            break
+        remaining -= weight(definition)
         try:
-            results[definition.key] = bool(definition.detector(df, cfg))
+            fired[definition.key] = bool(definition.detector(df, cfg))
         except Exception as exc:
             print(f"[SIGNAL ERROR] {definition.key}: {exc}")
-            results[definition.key] = False
-    return results
+            fired[definition.key] = False
+        if fired[definition.key]:
+            score += weight(definition)
+    return {d.key: fired.get(d.key, False) for d in SIGNAL_DEFINITIONS}
+
+
+def evaluate_signal_series(df: pd.DataFrame, cfg: Dict) -> pd.DataFrame:
+    """
+    Boolean column per signal for every bar of df (indicator columns
+    attached). Row i matches evaluate_signals(df.iloc[:i + 1], cfg).
+    """
+    columns: Dict[str, pd.Series] = {}
+    for definition in SIGNAL_DEFINITIONS:
+        fired = pd.Series(False, index=df.index)
+        if signal_enabled(definition, cfg) and has_inputs(definition, df.columns) and not df.empty:
+            try:
+                if definition.series is not None:
+                    fired = definition.series(df, cfg).fillna(False).astype(bool)
+                else:
+                    # Plugin without a vectorized form: replay the scalar detector
+                    fired = pd.Series([bool(definition.detector(df.iloc[:i + 1], cfg)) for i in range(len(df))],
+                                      index=df.index)
+            except Exception as exc:
+                print(f"[SIGNAL ERROR] {definition.key}: {exc}")
+        columns[definition.key] = fired
+    return pd.DataFrame(columns, index=df.index)
@@ -0,0 +1,423 @@
+"""
+Streaming (incremental) indicators.
+
+Each object keeps just enough state to fold in one new bar in O(1) time:
+running EMAs, Wilder smoothing, and ring buffers with running sums for the
+rolling windows. Values follow the same warm-up rules as
+scan_and_chart.add_indicators / indicator_engine, so a stream seeded from
+history and then fed live bars gives the same numbers as a full recompute.
+
+State is plain JSON (to_dict / from_dict, save_states / load_states) so it
+survives restarts. advance() is the scan-side entry point: the 3-hour
+prediction job keeps one state per ticker and folds in only the bars that
+arrived since its previous run.
+"""
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+NAN = float("nan")
+STREAMING_STATE_DIR = Path(".cache") / "streaming"
+
+
+def _isnan(x) -> bool:
+    return x is None or x != x
+
+
+class RunningEMA:
+    """pandas ewm(alpha, adjust=False).mean() with optional min_periods."""
+
+    def __init__(self, alpha: float, min_periods: int = 0, value: float = NAN, seen: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = value
+        self.seen = seen
+
+    def update(self, x: float) -> float:
+        if _isnan(x):
+            return self.current
+        self.value = x if _isnan(self.value) else (1 - self.alpha) * self.value + self.alpha * x
+        self.seen += 1
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.value if self.seen >= max(self.min_periods, 1) else NAN
+
+    def to_dict(self) -> Dict:
+        return {"alpha": self.alpha, "min_periods": self.min_periods, "value": self.value, "seen": self.seen}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "RunningEMA":
+        return cls(**state)
+
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer with running sum and sum of squares.
+
+    Values are NaN until `window` finite observations fill the buffer (pandas
+    rolling semantics). Sums are rebuilt from the buffer once per lap to keep
+    floating-point drift bounded, which is still O(1) amortized.
+    """
+
+    def __init__(self, window: int, buffer=None, head: int = 0, count: int = 0):
+        self.window = window
+        self.buffer = list(buffer) if buffer is not None else [NAN] * window
+        self.head = head
+        self.count = count
+        self._resum()
+
+    def _resum(self):
+        finite = [x for x in self.buffer if not _isnan(x)]
+        self.total = math.fsum(finite)
+        self.total_sq = math.fsum(x * x for x in finite)
+        self.finite = len(finite)
+
+    def update(self, x: float) -> None:
+        old = self.buffer[self.head]
+        if not _isnan(old):
+            self.total -= old
+            self.total_sq -= old * old
+            self.finite -= 1
+        self.buffer[self.head] = x
+        if not _isnan(x):
+            self.total += x
+            self.total_sq += x * x
+            self.finite += 1
+        self.head = (self.head + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+        if self.head == 0:
+            self._resum()
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.window and self.finite == self.window
+
+    @property
+    def sum(self) -> float:
+        return self.total if self.full else NAN
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.window if self.full else NAN
+
+    @property
+    def std(self) -> float:
+        """Population (ddof=0) standard deviation."""
+        if not self.full:
+            return NAN
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+    def to_dict(self) -> Dict:
+        return {"window": self.window, "buffer": self.buffer, "head": self.head, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "RollingWindow":
+        return cls(**state)
+
+
+class WilderRSI:
+    """ta RSIIndicator: Wilder-smoothed gains/losses, 100 when there are no losses."""
+
+    def __init__(self, window: int, prev_close: float = NAN, up: Dict = None, down: Dict = None):
+        self.window = window
+        self.prev_close = prev_close
+        self.up = RunningEMA.from_dict(up) if up else RunningEMA(1 / window, min_periods=window)
+        self.down = RunningEMA.from_dict(down) if down else RunningEMA(1 / window, min_periods=window)
+
+    def update(self, close: float) -> float:
+        diff = 0.0 if _isnan(self.prev_close) else close - self.prev_close
+        self.prev_close = close
+        self.up.update(max(diff, 0.0))
+        self.down.update(max(-diff, 0.0))
+        return self.current
+
+    @property
+    def current(self) -> float:
+        up, down = self.up.current, self.down.current
+        if _isnan(down):
+            return NAN
+        return 100.0 if down == 0 else 100 - 100 / (1 + up / down)
+
+    def to_dict(self) -> Dict:
+        return {"window": self.window, "prev_close": self.prev_close,
+                "up": self.up.to_dict(), "down": self.down.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "WilderRSI":
+        return cls(**state)
+
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    if _isnan(prev_close):
+        return high - low
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class WilderATR:
+    """ta AverageTrueRange: 0 for the first window-1 bars, SMA seed, then Wilder smoothing."""
+
+    def __init__(self, window: int, prev_close: float = NAN, bars: int = 0, seed_sum: float = 0.0,
+                 value: float = 0.0):
+        self.window = window
+        self.prev_close = prev_close
+        self.bars = bars
+        self.seed_sum = seed_sum
+        self.value = value
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = _true_range(high, low, self.prev_close)
+        self.prev_close = close
+        self.bars += 1
+        if self.bars < self.window:
+            self.seed_sum += tr
+        elif self.bars == self.window:
+            self.value = (self.seed_sum + tr) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / float(self.window)
+        return self.value
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "WilderATR":
+        return cls(**state)
+
+
+class WilderADX:
+    """
+    ta ADXIndicator.adx(), bar by bar: smoothed TR/+DM/-DM are seeded from
+    bars 1..window, ADX is 0 until bar 2*window-1 (the mean of the first
+    `window` DX values) and Wilder-smoothed after that.
+    """
+
+    def __init__(self, window: int, prev_high: float = NAN, prev_low: float = NAN, prev_close: float = NAN,
+                 bars: int = 0, trs: float = 0.0, dip: float = 0.0, din: float = 0.0,
+                 dx_sum: float = 0.0, value: float = 0.0):
+        self.window = window
+        self.prev_high = prev_high
+        self.prev_low = prev_low
+        self.prev_close = prev_close
+        self.bars = bars
+        self.trs = trs
+        self.dip = dip
+        self.din = din
+        self.dx_sum = dx_sum
+        self.value = value
+
+    def update(self, high: float, low: float, close: float) -> float:
+        w = self.window
+        k = self.bars  # index of this bar
+        self.bars += 1
+        if k == 0:
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            return self.value
+
+        dm = max(high, self.prev_close) - min(low, self.prev_close)
+        diff_up = high - self.prev_high
+        diff_down = self.prev_low - low
+        pos = diff_up if diff_up > diff_down and diff_up > 0 else 0.0
+        neg = diff_down if diff_down > diff_up and diff_down > 0 else 0.0
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        if k <= w:
+            self.trs += dm
+            self.dip += pos
+            self.din += neg
+        else:
+            self.trs = self.trs - self.trs / float(w) + dm
+            self.dip = self.dip - self.dip / float(w) + pos
+            self.din = self.din - self.din / float(w) + neg
+        if k < w:
+            return self.value
+
+        di_pos = 100 * (self.dip / self.trs) if self.trs != 0 else 0.0
+        di_neg = 100 * (self.din / self.trs) if self.trs != 0 else 0.0
+        di_sum = di_pos + di_neg
+        dx = 100 * abs((di_pos - di_neg) / di_sum) if di_sum != 0 else 0.0
+
+        if k < 2 * w - 1:
+            self.dx_sum += dx
+        elif k == 2 * w - 1:
+            self.value = (self.dx_sum + dx) / w
+        else:
+            self.value = (self.value * (w - 1) + dx) / float(w)
+        return self.value
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "WilderADX":
+        return cls(**state)
+
+
+class StreamingIndicators:
+    """
+    All add_indicators columns for one ticker, updated one bar at a time.
+
+    Feed only completed bars; bars at or before the last applied timestamp are
+    ignored so overlapping refetches don't double-count.
+    """
+
+    def __init__(self, cfg: Dict, state: Dict = None):
+        ind = cfg["indicators"]
+        vwap_window = cfg.get("signals", {}).get("vwap_reclaim", {}).get("lookback", 20)
+        state = state or {}
+        self.params = {
+            "bb_window": ind["bb_window"], "bb_dev": ind["bb_dev"], "atr_window": ind["atr_window"],
+            "adx_window": ind["adx_window"], "rsi_window": ind["rsi_window"], "vwap_window": vwap_window,
+        }
+        if state and state.get("params") != self.params:
+            raise ValueError("Streaming state was built with different indicator settings")
+
+        p = self.params
+        self.last_ts: Optional[int] = state.get("last_ts")
+        self.bb = RollingWindow.from_dict(state["bb"]) if state else RollingWindow(p["bb_window"])
+        self.atr = WilderATR.from_dict(state["atr"]) if state else WilderATR(p["atr_window"])
+        self.adx = WilderADX.from_dict(state["adx"]) if state else WilderADX(p["adx_window"])
+        self.rsi = WilderRSI.from_dict(state["rsi"]) if state else WilderRSI(p["rsi_window"])
+        self.emas = {span: RunningEMA.from_dict(state["emas"][str(span)]) if state else RunningEMA(2 / (span + 1))
+                     for span in (20, 50, 200)}
+        self.vol = RollingWindow.from_dict(state["vol"]) if state else RollingWindow(20)
+        self.macd_fast = RunningEMA.from_dict(state["macd_fast"]) if state else RunningEMA(2 / 13, min_periods=12)
+        self.macd_slow = RunningEMA.from_dict(state["macd_slow"]) if state else RunningEMA(2 / 27, min_periods=26)
+        self.macd_sig = RunningEMA.from_dict(state["macd_sig"]) if state else RunningEMA(2 / 10, min_periods=9)
+        self.vwap_pv = RollingWindow.from_dict(state["vwap_pv"]) if state else RollingWindow(p["vwap_window"])
+        self.vwap_v = RollingWindow.from_dict(state["vwap_v"]) if state else RollingWindow(p["vwap_window"])
+        self.latest: Dict[str, float] = state.get("latest", {})
+
+    def update(self, high: float, low: float, close: float, volume: float, ts: int = None) -> Dict[str, float]:
+        """Fold in one bar and return the indicator values for it."""
+        if ts is not None and self.last_ts is not None and ts <= self.last_ts:
+            return self.latest
+        self.last_ts = ts if ts is not None else self.last_ts
+
+        p = self.params
+        self.bb.update(close)
+        mean, std = self.bb.mean, self.bb.std
+        bb_high = mean + p["bb_dev"] * std
+        bb_low = mean - p["bb_dev"] * std
+
+        atr = self.atr.update(high, low, close)
+        adx = self.adx.update(high, low, close)
+        rsi = self.rsi.update(close)
+        emas = {span: ema.update(close) for span, ema in self.emas.items()}
+        self.vol.update(volume)
+
+        macd = self.macd_fast.update(close) - self.macd_slow.update(close)
+        macd_signal = self.macd_sig.update(macd)
+
+        self.vwap_pv.update((high + low + close) / 3.0 * volume)
+        self.vwap_v.update(volume)
+        pv, v = self.vwap_pv.sum, self.vwap_v.sum
+        vwap = NAN if _isnan(pv) or _isnan(v) else (pv / v if v != 0 else (NAN if pv == 0 else math.copysign(math.inf, pv)))
+
+        self.latest = {
+            "bb_high": bb_high,
+            "bb_low": bb_low,
+            "bb_width": (bb_high - bb_low) / close,
+            # ta reports 0 (not NaN) while ATR/ADX are warming up
+            "atr_pct": atr / close,
+            "adx": adx,
+            "rsi": rsi,
+            "ema_20": emas[20],
+            "ema_50": emas[50],
+            "ema_200": emas[200],
+            "vol_ma_20": self.vol.mean,
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "macd_hist": macd - macd_signal,
+            "vwap": vwap,
+        }
+        return self.latest
+
+    def update_frame(self, df: pd.DataFrame) -> Dict[str, float]:
+        """Fold in every bar of df newer than the last applied one."""
+        for ts, high, low, close, volume in zip(_utc_ns(df.index), df["High"].to_numpy(dtype="f8"),
+                                                df["Low"].to_numpy(dtype="f8"), df["Close"].to_numpy(dtype="f8"),
+                                                df["Volume"].to_numpy(dtype="f8")):
+            self.update(high, low, close, volume, ts=int(ts))
+        return self.latest
+
+    def to_dict(self) -> Dict:
+        return {
+            "params": self.params,
+            "last_ts": self.last_ts,
+            "bb": self.bb.to_dict(),
+            "atr": self.atr.to_dict(),
+            "adx": self.adx.to_dict(),
+            "rsi": self.rsi.to_dict(),
+            "emas": {str(span): ema.to_dict() for span, ema in self.emas.items()},
+            "vol": self.vol.to_dict(),
+            "macd_fast": self.macd_fast.to_dict(),
+            "macd_slow": self.macd_slow.to_dict(),
+            "macd_sig": self.macd_sig.to_dict(),
+            "vwap_pv": self.vwap_pv.to_dict(),
+            "vwap_v": self.vwap_v.to_dict(),
+            "latest": self.latest,
+        }
+
+    @classmethod
+    def from_dict(cls, cfg: Dict, state: Dict) -> "StreamingIndicators":
+        return cls(cfg, state)
+
+
+def _utc_ns(index):
+    index = pd.DatetimeIndex(index)
+    utc = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    return utc.as_unit("ns").asi8
+
+
+def advance(states: Dict[str, StreamingIndicators], ticker: str, df: pd.DataFrame, cfg: Dict) -> Dict[str, float]:
+    """
+    Indicator values for df's last bar, keeping states[ticker] current.
+
+    Every bar but the last is treated as completed and folded into the
+    stored state; the last bar may still be forming, so it is applied to a
+    copy. The state is rebuilt from df when it is missing or when df starts
+    after the last applied bar (the bars in between were never seen).
+    """
+    state = states.get(ticker)
+    if state is None or state.last_ts is None or int(_utc_ns(df.index[:1])[0]) > state.last_ts:
+        state = StreamingIndicators(cfg)
+    state.update_frame(df.iloc[:-1])
+    states[ticker] = state
+    return StreamingIndicators.from_dict(cfg, state.to_dict()).update_frame(df.iloc[-1:])
+
+
+def save_states(path: Path, states: Dict[str, StreamingIndicators]) -> None:
+    """Persist {ticker: StreamingIndicators} as one JSON file (atomic replace)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({ticker: s.to_dict() for ticker, s in states.items()}))
+    os.replace(tmp_path, path)
+
+
+def load_states(path: Path, cfg: Dict) -> Dict[str, StreamingIndicators]:
+    """Load states saved by save_states; unreadable or mismatched states are dropped."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    try:
+        raw = json.loads(path.read_text())
+    except Exception as exc:
+        print(f"[STREAMING] Could not read {path}: {exc}")
+        return {}
+    states = {}
+    for ticker, state in raw.items():
+        try:
+            states[ticker] = StreamingIndicators.from_dict(cfg, state)
+        except (KeyError, ValueError) as exc:
+            print(f"[STREAMING] Discarding state for {ticker}: {exc}")
+    return states
+
@@ -241,7 +241,9 @@ def send_telegram_alerts(results: List[Dict], cfg: dict, charts_dir: str = "./ch
 
     # Send summary message
     summary = format_scan_results(filtered_results, telegram_cfg.get("send_charts", True))
-    bot.send_message(summary)
+    if not bot.send_message(summary):
+        print("[TELEGRAM] Failed to send the scan summary")
+        return False
     print(f"[TELEGRAM] Sent summary for {len(filtered_results)} stocks")
 
     # Send charts if enabled
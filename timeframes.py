@@ -0,0 +1,157 @@
+"""
+Multi-timeframe bars from a single base download.
+
+Jobs ask for the timeframes they read plus the history span they need;
+one download of the coarsest interval that can produce all of them is
+resampled locally. Downloads are memoized per refresh window, and a later
+job is served from any fresh download that already covers it (the hourly
+movers' 1m bars for today also yield hourly tips' 5m bars), so running jobs
+back to back costs one fetch without any job pulling finer or longer
+history than it reads.
+"""
+import threading
+import time
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+from market_data import INTERVAL_MAP, _parse_period_days, _trim_to_period, data_cfg_fingerprint, fetch_price_history_many
+from singleflight import SingleFlight
+
+
+SESSION_TZ = "America/New_York"
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+REFRESH_SECONDS = 300
+
+_UNIT_DELTAS = {"minute": "min", "hour": "h", "day": "D"}
+_OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def interval_delta(interval: str) -> pd.Timedelta:
+    """Bar length of a yfinance-style interval ('15m' -> 15 minutes)."""
+    if interval not in INTERVAL_MAP:
+        raise ValueError(f"Unsupported interval: {interval}")
+    multiplier, unit = INTERVAL_MAP[interval]
+    return pd.Timedelta(multiplier, _UNIT_DELTAS[unit])
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars up to `interval`.
+
+    Intraday bins are anchored at the 09:30 ET session open (so 1h bars are
+    09:30-10:30, ...) and never span two sessions; '1d' produces one bar per
+    session date. Naive indexes are treated as UTC (Polygon) and keep their
+    representation in the output.
+    """
+    if df.empty:
+        return df
+
+    index = pd.DatetimeIndex(df.index)
+    naive = index.tz is None
+    local = index.tz_localize("UTC").tz_convert(SESSION_TZ) if naive else index.tz_convert(SESSION_TZ)
+    session_day = local.normalize()
+
+    if interval == "1d":
+        labels = session_day.tz_localize(None)
+    else:
+        step = interval_delta(interval)
+        session_open = session_day + SESSION_OPEN
+        labels = session_open + ((local - session_open) // step) * step
+        labels = labels.tz_convert("UTC").tz_localize(None) if naive else labels.tz_convert(index.tz)
+
+    agg = {col: how for col, how in _OHLCV_AGG.items() if col in df.columns}
+    out = df.groupby(labels, sort=True).agg(agg)
+    out.index.name = df.index.name
+    return out
+
+
+def last_session(df: pd.DataFrame) -> pd.DataFrame:
+    """Bars from the most recent trading session only."""
+    if df.empty:
+        return df
+    index = pd.DatetimeIndex(df.index)
+    local = index.tz_localize("UTC").tz_convert(SESSION_TZ) if index.tz is None else index.tz_convert(SESSION_TZ)
+    session_day = local.normalize()
+    return df[session_day == session_day[-1]]
+
+
+def base_interval_for(intervals: Iterable[str]) -> str:
+    """Coarsest interval every requested one can be resampled from (['5m', '15m'] -> '5m')."""
+    intraday = [interval_delta(i) for i in intervals if i != "1d"]
+    if not intraday:
+        return "1d"
+    candidates = sorted((i for i in INTERVAL_MAP if i != "1d"), key=interval_delta, reverse=True)
+    for candidate in candidates:
+        step = interval_delta(candidate)
+        if all(delta % step == pd.Timedelta(0) for delta in intraday):
+            return candidate
+    raise ValueError(f"No common base interval for {list(intervals)}")
+
+
+def _can_build(intervals: Iterable[str], base_interval: str) -> bool:
+    if base_interval == "1d":
+        return all(i == "1d" for i in intervals)
+    step = interval_delta(base_interval)
+    return all(i == "1d" or interval_delta(i) % step == pd.Timedelta(0) for i in intervals)
+
+
+_memo: Dict[tuple, list] = {}
+_memo_lock = threading.Lock()
+_flights = SingleFlight()
+
+
+def fetch_timeframes(tickers: Iterable[str], period: str, intervals: List[str], base_interval: str = None,
+                     provider: str = "yfinance", data_cfg: Dict = None) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Return {interval: {ticker: frame}} for every requested interval over
+    `period`, derived from one download.
+
+    The download uses `base_interval` (default: data.base_interval if set,
+    else the coarsest interval all requested ones are multiples of) and
+    only `period` of history. Downloads are memoized for
+    `data.timeframe_refresh_seconds`; a request for the same tickers is
+    served from any fresh download whose bars can build its intervals and
+    whose period covers its own.
+    """
+    data_cfg = data_cfg or {}
+    tickers = list(dict.fromkeys(tickers))
+    base_interval = base_interval or data_cfg.get("base_interval") or base_interval_for(intervals)
+    if not _can_build(intervals, base_interval):
+        raise ValueError(f"{intervals} bars can't be built from {base_interval} bars")
+
+    key = (tuple(tickers), provider, data_cfg_fingerprint(data_cfg))
+    refresh_seconds = data_cfg.get("timeframe_refresh_seconds", REFRESH_SECONDS)
+    base_interval, base = _flights.do(key + (period, base_interval), _load_base, key, period, base_interval,
+                                      intervals, refresh_seconds, data_cfg)
+
+    return {
+        interval: {ticker: df.copy() for ticker, df in base.items()} if interval == base_interval else
+        {ticker: resample_ohlcv(df, interval) for ticker, df in base.items()}
+        for interval in intervals
+    }
+
+
+def _load_base(key: tuple, period: str, base_interval: str, intervals: List[str], refresh_seconds: float,
+               data_cfg: Dict) -> tuple:
+    """(base interval used, {ticker: base frame}) from the memo or a fresh download."""
+    now = time.time()
+    with _memo_lock:
+        for fetched_at, cached_period, cached_base, frames in _memo.get(key, []):
+            if (now - fetched_at < refresh_seconds and _can_build(intervals, cached_base)
+                    and _parse_period_days(cached_period) >= _parse_period_days(period)):
+                if cached_period == period:
+                    return cached_base, frames
+                trimmed = {t: _trim_to_period(df, period) for t, df in frames.items()}
+                return cached_base, {t: df for t, df in trimmed.items() if not df.empty}
+
+    tickers, provider, _ = key
+    frames = fetch_price_history_many(list(tickers), period, base_interval, provider=provider, data_cfg=data_cfg)
+    now = time.time()
+    with _memo_lock:
+        for memo_key in list(_memo):
+            _memo[memo_key] = [entry for entry in _memo[memo_key] if now - entry[0] < refresh_seconds]
+            if not _memo[memo_key]:
+                del _memo[memo_key]
+        _memo.setdefault(key, []).append((now, period, base_interval, frames))
+    return base_interval, frames
@@ -4,7 +4,6 @@ TOP PERFORMERS SCANNER
 Finds best performing stocks every hour and daily morning picks
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -14,41 +13,57 @@ from pathlib import Path
 import sys
 
 # Add indicators
-from scan_and_chart import add_indicators, get_clean_prices
+from scan_and_chart import add_indicators_cached, get_clean_prices
 from database import get_db_connection, format_sql
+from market_data import fetch_price_history_many
+from timeframes import fetch_timeframes, last_session
+from universe_store import get_universe_store
 
 
 # ============================================================
 # STOCK UNIVERSES
 # ============================================================
 
+_store = None
+
+
+def _universe_store():
+    """Shared store for config.yaml's `universe:` section (config is read once per process)."""
+    global _store
+    if _store is None:
+        try:
+            universe_cfg = yaml.safe_load(open("config.yaml", "r")).get("universe", {})
+        except Exception:
+            universe_cfg = {}
+        _store = get_universe_store(universe_cfg)
+    return _store
+
+
+def _scrape_sp500_tickers() -> List[str]:
+    # Using Wikipedia table for S&P 500
+    url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
+    tables = pd.read_html(url)
+    sp500_table = tables[0]
+    tickers = sp500_table['Symbol'].tolist()
+    # Clean tickers (remove dots for proper yfinance format)
+    return [t.replace('.', '-') for t in tickers]
+
+
+def _scrape_nasdaq100_tickers() -> List[str]:
+    url = 'https://en.wikipedia.org/wiki/Nasdaq-100'
+    tables = pd.read_html(url)
+    nasdaq_table = tables[4]  # The main ticker table
+    return nasdaq_table['Ticker'].tolist()
+
+
 def get_sp500_tickers() -> List[str]:
-    """Get S&P 500 stock tickers"""
-    try:
-        # Using Wikipedia table for S&P 500
-        url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-        tables = pd.read_html(url)
-        sp500_table = tables[0]
-        tickers = sp500_table['Symbol'].tolist()
-        # Clean tickers (remove dots for proper yfinance format)
-        tickers = [t.replace('.', '-') for t in tickers]
-        return tickers
-    except Exception as e:
-        print(f"⚠️  Could not fetch S&P 500: {e}")
-        return []
+    """Get S&P 500 stock tickers (cached snapshot, refreshed from Wikipedia once per TTL)"""
+    return _universe_store().get('sp500', _scrape_sp500_tickers)
 
 
 def get_nasdaq100_tickers() -> List[str]:
-    """Get NASDAQ-100 stock tickers"""
-    try:
-        url = 'https://en.wikipedia.org/wiki/Nasdaq-100'
-        tables = pd.read_html(url)
-        nasdaq_table = tables[4]  # The main ticker table
-        tickers = nasdaq_table['Ticker'].tolist()
-        return tickers
-    except Exception as e:
-        print(f"⚠️  Could not fetch NASDAQ-100: {e}")
-        return []
+    """Get NASDAQ-100 stock tickers (cached snapshot, refreshed from Wikipedia once per TTL)"""
+    return _universe_store().get('nasdaq100', _scrape_nasdaq100_tickers)
 
 
 def get_top_volume_tickers(min_volume: int = 1_000_000) -> List[str]:
@@ -113,8 +128,8 @@ def get_stock_universe(mode: str = 'popular') -> List[str]:
     elif mode == 'all':
         sp500 = get_sp500_tickers()
         nasdaq = get_nasdaq100_tickers()
-        # Combine and deduplicate
-        return list(set(sp500 + nasdaq))
+        # Combine and deduplicate (stable order so downstream caches see the same key)
+        return list(dict.fromkeys(sp500 + nasdaq))
     else:
         return get_top_volume_tickers()
 
@@ -135,12 +150,20 @@ def scan_hourly_top_movers(top_n: int = 10, universe_mode: str = 'popular') -> p
     tickers = get_stock_universe(universe_mode)
     print(f"📊 Scanning {len(tickers)} stocks from '{universe_mode}' universe...\n")
 
+    try:
+        data_cfg = yaml.safe_load(open("config.yaml", "r")).get("data", {})
+    except Exception:
+        data_cfg = {}
+
+    # Today's 1-minute bars (the only session this scan reads)
+    frames = fetch_timeframes(tickers, '1d', ['1m'], data_cfg=data_cfg)['1m']
+
     results = []
 
-    for i, ticker in enumerate(tickers):
+    for i, (ticker, df) in enumerate(frames.items()):
         try:
-            # Get last 2 hours of data (1-minute bars)
-            df = yf.download(ticker, period='1d', interval='1m', progress=False)
+            # Today's session only
+            df = last_session(df)
 
             if df.empty or len(df) < 60:
                 continue
@@ -205,19 +228,22 @@ def scan_morning_top_picks(top_n: int = 10, universe_mode: str = 'popular') -> p
 
     # Load config for indicators
     cfg = yaml.safe_load(open("config.yaml", "r"))
+    data_cfg = cfg.get("data", {})
+
+    # Use daily data for more reliable results (batched / grouped-daily download)
+    frames = fetch_price_history_many(tickers, period='3mo', interval='1d',
+                                      provider=data_cfg.get("provider", "yfinance"), data_cfg=data_cfg)
 
     results = []
 
-    for i, ticker in enumerate(tickers):
+    for i, (ticker, df) in enumerate(frames.items()):
         try:
-            # Use daily data for more reliable results
-            df = yf.download(ticker, period='3mo', interval='1d', progress=False)
 
             if df.empty or len(df) < 50:
                 continue
 
             # Add indicators
-            df = add_indicators(df, cfg)
+            df = add_indicators_cached(df, cfg, ticker, '1d', columns=('rsi', 'adx', 'bb_width', 'atr_pct'))
 
             if df.empty:
                 continue
@@ -226,10 +252,10 @@ def scan_morning_top_picks(top_n: int = 10, universe_mode: str = 'popular') -> p
             latest = df.iloc[-1]
 
             # Calculate scores
-            rsi = latest['RSI']
-            adx = latest['ADX']
-            bb_width = latest['BBWidth_pct']
-            atr_pct = latest['ATR%']
+            rsi = latest['rsi']
+            adx = latest['adx']
+            bb_width = latest['bb_width'] * 100
+            atr_pct = latest['atr_pct'] * 100
 
             # Calculate momentum (5-day change)
             if len(df) >= 5:
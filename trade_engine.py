@@ -7,6 +7,7 @@ from database import (
     create_trade, get_pending_trades, get_open_trades,
     update_trade_status, close_trade, get_trade_summary
 )
+from singleflight import SingleFlight
 
 """
 Trade Engine - Converts signals to trades and manages trade lifecycle
@@ -109,8 +110,15 @@ def signal_to_trade(signal_data: Dict, signal_id: int, cfg: dict) -> Optional[in
     return trade_id
 
 
+_price_flights = SingleFlight()
+
+
 def get_current_price(ticker: str) -> Optional[float]:
-    """Get current price for a ticker"""
+    """Get current price for a ticker (concurrent lookups of the same ticker share one request)"""
+    return _price_flights.do(ticker.upper(), _fetch_current_price, ticker)
+
+
+def _fetch_current_price(ticker: str) -> Optional[float]:
     try:
         stock = yf.Ticker(ticker)
         data = stock.history(period='1d', interval='1m')
@@ -0,0 +1,132 @@
+"""
+Persistent stock-universe snapshots.
+
+Index memberships (S&P 500, NASDAQ-100) change a few times a year, so they are
+scraped at most once per TTL and kept as versioned JSON snapshots under
+.cache/universe. Every job in the process shares an in-memory copy; when the
+source is unreachable the last snapshot is served instead.
+
+Layout: <root>/<name>.json holds the current version; superseded versions are
+kept as <root>/<name>.v<N>.json.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from singleflight import SingleFlight
+
+
+UNIVERSE_DIR = Path(".cache") / "universe"
+UNIVERSE_TTL_HOURS = 24
+RETRY_MINUTES = 15  # After a failed refresh, serve the stale snapshot this long before retrying
+
+
+class UniverseStore:
+    """TTL-refreshed, versioned ticker lists with an in-process memo."""
+
+    def __init__(self, root: Path = UNIVERSE_DIR, ttl_hours: float = UNIVERSE_TTL_HOURS,
+                 retry_minutes: float = RETRY_MINUTES):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_hours * 3600
+        self.retry_seconds = retry_minutes * 60
+        self._memo: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def get(self, name: str, fetcher: Callable[[], List[str]]) -> List[str]:
+        """
+        Return the ticker list for `name`, calling `fetcher` only when the
+        snapshot is missing or older than the TTL. `fetcher` should raise (or
+        return an empty list) when the source is unavailable.
+        """
+        with self._lock:
+            memo = self._memo.get(name)
+        if memo and time.time() < memo[0]:
+            return list(memo[1])
+        return list(self._flights.do(name, self._resolve, name, fetcher))
+
+    def _resolve(self, name: str, fetcher: Callable[[], List[str]]) -> List[str]:
+        snapshot = self.load(name)
+        age = time.time() - snapshot["fetched_at"] if snapshot else None
+        if snapshot and age < self.ttl_seconds:
+            self._remember(name, snapshot["tickers"], snapshot["fetched_at"] + self.ttl_seconds)
+            return snapshot["tickers"]
+
+        try:
+            tickers = list(dict.fromkeys(fetcher()))
+            if not tickers:
+                raise ValueError("source returned no tickers")
+        except Exception as exc:
+            if snapshot:
+                print(f"[UNIVERSE] {name}: refresh failed ({exc}); using v{snapshot['version']} "
+                      f"snapshot from {age / 3600:.1f}h ago")
+                self._remember(name, snapshot["tickers"], time.time() + self.retry_seconds)
+                return snapshot["tickers"]
+            print(f"[UNIVERSE] {name}: refresh failed ({exc}) and no snapshot on disk")
+            return []
+
+        snapshot = self.save(name, tickers, snapshot)
+        self._remember(name, tickers, snapshot["fetched_at"] + self.ttl_seconds)
+        return tickers
+
+    def _remember(self, name: str, tickers: List[str], expires_at: float) -> None:
+        with self._lock:
+            self._memo[name] = (expires_at, tickers)
+
+    def _path(self, name: str, version: int = None) -> Path:
+        return self.root / (f"{name}.v{version}.json" if version is not None else f"{name}.json")
+
+    def load(self, name: str) -> Dict:
+        """Current snapshot ({version, fetched_at, tickers}) or {} if none."""
+        path = self._path(name)
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text())
+        except Exception as exc:
+            print(f"[UNIVERSE] Could not read {path}: {exc}")
+            return {}
+
+    def save(self, name: str, tickers: List[str], previous: Dict = None) -> Dict:
+        """
+        Persist a fresh fetch. Membership changes bump the version (the old
+        snapshot is archived and the diff logged); an unchanged list only
+        refreshes fetched_at.
+        """
+        previous = previous or {}
+        version = previous.get("version", 0)
+        old = previous.get("tickers", [])
+
+        if set(tickers) != set(old):
+            if previous:
+                added = sorted(set(tickers) - set(old))
+                removed = sorted(set(old) - set(tickers))
+                print(f"[UNIVERSE] {name} v{version} -> v{version + 1}: "
+                      f"+{len(added)} {added} -{len(removed)} {removed}")
+                self._write(self._path(name, version), previous)
+            version += 1
+
+        snapshot = {"version": version, "fetched_at": time.time(), "tickers": tickers}
+        self._write(self._path(name), snapshot)
+        return snapshot
+
+    def _write(self, path: Path, snapshot: Dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(snapshot))
+        os.replace(tmp_path, path)
+
+
+_stores: Dict[tuple, UniverseStore] = {}
+
+
+def get_universe_store(universe_cfg: Dict = None) -> UniverseStore:
+    """Return the shared store for the `universe:` config section."""
+    universe_cfg = universe_cfg or {}
+    key = (universe_cfg.get("dir", str(UNIVERSE_DIR)), universe_cfg.get("ttl_hours", UNIVERSE_TTL_HOURS))
+    if key not in _stores:
+        _stores[key] = UniverseStore(Path(key[0]), key[1])
+    return _stores[key]